@@ -0,0 +1,122 @@
+"""LLM calls and prompt size per user turn: nested ReAct agent vs flat agent mode.
+
+A scripted fake chat model asks for one search and then answers. Search,
+rewrite and embedding are stubbed, so the script counts model calls and the
+number of messages sent to the model over a multi-turn conversation.
+
+    PYTHONPATH=src python benchmarks/bench_agent_modes.py --turns 5
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import time
+from functools import lru_cache
+from typing import Any, List
+
+import httpx
+import numpy as np
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from react_agent import retrieval, vector_store
+from react_agent.qdrant_transport import QdrantTransport
+
+graph_module = importlib.import_module("react_agent.graph")
+
+CALLS: List[int] = []
+
+
+class ScriptedChatModel(BaseChatModel):
+    """도구 결과가 없으면 첫 번째 도구로 검색하고, 있으면 답하는 가짜 모델."""
+
+    tool_names: List[str] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ScriptedChatModel":
+        names = [getattr(t, "name", None) or t.__name__ for t in tools]
+        return ScriptedChatModel(tool_names=names)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        CALLS.append(len(messages))
+        if isinstance(messages[-1], ToolMessage):
+            message = AIMessage(content="외국환 신고 절차에 대한 답변입니다.")
+        else:
+            message = AIMessage(
+                content="",
+                tool_calls=[{
+                    "name": self.tool_names[0],
+                    "args": {"query": "외국환 신고 절차"},
+                    "id": f"call_{len(CALLS)}",
+                }],
+            )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def install_fakes():
+    async def rewrite(query):
+        return f"{query} 법률 재구성"
+
+    async def embed(text):
+        return np.ones(384, dtype=np.float32)
+
+    async def no_structural_index():
+        return None
+
+    def handler(request):
+        limit = json.loads(request.content)["limit"]
+        hits = [
+            {"id": i, "score": 1 - i / 100, "payload": {"id": f"1-{i}", "cleaned_content": "외국환 신고"}}
+            for i in range(limit)
+        ]
+        return httpx.Response(200, json={"result": hits})
+
+    transport = QdrantTransport(transport=httpx.MockTransport(handler))
+    retrieval.restructure_query_with_llm = rewrite
+    retrieval.embedding_executor.embed = embed
+    retrieval.get_structural_index = no_structural_index
+    vector_store.get_transport = lambda: transport
+    vector_store.SEARCH_MODE = "dense"
+    graph_module.get_chat_model = lru_cache(maxsize=None)(lambda model: ScriptedChatModel())
+
+
+async def run_conversation(mode, turns):
+    history: List[Any] = []
+    per_turn = []
+    config = {"configurable": {"thread_id": f"bench-{mode}", "agent_mode": mode}}
+    for turn in range(turns):
+        CALLS.clear()
+        history.append(HumanMessage(content=f"외국환 신고 절차 질문 {turn}"))
+        start = time.perf_counter()
+        result = await graph_module.graph.ainvoke({"messages": history}, config)
+        elapsed = (time.perf_counter() - start) * 1000
+        history = list(result["messages"])
+        per_turn.append((len(CALLS), sum(CALLS), elapsed))
+    return per_turn
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=5)
+    args = parser.parse_args()
+
+    install_fakes()
+    for mode in ("nested", "flat"):
+        per_turn = asyncio.run(run_conversation(mode, args.turns))
+        calls = [c for c, _, _ in per_turn]
+        prompt_messages = [m for _, m, _ in per_turn]
+        # 첫 턴은 에이전트 컴파일/모델 바인딩을 포함하므로 제외
+        latency = np.median([t for _, _, t in per_turn[1:]])
+        print(
+            f"{mode:<7} LLM calls/turn={calls}  prompt messages/turn={prompt_messages}"
+            f"  median turn={latency:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Per-turn overhead of graph.call_model: rebuilding the agent vs reusing the cached one.
+
+The chat model is a fake that answers immediately, so the measured time is the
+framework overhead of one call_model invocation (model construction, tool
+schema generation, graph compilation and the agent run itself).
+
+    PYTHONPATH=src python benchmarks/bench_call_model.py --runs 200
+"""
+
+import argparse
+import asyncio
+import importlib
+import itertools
+import time
+import tracemalloc
+from functools import lru_cache
+
+import numpy as np
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+
+from react_agent.state import State
+
+# react_agent.graph 속성은 컴파일된 그래프이므로 모듈은 importlib로 가져옴
+graph = importlib.import_module("react_agent.graph")
+
+
+class FakeChatModel(GenericFakeChatModel):
+    """도구 호출 없이 바로 답하는 가짜 모델 (create_react_agent용 bind_tools 제공)."""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+def fake_chat_model(model):
+    return FakeChatModel(messages=itertools.cycle([AIMessage(content="답변입니다.")]))
+
+
+async def measure(runs, rebuild):
+    state = State(messages=[HumanMessage(content="외국환 신고 절차를 알려주세요.")])
+    latencies = []
+    tracemalloc.start()
+    for i in range(runs):
+        if rebuild:
+            # 이전 동작: 턴마다 모델과 에이전트를 새로 만듦
+            graph.get_chat_model.cache_clear()
+            graph.get_agent.cache_clear()
+        config = {"configurable": {"thread_id": f"bench-{rebuild}-{i}"}}
+        start = time.perf_counter()
+        await graph.call_model(state, config)
+        latencies.append((time.perf_counter() - start) * 1000)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # 첫 호출(캐시 채우기)은 제외
+    p50, p99 = np.percentile(latencies[1:], [50, 99])
+    return p50, p99, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    graph.get_chat_model = lru_cache(maxsize=None)(fake_chat_model)
+    for name, rebuild in (("rebuild", True), ("cached", False)):
+        graph.get_agent.cache_clear()
+        p50, p99, peak = asyncio.run(measure(args.runs, rebuild))
+        print(f"{name:<8} p50={p50:7.2f}ms  p99={p99:7.2f}ms  peak_alloc={peak / 1e6:6.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Soak test: process RSS while thousands of conversation threads are checkpointed.
+
+Every thread runs a few turns through a small message graph whose replies are
+about the size of a rendered search result. MemorySaver keeps all of them in
+process memory, while SQLiteCheckpointSaver keeps them in a temporary file
+that is compacted during the run. Each checkpointer runs in its own subprocess
+so the RSS numbers do not mix.
+
+    PYTHONPATH=src python benchmarks/bench_checkpointer.py --threads 5000 --turns 3
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import MessagesState, StateGraph
+
+REPLY = "외국환거래법 제3조(정의) 이 법에서 사용하는 용어의 뜻은 다음과 같다. " * 40
+
+
+def rss_mb():
+    # 현재 RSS (Linux /proc 기준, 페이지 수 x 페이지 크기)
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+
+def worker(kind, threads, turns):
+    from react_agent.checkpointer import SQLiteCheckpointSaver
+
+    if kind == "memory":
+        from langgraph.checkpoint.memory import MemorySaver
+
+        saver = MemorySaver()
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "checkpoints.sqlite")
+        # 정리 효과를 보기 위해 짧은 TTL과 정리 주기 사용
+        saver = SQLiteCheckpointSaver(path, ttl=5, max_checkpoints=4, compact_interval=1)
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("reply", lambda state: {"messages": [AIMessage(content=REPLY)]})
+    builder.add_edge("__start__", "reply")
+    graph = builder.compile(checkpointer=saver)
+
+    samples = []
+    start = time.perf_counter()
+    for t in range(threads):
+        config = {"configurable": {"thread_id": f"thread-{t}"}}
+        for turn in range(turns):
+            graph.invoke({"messages": [HumanMessage(content=f"질문 {turn}")]}, config)
+        if (t + 1) % max(1, threads // 5) == 0:
+            samples.append(round(rss_mb(), 1))
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        "kind": kind,
+        "rss_mb": samples,
+        "turns_per_s": threads * turns / elapsed,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=5000)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.threads, args.turns)
+        return
+
+    for kind in ("memory", "sqlite"):
+        result = subprocess.run(
+            [sys.executable, __file__, "--worker", kind,
+             "--threads", str(args.threads), "--turns", str(args.turns)],
+            capture_output=True, text=True, env=os.environ,
+        )
+        if result.returncode != 0:
+            print(f"{kind:<7} 실패: {result.stderr.strip().splitlines()[-1]}")
+            continue
+        r = json.loads(result.stdout.strip().splitlines()[-1])
+        print(f"{r['kind']:<7} rss_mb={r['rss_mb']}  {r['turns_per_s']:7.1f} turns/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Prompt tokens per turn and summary refreshes: full history vs token-budgeted window.
+
+call_model is driven directly in flat mode with a fake chat model that answers
+immediately. Each turn adds a question, a search call, the search result (as a
+stored reference once the turn is over, like ToolResultNode) and a 300-token
+answer. The script reports the tokens sent in each turn's final model call and
+how many summary calls were made.
+
+    PYTHONPATH=src python benchmarks/bench_context_window.py --turns 40 --budget 4000
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+from typing import List
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from react_agent.context_window import message_tokens
+from react_agent.prompts import SUMMARY_PROMPT
+from react_agent.state import State
+from react_agent.tool_results import ToolResultStore, to_reference
+
+graph = importlib.import_module("react_agent.graph")
+
+ANSWER = "외국환거래법 제3조에 따라 신고 절차는 다음과 같습니다. " * 20
+CHUNK = "외국환거래법 제3조(정의) 이 법에서 사용하는 용어의 뜻은 다음과 같다. " * 12
+SUMMARY_HEADER = SUMMARY_PROMPT.split("\n")[0]
+
+
+class CountingChatModel(BaseChatModel):
+    """프롬프트 토큰과 요약 호출 수를 기록하고 바로 답하는 가짜 모델."""
+
+    answer_prompts: List[int] = []
+    summary_calls: List[int] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "counting"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        tokens = sum(message_tokens(m) for m in messages)
+        if messages[0].content.startswith(SUMMARY_HEADER):
+            self.summary_calls.append(tokens)
+            content = "- 사용자는 외국환 신고 절차를 묻고 있음 " * 10
+        else:
+            self.answer_prompts.append(tokens)
+            content = ANSWER
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+
+async def run(turns, budget):
+    model = CountingChatModel()
+    model.answer_prompts, model.summary_calls = [], []
+    graph.get_chat_model = lambda name: model
+    graph.get_tool_model.cache_clear()
+    store = ToolResultStore(disk_path=None)
+    config = {"configurable": {"agent_mode": "flat", "context_token_budget": budget}}
+    state = State(messages=[])
+    for n in range(turns):
+        hits = [{"id": f"{n}-{i}", "text": f"{n}:{i} {CHUNK}"} for i in range(10)]
+        result = ToolMessage(content=json.dumps(hits, ensure_ascii=False), id=f"r{n}", tool_call_id=f"t{n}")
+        messages = list(state.messages) + [
+            HumanMessage(content=f"외국환 신고 절차 질문 {n}", id=f"h{n}"),
+            AIMessage(content="", id=f"c{n}", tool_calls=[{"name": "search", "args": {"query": "신고"}, "id": f"t{n}"}]),
+            to_reference(result, store),
+        ]
+        state = State(messages=messages, summary=state.summary, summarized_through=state.summarized_through)
+        update = await graph.call_model(state, config)
+        state = State(
+            messages=messages + [update["messages"][0].model_copy(update={"id": f"a{n}"})],
+            summary=update.get("summary", state.summary),
+            summarized_through=update.get("summarized_through", state.summarized_through),
+        )
+    return model.answer_prompts, model.summary_calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--budget", type=int, default=4000)
+    args = parser.parse_args()
+
+    for name, budget in (("full", 0), ("window", args.budget)):
+        prompts, summaries = asyncio.run(run(args.turns, budget))
+        picks = [prompts[i] for i in (0, len(prompts) // 4, len(prompts) // 2, len(prompts) - 1)]
+        print(
+            f"{name:<7} prompt tokens turn 1/{len(prompts) // 4 + 1}/{len(prompts) // 2 + 1}/{len(prompts)}={picks}"
+            f"  summary calls={len(summaries)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
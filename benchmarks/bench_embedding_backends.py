@@ -0,0 +1,93 @@
+"""Embedding backends: import+load time, single-query latency, batch throughput and RSS.
+
+Each backend runs in its own subprocess so that RSS and import time are not
+shared. The ONNX backends need an exported model
+(``python preprocessing/export_onnx_model.py``).
+
+    PYTHONPATH=src python benchmarks/bench_embedding_backends.py
+    PYTHONPATH=src python benchmarks/bench_embedding_backends.py --backends onnx onnx-int8 --queries 500
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+QUERIES = [
+    "외국환거래법 제1조 목적",
+    "외국환거래법상 신고의무가 발생하는 경우는?",
+    "외국환중개업무 규제",
+    "외국환거래법 위반 시 처벌 규정은?",
+]
+
+
+def worker(backend, queries, batch_size):
+    start = time.perf_counter()
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer("all-MiniLM-L6-v2")
+    else:
+        from react_agent.embedding import EMBEDDING_ONNX_PATH
+        from react_agent.onnx_embedding import OnnxEncoder
+
+        model = OnnxEncoder(EMBEDDING_ONNX_PATH, quantized=backend == "onnx-int8")
+    load_s = time.perf_counter() - start
+
+    texts = [f"{QUERIES[i % len(QUERIES)]} {i}" for i in range(queries)]
+    model.encode(texts[:8])  # warmup
+    latencies = []
+    for text in texts:
+        start = time.perf_counter()
+        model.encode(text)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+
+    start = time.perf_counter()
+    model.encode(texts, batch_size=batch_size)
+    throughput = len(texts) / (time.perf_counter() - start)
+
+    print(json.dumps({
+        "backend": backend,
+        "load_s": load_s,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1],
+        "throughput": throughput,
+        # Linux에서 ru_maxrss 단위는 KB
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.queries, args.batch_size)
+        return
+
+    for backend in args.backends:
+        result = subprocess.run(
+            [sys.executable, __file__, "--worker", backend,
+             "--queries", str(args.queries), "--batch-size", str(args.batch_size)],
+            capture_output=True, text=True, env=os.environ,
+        )
+        if result.returncode != 0:
+            print(f"{backend:<10} 실패: {result.stderr.strip().splitlines()[-1]}")
+            continue
+        r = json.loads(result.stdout.strip().splitlines()[-1])
+        print(
+            f"{r['backend']:<10} load={r['load_s']:6.2f}s  p50={r['p50_ms']:6.2f}ms  "
+            f"p99={r['p99_ms']:6.2f}ms  batch={r['throughput']:8.1f} q/s  rss={r['rss_mb']:7.1f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Query encoding throughput: per-query encode on the loop vs the micro-batching executor.
+
+    PYTHONPATH=src python benchmarks/bench_embedding_executor.py --concurrency 64 --queries 1024
+"""
+
+import argparse
+import asyncio
+import time
+
+from sentence_transformers import SentenceTransformer
+
+from react_agent.embedding import EmbeddingExecutor
+
+QUERIES = [
+    "외국환거래법 제1조 목적",
+    "외국환거래법상 신고의무가 발생하는 경우는?",
+    "외국환중개업무 규제",
+    "외국환거래법 위반 시 처벌 규정은?",
+]
+
+
+async def run_inline(model, queries, concurrency):
+    """기존 방식: 이벤트 루프에서 쿼리마다 model.encode 호출."""
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(q):
+        async with sem:
+            model.encode(q)
+
+    await asyncio.gather(*(one(q) for q in queries))
+
+
+async def run_executor(executor, queries, concurrency):
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(q):
+        async with sem:
+            await executor.embed(q)
+
+    await asyncio.gather(*(one(q) for q in queries))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--queries", type=int, default=1024)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    model = SentenceTransformer(args.model)
+    queries = [f"{QUERIES[i % len(QUERIES)]} {i}" for i in range(args.queries)]
+    model.encode(queries[:8])  # warmup
+
+    start = time.perf_counter()
+    asyncio.run(run_inline(model, queries, args.concurrency))
+    elapsed = time.perf_counter() - start
+    print(f"inline    {args.queries / elapsed:,.1f} queries/s")
+
+    executor = EmbeddingExecutor(
+        lambda texts: model.encode(texts, batch_size=args.batch_size),
+        batch_size=args.batch_size,
+        max_wait_ms=args.max_wait_ms,
+    )
+    start = time.perf_counter()
+    asyncio.run(run_executor(executor, queries, args.concurrency))
+    elapsed = time.perf_counter() - start
+    print(f"executor  {args.queries / elapsed:,.1f} queries/s  stats={executor.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Cold import time of react_agent, measured with ``python -X importtime``.
+
+Each run is a fresh interpreter. Reports the median wall-clock import time, the
+slowest top-level packages (cumulative) and which heavy dependencies were
+pulled in at import time.
+
+    PYTHONPATH=src python benchmarks/bench_import_time.py
+    PYTHONPATH=src python benchmarks/bench_import_time.py --module react_agent.tools --runs 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+HEAVY_MODULES = [
+    "torch",
+    "sentence_transformers",
+    "onnxruntime",
+    "sklearn",
+    "langchain_anthropic",
+    "qdrant_client",
+    "transformers",
+]
+
+
+def import_profile(module):
+    """새 인터프리터에서 module을 import하고 (모듈 이름, self us, cumulative us) 목록을 반환합니다."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=os.environ,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="react_agent")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    import_profile(args.module)  # 파일 시스템 캐시 워밍업
+    totals = []
+    packages = defaultdict(list)
+    for _ in range(args.runs):
+        rows = import_profile(args.module)
+        totals.append(next(c for name, _, c in rows if name == args.module) / 1000)
+        per_package = defaultdict(int)
+        for name, self_us, _ in rows:
+            per_package[name.split(".")[0]] += self_us
+        for package, us in per_package.items():
+            packages[package].append(us / 1000)
+
+    print(f"import {args.module}: median {statistics.median(totals):.0f}ms over {args.runs} runs")
+    print(f"\n상위 {args.top}개 패키지 (self time 합계, median ms)")
+    ranked = sorted(packages.items(), key=lambda kv: -statistics.median(kv[1]))
+    for package, times in ranked[: args.top]:
+        print(f"  {package:<28} {statistics.median(times):8.1f}")
+    loaded = [m for m in HEAVY_MODULES if m in packages]
+    print(f"\nimport 시점에 로드된 무거운 모듈: {', '.join(loaded) or '없음'}")
+
+
+if __name__ == "__main__":
+    main()
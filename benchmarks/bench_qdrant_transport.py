@@ -0,0 +1,87 @@
+"""Throughput of N concurrent Qdrant searches: blocking requests vs pooled async transport.
+
+Requires a local Qdrant with the collection loaded (see preprocessing/).
+
+    PYTHONPATH=src python benchmarks/bench_qdrant_transport.py --concurrency 32 --requests 512
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+import numpy as np
+import requests
+
+from react_agent.qdrant_transport import QDRANT_URL, QdrantTransport
+
+COLLECTION_NAME = os.environ.get("COLLECTION_NAME", "my-collection")
+EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+PATH = f"/collections/{COLLECTION_NAME}/points/search"
+
+
+def make_payloads(n, dim, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return [
+        {
+            "params": {"hnsw_ef": 128, "exact": False},
+            "vector": {"name": EMBEDDING_MODEL, "vector": v.tolist()},
+            "limit": 20,
+            "with_payload": True,
+        }
+        for v in vectors
+    ]
+
+
+async def run_blocking(payloads, concurrency):
+    """기존 방식: async 함수 안에서 requests.post 호출 (이벤트 루프 블로킹)."""
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(payload):
+        async with sem:
+            requests.post(f"{QDRANT_URL}{PATH}", json=payload).raise_for_status()
+
+    await asyncio.gather(*(one(p) for p in payloads))
+
+
+async def run_pooled(payloads, concurrency, pool_size):
+    """공유 커넥션 풀을 쓰는 비동기 트랜스포트."""
+    transport = QdrantTransport(pool_size=pool_size)
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(payload):
+        async with sem:
+            (await transport.post(PATH, payload)).raise_for_status()
+
+    try:
+        await asyncio.gather(*(one(p) for p in payloads))
+    finally:
+        await transport.aclose()
+
+
+def report(name, n, elapsed):
+    print(f"{name:<10} {n} searches in {elapsed:.3f}s -> {n / elapsed:,.1f} req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=512)
+    parser.add_argument("--pool-size", type=int, default=32)
+    parser.add_argument("--dim", type=int, default=384)
+    args = parser.parse_args()
+
+    payloads = make_payloads(args.requests, args.dim)
+
+    start = time.perf_counter()
+    asyncio.run(run_blocking(payloads, args.concurrency))
+    report("blocking", args.requests, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    asyncio.run(run_pooled(payloads, args.concurrency, args.pool_size))
+    report("pooled", args.requests, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Recall and memory of quantized vectors against the float32 baseline.
+
+float16/int8 are the local vector file formats (``VECTOR_DTYPE``). scalar/binary
+simulate the Qdrant quantization modes (``QDRANT_QUANTIZATION``): candidates are
+found with the quantized vectors and, with --oversampling, rescored with the
+original float32 vectors. Pass --vectors to use a real vectors.npy; random
+vectors have no cluster structure and understate binary recall.
+
+    PYTHONPATH=src python benchmarks/bench_quantization.py --vectors finto/data/intermediate/vectors.npy
+    PYTHONPATH=src python benchmarks/bench_quantization.py --points 20000 --oversampling 4
+"""
+
+import argparse
+
+import numpy as np
+
+from react_agent.vector_store import LocalVectorStore, quantize_vectors
+
+
+def top_k(scores, k):
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return [set(row) for row in top]
+
+
+def recall(truth, found):
+    return np.mean([len(t & f) / len(t) for t, f in zip(truth, found)])
+
+
+def rescore(candidate_scores, exact_scores, k, oversampling):
+    """양자화 점수로 k*oversampling개를 고른 뒤 원본 점수로 top-k를 다시 고릅니다."""
+    n = max(k, int(k * oversampling))
+    found = []
+    for cand, exact in zip(candidate_scores, exact_scores):
+        rows = np.argpartition(-cand, n - 1)[:n]
+        found.append(set(rows[np.argsort(-exact[rows])[:k]]))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vectors", help="vectors.npy 경로 (없으면 무작위 벡터)")
+    parser.add_argument("--points", type=int, default=300)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--oversampling", type=float, default=3.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if args.vectors:
+        vectors = np.load(args.vectors).astype(np.float32)
+    else:
+        vectors = rng.normal(size=(args.points, args.dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    # 코퍼스 벡터에 잡음을 더해 실제 질문과 비슷한 쿼리를 만듦
+    picks = rng.integers(0, len(vectors), args.queries)
+    queries = vectors[picks] + rng.normal(scale=0.05, size=(args.queries, vectors.shape[1]))
+    queries = queries.astype(np.float32)
+
+    exact = queries @ vectors.T
+    truth = top_k(exact, args.k)
+    payloads = [{"id": str(i)} for i in range(len(vectors))]
+    print(f"{len(vectors)} vectors x {vectors.shape[1]} dims, recall@{args.k}")
+    print(f"float32        {vectors.nbytes / len(vectors):6.0f} B/vector  recall=1.000")
+
+    for dtype in ("float16", "int8"):
+        stored = quantize_vectors(vectors, dtype)
+        store = LocalVectorStore(stored, payloads)
+        found = [{h["id"] for h in store.search_sync(q, args.k)} for q in queries]
+        print(f"{dtype:<14} {stored.nbytes / len(stored):6.0f} B/vector  recall={recall(truth, found):.3f}")
+
+    # Qdrant scalar: 전체 값의 0.99 분위수 범위로 잘라 8bit로 변환
+    low, high = np.quantile(vectors, [0.005, 0.995])
+    scalar = np.round((np.clip(vectors, low, high) - low) / (high - low) * 255).astype(np.uint8)
+    scalar_scores = queries @ (scalar.astype(np.float32) * (high - low) / 255 + low).T
+    # Qdrant binary: 부호 비트만 저장, 쿼리와의 일치 비트 수로 점수
+    bits = vectors > 0
+    binary_scores = (queries > 0).astype(np.float32) @ bits.T + (queries <= 0).astype(np.float32) @ (~bits).T
+
+    for name, scores, size in (
+        ("scalar", scalar_scores, scalar.nbytes / len(scalar)),
+        ("binary", binary_scores, np.packbits(bits, axis=1).nbytes / len(bits)),
+    ):
+        plain = recall(truth, top_k(scores, args.k))
+        rescored = recall(truth, rescore(scores, exact, args.k, args.oversampling))
+        print(
+            f"{name:<14} {size:6.0f} B/vector  recall={plain:.3f}  "
+            f"rescore x{args.oversampling:g}={rescored:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
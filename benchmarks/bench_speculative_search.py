@@ -0,0 +1,72 @@
+"""p50/p99 latency of qdrant_search_reranked's pipeline: sequential vs speculative rewrite.
+
+LLM rewrite and Qdrant latencies are simulated (lognormal) so the effect of
+overlapping the raw-query search with the rewrite can be measured offline.
+
+    PYTHONPATH=src python benchmarks/bench_speculative_search.py --runs 200 --deadline-ms 800
+"""
+
+import argparse
+import asyncio
+import json
+
+import httpx
+import numpy as np
+
+from react_agent import retrieval, vector_store
+from react_agent.qdrant_transport import QdrantTransport
+
+
+def install_fakes(rng, rewrite_ms, search_ms):
+    async def rewrite(query):
+        await asyncio.sleep(rng.lognormal(np.log(rewrite_ms), 0.5) / 1000)
+        return f"{query} 법률 재구성"
+
+    async def embed(text):
+        return np.ones(384, dtype=np.float32)
+
+    async def handler(request):
+        await asyncio.sleep(rng.lognormal(np.log(search_ms), 0.3) / 1000)
+        limit = json.loads(request.content)["limit"]
+        hits = [
+            {"id": i, "score": 1 - i / 100, "payload": {"id": str(i), "cleaned_content": "외국환"}}
+            for i in range(limit)
+        ]
+        return httpx.Response(200, json={"result": hits})
+
+    transport = QdrantTransport(transport=httpx.MockTransport(handler))
+    retrieval.restructure_query_with_llm = rewrite
+    retrieval.embedding_executor.embed = embed
+    vector_store.get_transport = lambda: transport
+    vector_store.SEARCH_MODE = "dense"
+
+
+async def measure(runs, **options):
+    latencies = []
+    for i in range(runs):
+        result = await retrieval.run_search_pipeline(f"외국환거래법 질문 {i}", **options)
+        latencies.append(result.timings["total"])
+    return np.percentile(latencies, [50, 99])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--rewrite-ms", type=float, default=600)
+    parser.add_argument("--search-ms", type=float, default=40)
+    parser.add_argument("--deadline-ms", type=float, default=800)
+    args = parser.parse_args()
+
+    install_fakes(np.random.default_rng(0), args.rewrite_ms, args.search_ms)
+    modes = {
+        "sequential": {},
+        "speculative": {"speculative": True},
+        "deadline": {"speculative": True, "rewrite_deadline_ms": args.deadline_ms},
+    }
+    for name, options in modes.items():
+        p50, p99 = asyncio.run(measure(args.runs, **options))
+        print(f"{name:<12} p50={p50:7.1f}ms  p99={p99:7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Checkpoint size, serialization time and prompt tokens: inline tool results vs references.
+
+A flat-mode conversation is replayed without a model. Each turn adds a user
+question, a tool call, a search result of ten legal chunks and an answer. At
+every step the message list is serialized the same way a checkpoint is, and the
+prompt that call_model would send is counted in tokens.
+
+    PYTHONPATH=src python benchmarks/bench_tool_results.py --turns 20
+"""
+
+import argparse
+import json
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from react_agent.render import count_tokens
+from react_agent.tool_results import ToolResultStore, expand_current_turn, to_reference
+
+CHUNK = "외국환거래법 제3조(정의) 이 법에서 사용하는 용어의 뜻은 다음과 같다. " * 12
+
+
+def search_result(turn):
+    hits = [
+        {"id": f"{turn}-{i}", "reference": f"외국환거래법 제{i + 1}조", "text": f"{turn}:{i} {CHUNK}"}
+        for i in range(10)
+    ]
+    return json.dumps(hits, ensure_ascii=False)
+
+
+def replay(turns, store):
+    serde = JsonPlusSerializer()
+    messages = []
+    sizes, dump_ms, prompt_tokens = [], [], []
+
+    def step():
+        start = time.perf_counter()
+        _, data = serde.dumps_typed(messages)
+        dump_ms.append((time.perf_counter() - start) * 1000)
+        sizes.append(len(data))
+        prompt = expand_current_turn(messages, store) if store else messages
+        prompt_tokens.append(sum(count_tokens(str(m.content)) for m in prompt))
+
+    for turn in range(turns):
+        call_id = f"call_{turn}"
+        messages.append(HumanMessage(content=f"외국환 신고 절차 질문 {turn}"))
+        messages.append(AIMessage(
+            content="", tool_calls=[{"name": "qdrant_search_with_params", "args": {"query": "신고"}, "id": call_id}]
+        ))
+        result = ToolMessage(content=search_result(turn), tool_call_id=call_id)
+        messages.append(to_reference(result, store) if store else result)
+        # 도구 결과를 받은 뒤의 모델 호출
+        step()
+        messages.append(AIMessage(content="외국환 신고 절차에 대한 답변입니다. " * 5))
+    return sizes, dump_ms, prompt_tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=20)
+    args = parser.parse_args()
+
+    for name, store in (("inline", None), ("reference", ToolResultStore(disk_path=None))):
+        sizes, dump_ms, prompt_tokens = replay(args.turns, store)
+        print(
+            f"{name:<9} last checkpoint={sizes[-1] / 1e3:7.1f}KB"
+            f"  mean dump={sum(dump_ms) / len(dump_ms):6.2f}ms"
+            f"  prompt tokens first/last step={prompt_tokens[0]}/{prompt_tokens[-1]}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Local vector store search latency: exact search vs IVF, with and without a filter.
+
+Uses random unit vectors unless --vectors points at a real vectors.npy.
+
+    PYTHONPATH=src python benchmarks/bench_vector_store.py --points 300 --queries 1000
+    PYTHONPATH=src python benchmarks/bench_vector_store.py --points 100000 --ivf
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from react_agent.vector_store import LocalVectorStore
+
+
+def measure(store, queries, limit, filter_conditions=None, nprobe=8):
+    latencies = []
+    for q in queries:
+        start = time.perf_counter()
+        store.search_sync(q, limit, filter_conditions, nprobe=nprobe)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return np.percentile(latencies, [50, 99])
+
+
+def recall(store, exact, queries, limit, nprobe):
+    found = 0
+    for q in queries:
+        truth = {h["id"] for h in exact.search_sync(q, limit)}
+        found += len(truth & {h["id"] for h in store.search_sync(q, limit, nprobe=nprobe)})
+    return found / (len(queries) * limit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vectors", help="vectors.npy 경로 (없으면 무작위 벡터)")
+    parser.add_argument("--points", type=int, default=300)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--ivf", action="store_true", help="IVF 근사 검색도 측정")
+    parser.add_argument("--nprobe", type=int, default=8)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if args.vectors:
+        vectors = np.load(args.vectors, mmap_mode="r")
+    else:
+        vectors = rng.normal(size=(args.points, args.dim)).astype(np.float32)
+    payloads = [{"id": str(i), "chapter_no": f"제{i % 6 + 1}장"} for i in range(len(vectors))]
+    queries = rng.normal(size=(args.queries, vectors.shape[1])).astype(np.float32)
+
+    exact = LocalVectorStore(vectors, payloads)
+    p50, p99 = measure(exact, queries, args.limit)
+    print(f"exact         p50={p50:8.1f}us  p99={p99:8.1f}us  ({len(exact)} points)")
+    conditions = {"must": [{"key": "chapter_no", "match": {"value": "제2장"}}]}
+    p50, p99 = measure(exact, queries, args.limit, conditions)
+    print(f"exact+filter  p50={p50:8.1f}us  p99={p99:8.1f}us")
+
+    if args.ivf:
+        ivf = LocalVectorStore(vectors, payloads)
+        start = time.perf_counter()
+        ivf.build_ivf()
+        print(f"IVF build     {time.perf_counter() - start:.2f}s  nlist={len(ivf.lists)}")
+        p50, p99 = measure(ivf, queries, args.limit, nprobe=args.nprobe)
+        r = recall(ivf, exact, queries[:100], args.limit, args.nprobe)
+        print(f"ivf           p50={p50:8.1f}us  p99={p99:8.1f}us  recall@{args.limit}={r:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,15 @@
 from pathlib import Path
 import re
 import json
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+from react_agent.lexical import LexicalIndex
 
 # 입력 및 출력 파일 경로 수정
 INPUT_FILE = Path("data/raw/sample.txt")
 OUTPUT_FILE = Path("finto/data/intermediate/structured_chunks.json")
+LEXICAL_INDEX_FILE = OUTPUT_FILE.parent / "lexical_index.json"
 
 def identify_chapter(text):
     """법령 텍스트에서 장(章) 정보를 식별합니다."""
@@ -208,8 +213,8 @@ def extract_article_metadata(text, chapter_info=None, header_info=None, article_
             metadata["item_no"] = item_match.group(1)
             metadata["detail_type"] = "항"
             metadata["section_type"] = "조문"
-    else:
-        metadata["section_type"] = "기타"
+        else:
+            metadata["section_type"] = "기타"
 
     # 개정 정보 추출
     amendment_match = re.search(r"<개정\s+(\d{4}\.\s*\d{1,2}\.\s*\d{1,2})>", text)
@@ -296,3 +301,14 @@ with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
     json.dump(structured_chunks, f, ensure_ascii=False, indent=2)
 
 print(f"✅ 법령 청크 분할 및 메타데이터 저장 완료: {len(structured_chunks)}개 → {OUTPUT_FILE}")
+
+# 코퍼스 전체에 대한 어휘(BM25) 인덱스 생성 - 검색 시 리랭킹에 사용
+# 행 번호가 Qdrant 포인트 ID와 같도록 4_upload_qdrant.py와 같이 내용이 있는 청크만 순서대로 사용
+lexical_index = LexicalIndex.build(
+    [
+        chunk["cleaned_content"] for chunk in structured_chunks
+        if chunk.get("content") or chunk.get("text")
+    ]
+)
+lexical_index.save(LEXICAL_INDEX_FILE)
+print(f"✅ 어휘 인덱스 저장 완료: 어휘 {len(lexical_index.vocab)}개 → {LEXICAL_INDEX_FILE}")
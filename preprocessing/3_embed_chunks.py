@@ -1,10 +1,18 @@
-from sentence_transformers import SentenceTransformer
 from pathlib import Path
 import json
 import numpy as np
 import os
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+from react_agent.embedding import load_embedding_model
+from react_agent.vector_store import VECTOR_DTYPE, local_vectors_path, quantize_vectors
 
-model = SentenceTransformer("all-MiniLM-L6-v2")
+# VECTOR_DTYPE: 로컬 저장소용 벡터 형식 "float32", "float16"(2배 절감), "int8"(4배 절감)
+# vectors.npy는 항상 float32 원본으로 저장하고, float16/int8은 vectors.<형식>.npy에 따로 저장
+
+# EMBEDDING_BACKEND=onnx이면 torch 없이 onnxruntime으로 인코딩
+model = load_embedding_model("all-MiniLM-L6-v2")
 
 INPUT_FILE = Path("finto/data/intermediate/structured_chunks.json")
 OUTPUT_FILE = Path("finto/data/intermediate/vectors.npy")
@@ -29,5 +37,12 @@ for i, chunk in enumerate(structured_chunks):
 
 vectors = model.encode(texts, show_progress_bar=True)
 
+vectors = np.asarray(vectors, dtype=np.float32)
 np.save(OUTPUT_FILE, vectors)
-print(f"✅ 임베딩 완료: {vectors.shape} → {OUTPUT_FILE}")
+print(f"✅ 임베딩 완료: {vectors.shape} {vectors.dtype} ({vectors.nbytes / 1024:.1f}KB) → {OUTPUT_FILE}")
+
+if VECTOR_DTYPE != "float32":
+    local_file = local_vectors_path(OUTPUT_FILE, VECTOR_DTYPE)
+    local_vectors = quantize_vectors(vectors, VECTOR_DTYPE)
+    np.save(local_file, local_vectors)
+    print(f"✅ 로컬 저장소용 {VECTOR_DTYPE} 벡터: ({local_vectors.nbytes / 1024:.1f}KB) → {local_file}")
@@ -1,19 +1,58 @@
 from qdrant_client import QdrantClient
-from qdrant_client.models import PointStruct, VectorParams, Distance
+from qdrant_client.models import PointStruct, VectorParams, Distance, SparseVectorParams, SparseVector
+from qdrant_client.models import (
+    PayloadSchemaType,
+    BinaryQuantization, BinaryQuantizationConfig,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+)
 from pathlib import Path
 import numpy as np
 import json
+import os
+import sys
+from datetime import datetime, timezone
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+from react_agent.lexical import LexicalIndex
+from react_agent.structure_index import chunk_to_payload
+from react_agent.vector_store import INGEST_VERSION_KEY
 
 COLLECTION_NAME = "my-collection"
 client = QdrantClient(host="localhost", port=6333)
 
 chunks_file = Path("finto/data/intermediate/structured_chunks.json")
 vectors_file = Path("finto/data/intermediate/vectors.npy")
+lexical_index_file = Path("finto/data/intermediate/lexical_index.json")
+SPARSE_VECTOR_NAME = "lexical"
+# 벡터 양자화: "none", "scalar"(int8, 4배 절감), "binary"(1bit, 32배 절감)
+# 원본 float32 벡터는 디스크에 남겨 검색 시 rescore에 사용 (SEARCH_RESCORE_OVERSAMPLING 참고)
+QUANTIZATION = os.environ.get("QDRANT_QUANTIZATION", "none")
+
+
+def quantization_config(mode):
+    """QDRANT_QUANTIZATION 값에 맞는 Qdrant 양자화 설정을 만듭니다."""
+    if mode == "none":
+        return None
+    if mode == "scalar":
+        return ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    if mode == "binary":
+        return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+    raise ValueError(f"❌ 알 수 없는 QDRANT_QUANTIZATION 값입니다: {mode}")
 
 with open(chunks_file, 'r', encoding='utf-8') as f:
     structured_chunks = json.load(f)
 
+# vectors.npy는 float32 원본 (float16/int8 로컬 파일은 vectors.<형식>.npy로 따로 저장됨)
+# 양자화된 컬렉션의 rescore가 이 원본을 사용하므로 손실된 벡터는 업로드하지 않음
 vectors = np.load(vectors_file)
+if vectors.dtype != np.float32:
+    print(f"❌ {vectors_file}가 float32가 아닙니다({vectors.dtype}). 3_embed_chunks.py를 다시 실행하세요.")
+    sys.exit(1)
+
+# 2_split_chunks.py에서 만든 BM25 인덱스의 문서 가중치를 sparse 벡터로 함께 저장
+lexical_index = LexicalIndex.load(lexical_index_file)
 
 # 컬렉션 없으면 생성
 if client.collection_exists(COLLECTION_NAME):
@@ -23,11 +62,25 @@ client.create_collection(
     vectors_config={
         "all-MiniLM-L6-v2": VectorParams(
             size=vectors.shape[1],
-            distance=Distance.COSINE
+            distance=Distance.COSINE,
+            quantization_config=quantization_config(QUANTIZATION)
         )
-    }
+    },
+    sparse_vectors_config={
+        SPARSE_VECTOR_NAME: SparseVectorParams()
+    },
+    # 검색 결과 캐시(react_agent.semantic_cache)가 재적재를 알아채도록 적재 시각을 기록
+    metadata={INGEST_VERSION_KEY: datetime.now(tz=timezone.utc).isoformat()}
 )
 
+# 청크 ID(이웃 확장 조회)와 장/조(구조 필터)로 검색하는 payload 필드에 인덱스 생성
+for field_name in ("id", "chapter_no", "article_no"):
+    client.create_payload_index(
+        collection_name=COLLECTION_NAME,
+        field_name=field_name,
+        field_schema=PayloadSchemaType.KEYWORD
+    )
+
 # 유효한 청크만 필터링
 valid_chunks = [
     (i, chunk) for i, chunk in enumerate(structured_chunks)
@@ -40,17 +93,27 @@ if len(valid_chunks) == 0:
 if vectors.shape[0] != len(valid_chunks):
     raise ValueError(f"❌ 벡터 수({vectors.shape[0]})와 유효 청크 수({len(valid_chunks)})가 일치하지 않습니다.")
 
+if len(lexical_index) != len(valid_chunks):
+    raise ValueError(f"❌ 어휘 인덱스 행 수({len(lexical_index)})와 유효 청크 수({len(valid_chunks)})가 일치하지 않습니다.")
+
+def sparse_vector(point_id):
+    """포인트(어휘 인덱스 행)의 BM25 가중치를 Qdrant sparse 벡터로 변환합니다.
+
+    청크 ID는 중복될 수 있으므로 행 번호로 조회합니다.
+    """
+    indices, values = lexical_index.doc_vector(point_id)
+    return SparseVector(indices=indices, values=values)
+
 # 벡터 업로드
 points = [
     PointStruct(
         id=i,
-        vector={"all-MiniLM-L6-v2": vectors[idx]},
-        payload={
-            "content": chunk.get("content") or chunk.get("text"),
-            "cleaned_content": chunk.get("cleaned_content", ""),
-            "id": chunk.get("id", str(i)),
-            **chunk.get("metadata", {})
-        }
+        vector={
+            "all-MiniLM-L6-v2": vectors[idx],
+            SPARSE_VECTOR_NAME: sparse_vector(i)
+        },
+        # 구조 인덱스(react_agent.structure_index)와 같은 payload 형식 사용
+        payload=chunk_to_payload(chunk, i)
     )
     for i, (idx, chunk) in enumerate(valid_chunks)
 ]
@@ -60,4 +123,4 @@ client.upsert(
     points=points,
     wait=True
 )
-print(f"✅ Qdrant 적재 완료: {len(points)}개")
+print(f"✅ Qdrant 적재 완료: {len(points)}개 (양자화: {QUANTIZATION})")
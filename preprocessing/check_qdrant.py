@@ -1,36 +1,58 @@
-from qdrant_client import QdrantClient
-import json
+from qdrant_client import AsyncQdrantClient
+import asyncio
+import httpx
+import os
 
-client = QdrantClient(host="localhost", port=6333)
-collection = "my-collection"
+QDRANT_URL = os.environ.get("QDRANT_URL", "http://localhost:6333")
+collection = os.environ.get("COLLECTION_NAME", "my-collection")
+
+# 커넥션 풀 / 타임아웃 설정 (react_agent.qdrant_transport와 동일한 환경 변수 사용)
+POOL_SIZE = int(os.environ.get("QDRANT_POOL_SIZE", "20"))
+KEEPALIVE_EXPIRY = float(os.environ.get("QDRANT_KEEPALIVE_EXPIRY", "30"))
+TIMEOUT = int(float(os.environ.get("QDRANT_TIMEOUT", "10")))
 
-scroll_offset = None
-all_results = []
 batch_size = 100
-total_fetched = 0
 
-print("📦 Qdrant에서 모든 문서 조회 시작...\n")
 
-count_response = client.count(collection_name=collection, exact=True)
-total_fetched = count_response.count
+async def main():
+    client = AsyncQdrantClient(
+        url=QDRANT_URL,
+        timeout=TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=POOL_SIZE,
+            max_keepalive_connections=POOL_SIZE,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+    )
+
+    print("📦 Qdrant에서 모든 문서 조회 시작...\n")
 
-scroll_offset = None
-fetched = 0
+    count_response = await client.count(collection_name=collection, exact=True)
+    total_fetched = count_response.count
 
-while fetched < total_fetched:
-    result, scroll_offset = client.scroll(
-        collection_name=collection,
-        offset=scroll_offset,
-        limit=batch_size,
-        with_payload=True
-    )
-    for doc in result:
-        print(f"📌 문서 ID: {doc.id}")
-        payload = doc.payload or {}
-        for key, value in payload.items():
-            print(f"{key}: {value}")
-        print("=" * 60)
+    scroll_offset = None
+    fetched = 0
+
+    while fetched < total_fetched:
+        result, scroll_offset = await client.scroll(
+            collection_name=collection,
+            offset=scroll_offset,
+            limit=batch_size,
+            with_payload=True
+        )
+        for doc in result:
+            print(f"📌 문서 ID: {doc.id}")
+            payload = doc.payload or {}
+            for key, value in payload.items():
+                print(f"{key}: {value}")
+            print("=" * 60)
+
+        fetched += len(result)
+        if scroll_offset is None:
+            break
+
+    await client.close()
+    print(f"\n✅ Qdrant에 저장된 총 문서 수: {total_fetched}개\n")
 
-    fetched += len(result)
 
-print(f"\n✅ Qdrant에 저장된 총 문서 수: {total_fetched}개\n")
\ No newline at end of file
+asyncio.run(main())
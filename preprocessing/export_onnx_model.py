@@ -0,0 +1,22 @@
+"""all-MiniLM-L6-v2를 ONNX로 내보냅니다 (EMBEDDING_BACKEND=onnx용).
+
+    python preprocessing/export_onnx_model.py
+    EMBEDDING_BACKEND=onnx EMBEDDING_ONNX_QUANTIZED=true langgraph dev
+"""
+
+from pathlib import Path
+import argparse
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+from react_agent.onnx_embedding import export_onnx_model
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+parser.add_argument("--output", default="finto/models/all-MiniLM-L6-v2-onnx")
+parser.add_argument("--no-quantize", action="store_true", help="int8 양자화 모델을 만들지 않음")
+args = parser.parse_args()
+
+output_dir = export_onnx_model(args.model, args.output, quantize=not args.no_quantize)
+for path in sorted(output_dir.iterdir()):
+    print(f"✅ {path} ({path.stat().st_size / 1024 / 1024:.1f}MB)")
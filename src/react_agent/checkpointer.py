@@ -0,0 +1,426 @@
+"""Bounded, persistent checkpointer for the agent graphs.
+
+``MemorySaver`` keeps every checkpoint of every thread in process memory for
+the lifetime of the server. ``SQLiteCheckpointSaver`` stores them in a local
+SQLite file instead, serialized with LangGraph's msgpack-based
+``JsonPlusSerializer``. Each row holds one complete checkpoint, so dropping old
+rows never breaks a newer one. A background thread periodically compacts the
+file: it deletes threads idle for longer than the TTL and keeps only the newest
+``max_checkpoints`` checkpoints (and their pending writes) per thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator, Sequence
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+# 체크포인터: "sqlite"(로컬 파일, TTL/개수 제한) 또는 "memory"(프로세스 메모리, 제한 없음)
+CHECKPOINTER = os.environ.get("CHECKPOINTER", "sqlite")
+CHECKPOINT_DB_PATH = os.environ.get(
+    "CHECKPOINT_DB_PATH", "finto/data/cache/checkpoints.sqlite"
+)
+# 마지막 갱신 후 이 시간(초)이 지난 스레드는 삭제 (0이면 만료 없음)
+CHECKPOINT_TTL = float(os.environ.get("CHECKPOINT_TTL", str(7 * 24 * 3600)))
+# 스레드(네임스페이스)마다 유지할 최신 체크포인트 수
+CHECKPOINT_MAX_PER_THREAD = int(os.environ.get("CHECKPOINT_MAX_PER_THREAD", "20"))
+# 백그라운드 정리 주기(초)
+CHECKPOINT_COMPACT_INTERVAL = float(os.environ.get("CHECKPOINT_COMPACT_INTERVAL", "300"))
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS threads ("
+    "thread_id TEXT PRIMARY KEY, updated REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS checkpoints ("
+    "thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL, "
+    "parent_id TEXT, type TEXT NOT NULL, checkpoint BLOB NOT NULL, "
+    "metadata_type TEXT NOT NULL, metadata BLOB NOT NULL, "
+    "PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id))",
+    "CREATE TABLE IF NOT EXISTS writes ("
+    "thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL, "
+    "task_id TEXT NOT NULL, idx INTEGER NOT NULL, channel TEXT NOT NULL, "
+    "type TEXT NOT NULL, value BLOB NOT NULL, task_path TEXT NOT NULL, "
+    "PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx))",
+    "CREATE INDEX IF NOT EXISTS threads_updated ON threads (updated)",
+)
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver[str]):
+    """SQLite 파일에 체크포인트를 저장하고 TTL/개수 제한으로 정리하는 체크포인터."""
+
+    def __init__(
+        self,
+        path: str | Path = CHECKPOINT_DB_PATH,
+        *,
+        ttl: Optional[float] = CHECKPOINT_TTL,
+        max_checkpoints: int = CHECKPOINT_MAX_PER_THREAD,
+        compact_interval: float = CHECKPOINT_COMPACT_INTERVAL,
+    ) -> None:
+        """Create the saver (the database is opened on first use).
+
+        Args:
+            path: SQLite 파일 경로 (":memory:"면 파일 없이 메모리 DB)
+            ttl: 스레드 유효 시간(초). None 또는 0이면 만료 없음
+            max_checkpoints: 스레드(네임스페이스)마다 유지할 최신 체크포인트 수
+            compact_interval: 백그라운드 정리 주기(초). 0이면 백그라운드 정리 없음
+        """
+        super().__init__(serde=JsonPlusSerializer())
+        self.path = str(path)
+        self.ttl = ttl or None
+        self.max_checkpoints = max(1, max_checkpoints)
+        self.compact_interval = compact_interval
+        self.compactions = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._compactor: Optional[threading.Thread] = None
+
+    def _db(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._conn is None:
+                if self.path != ":memory:":
+                    Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+                self._conn = sqlite3.connect(self.path, check_same_thread=False)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                for statement in _SCHEMA:
+                    self._conn.execute(statement)
+                self._conn.commit()
+                if self.compact_interval > 0:
+                    self._compactor = threading.Thread(
+                        target=self._compact_loop, name="checkpoint-compactor", daemon=True
+                    )
+                    self._compactor.start()
+            return self._conn
+
+    def _compact_loop(self) -> None:
+        while not self._stop.wait(self.compact_interval):
+            try:
+                self.compact()
+            except Exception as e:
+                print(f"📌 체크포인트 정리 실패: {str(e)}")
+
+    def _expired(self, thread_id: str) -> bool:
+        if not self.ttl:
+            return False
+        row = self._db().execute(
+            "SELECT updated FROM threads WHERE thread_id = ?", (thread_id,)
+        ).fetchone()
+        return row is None or time.time() - row[0] > self.ttl
+
+    def _tuple(
+        self, thread_id: str, checkpoint_ns: str, row: Tuple[Any, ...]
+    ) -> CheckpointTuple:
+        checkpoint_id, parent_id, type_, checkpoint, metadata_type, metadata = row
+        writes = self._db().execute(
+            "SELECT task_id, channel, type, value FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? "
+            "ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint=self.serde.loads_typed((type_, checkpoint)),
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_id,
+                    }
+                }
+                if parent_id
+                else None
+            ),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((t, v)))
+                for task_id, channel, t, v in writes
+            ],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """지정한(없으면 최신) 체크포인트를 반환합니다. 만료된 스레드는 None."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+        with self._lock:
+            if self._expired(thread_id):
+                return None
+            query = (
+                "SELECT checkpoint_id, parent_id, type, checkpoint, metadata_type, metadata "
+                "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+            )
+            if checkpoint_id:
+                row = self._db().execute(
+                    query + "AND checkpoint_id = ?", (thread_id, checkpoint_ns, checkpoint_id)
+                ).fetchone()
+            else:
+                row = self._db().execute(
+                    query + "ORDER BY checkpoint_id DESC LIMIT 1", (thread_id, checkpoint_ns)
+                ).fetchone()
+            return self._tuple(thread_id, checkpoint_ns, row) if row else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """체크포인트를 최신순으로 나열합니다."""
+        conditions, params = [], []
+        if config:
+            conditions.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if config["configurable"].get("checkpoint_ns") is not None:
+                conditions.append("checkpoint_ns = ?")
+                params.append(config["configurable"]["checkpoint_ns"])
+            if checkpoint_id := get_checkpoint_id(config):
+                conditions.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            conditions.append("checkpoint_id < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_id, type, checkpoint, "
+                f"metadata_type, metadata FROM checkpoints {where}"
+                "ORDER BY checkpoint_id DESC",
+                params,
+            ).fetchall()
+            results = []
+            for thread_id, checkpoint_ns, *row in rows:
+                if self._expired(thread_id):
+                    continue
+                item = self._tuple(thread_id, checkpoint_ns, tuple(row))
+                if filter and not all(item.metadata.get(k) == v for k, v in filter.items()):
+                    continue
+                results.append(item)
+                if limit is not None and len(results) >= limit:
+                    break
+        yield from results
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """체크포인트 전체(channel_values 포함)를 한 행으로 저장합니다."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        type_, blob = self.serde.dumps_typed(checkpoint)
+        metadata_type, metadata_blob = self.serde.dumps_typed(
+            get_checkpoint_metadata(config, metadata)
+        )
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    config["configurable"].get("checkpoint_id"),
+                    type_,
+                    sqlite3.Binary(blob),
+                    metadata_type,
+                    sqlite3.Binary(metadata_blob),
+                ),
+            )
+            db.execute(
+                "INSERT OR REPLACE INTO threads VALUES (?, ?)", (thread_id, time.time())
+            )
+            db.commit()
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """체크포인트에 연결된 중간 쓰기를 저장합니다."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            type_, blob = self.serde.dumps_typed(value)
+            rows.append((
+                thread_id, checkpoint_ns, checkpoint_id, task_id,
+                WRITES_IDX_MAP.get(channel, idx), channel, type_, sqlite3.Binary(blob),
+                task_path,
+            ))
+        with self._lock:
+            db = self._db()
+            # 특수 채널(오류, 인터럽트 등, idx < 0)은 덮어쓰고 일반 쓰기는 처음 것을 유지
+            for mode, selected in (
+                ("REPLACE", [r for r in rows if r[4] < 0]),
+                ("IGNORE", [r for r in rows if r[4] >= 0]),
+            ):
+                if selected:
+                    db.executemany(
+                        f"INSERT OR {mode} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        selected,
+                    )
+            db.commit()
+
+    def delete_thread(self, thread_id: str) -> None:
+        """스레드의 모든 체크포인트와 쓰기를 삭제합니다."""
+        with self._lock:
+            db = self._db()
+            for table in ("checkpoints", "writes", "threads"):
+                db.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+            db.commit()
+
+    def compact(self) -> Dict[str, int]:
+        """만료된 스레드를 지우고 스레드마다 최신 max_checkpoints개만 남깁니다.
+
+        Returns:
+            삭제한 스레드 수와 체크포인트 수
+        """
+        with self._lock:
+            db = self._db()
+            expired = 0
+            if self.ttl:
+                cutoff = time.time() - self.ttl
+                stale = "SELECT thread_id FROM threads WHERE updated < ?"
+                db.execute(f"DELETE FROM checkpoints WHERE thread_id IN ({stale})", (cutoff,))
+                db.execute(f"DELETE FROM writes WHERE thread_id IN ({stale})", (cutoff,))
+                expired = db.execute("DELETE FROM threads WHERE updated < ?", (cutoff,)).rowcount
+            trimmed = db.execute(
+                "DELETE FROM checkpoints WHERE rowid IN ("
+                "SELECT rowid FROM ("
+                "SELECT rowid, ROW_NUMBER() OVER ("
+                "PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC) AS rank "
+                "FROM checkpoints) WHERE rank > ?)",
+                (self.max_checkpoints,),
+            ).rowcount
+            db.execute(
+                "DELETE FROM writes WHERE NOT EXISTS ("
+                "SELECT 1 FROM checkpoints c WHERE c.thread_id = writes.thread_id "
+                "AND c.checkpoint_ns = writes.checkpoint_ns "
+                "AND c.checkpoint_id = writes.checkpoint_id)"
+            )
+            db.commit()
+            self.compactions += 1
+        return {"expired_threads": expired, "trimmed_checkpoints": trimmed}
+
+    def stats(self) -> Dict[str, int]:
+        """저장된 스레드/체크포인트/쓰기 수와 정리 횟수를 반환합니다."""
+        with self._lock:
+            db = self._db()
+            counts = {
+                table: db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("threads", "checkpoints", "writes")
+            }
+        return {**counts, "compactions": self.compactions}
+
+    def close(self) -> None:
+        """백그라운드 정리를 멈추고 연결을 닫습니다."""
+        self._stop.set()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # 비동기 메서드는 SQLite 호출(과 정리 중 잠금 대기)을 워커 스레드에서 실행해 이벤트 루프를 막지 않음
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """get_tuple을 워커 스레드에서 실행합니다."""
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        """list 결과를 워커 스레드에서 모두 읽은 뒤 하나씩 반환합니다."""
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """put을 워커 스레드에서 실행합니다."""
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """put_writes를 워커 스레드에서 실행합니다."""
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        """delete_thread를 워커 스레드에서 실행합니다."""
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        """채널의 다음 버전을 만듭니다 (MemorySaver와 같은 "단조 증가 정수.난수" 형식)."""
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+
+def get_checkpointer(kind: str = CHECKPOINTER) -> BaseCheckpointSaver:
+    """CHECKPOINTER 설정에 맞는 체크포인터를 만듭니다."""
+    if kind == "sqlite":
+        return SQLiteCheckpointSaver()
+    if kind == "memory":
+        from langgraph.checkpoint.memory import MemorySaver
+
+        return MemorySaver()
+    raise ValueError(f"알 수 없는 CHECKPOINTER 값입니다: {kind}")
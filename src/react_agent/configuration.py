@@ -22,6 +22,32 @@ class Configuration:
         },
     )
 
+    model: str = field(
+        default="claude-3-5-haiku-20241022",
+        metadata={
+            "description": "The Anthropic chat model that powers the agent. "
+            "The model client and compiled agent are cached per model."
+        },
+    )
+
+    agent_mode: str = field(
+        default="nested",
+        metadata={
+            "description": "How call_model runs the model. 'nested' runs a ReAct agent with "
+            "its own tool loop inside call_model. 'flat' makes one tool-bound model call per "
+            "step and leaves tool execution to the graph's tools node."
+        },
+    )
+
+    context_token_budget: int = field(
+        default=12000,
+        metadata={
+            "description": "Token budget for the conversation history sent to the model "
+            "(rolling summary plus recent turns, excluding the system prompt). Older turns "
+            "are folded into the summary when it is exceeded. 0 sends the full history."
+        },
+    )
+
     mcp_tools: str = field(
         default="mcp_config.json",
         metadata={"description": "The path to the MCP tools configuration file."},
@@ -35,12 +61,104 @@ class Configuration:
     )
     
     max_search_results: int = field(
-        default=3,
+        default=10,
         metadata={
             "description": "The maximum number of search results to return from search tools."
         },
     )
 
+    search_debug: bool = field(
+        default=False,
+        metadata={
+            "description": "Append a per-stage latency breakdown (rewrite, embed, "
+            "search, rerank, project) to the search tool results."
+        },
+    )
+
+    speculative_search: bool = field(
+        default=False,
+        metadata={
+            "description": "Start the raw-query search in parallel with the LLM query "
+            "rewrite and fuse both candidate sets when the rewrite arrives."
+        },
+    )
+
+    rewrite_deadline_ms: int = field(
+        default=0,
+        metadata={
+            "description": "In speculative mode, the maximum time in milliseconds to wait "
+            "for the query rewrite before returning raw-query results. 0 waits indefinitely."
+        },
+    )
+
+    structural_lookup: bool = field(
+        default=True,
+        metadata={
+            "description": "Answer queries that consist only of one article or item "
+            "reference (e.g. '제3조 정의', '외국환거래법 제2장 제10조 제3항') directly from the "
+            "structural index, skipping the query rewrite and the vector search. A leading law "
+            "name and the article's own title are allowed; queries with any other content or "
+            "several references use the normal pipeline."
+        },
+    )
+
+    cross_encoder_rerank: bool = field(
+        default=False,
+        metadata={
+            "description": "Rerank the top first-stage candidates with a CPU cross-encoder "
+            "(skipped when the top vector score is already decisive)."
+        },
+    )
+
+    compact_search_results: bool = field(
+        default=True,
+        metadata={
+            "description": "Render search results compactly: merge each 항 under its 조, "
+            "strip <개정 …> annotations and drop repeated law-level metadata."
+        },
+    )
+
+    search_result_token_budget: int = field(
+        default=2000,
+        metadata={
+            "description": "Token budget for the rendered search results of one tool call. "
+            "0 disables the budget."
+        },
+    )
+
+    context_expansion_depth: int = field(
+        default=0,
+        metadata={
+            "description": "Expand each search hit with its parent 조 and this many "
+            "neighbouring 항 on each side, fetched in one request by chunk id. 0 disables it."
+        },
+    )
+
+    mmr_lambda: float = field(
+        default=0.7,
+        metadata={
+            "description": "Relevance weight of the 'mmr' reranking method, between 0 and 1. "
+            "Lower values favour diverse results over near-duplicate 항 of the same 조."
+        },
+    )
+
+    semantic_cache: bool = field(
+        default=False,
+        metadata={
+            "description": "Return the cached results of an earlier search whose raw query "
+            "embedding is within semantic_cache_threshold of the new query, skipping the "
+            "rewrite, search and rerank stages."
+        },
+    )
+
+    semantic_cache_threshold: float = field(
+        default=0.95,
+        metadata={
+            "description": "Minimum cosine similarity between query embeddings for a "
+            "semantic cache hit."
+        },
+    )
+
     @classmethod
     def from_runnable_config(
         cls, config: Optional[RunnableConfig] = None
@@ -0,0 +1,147 @@
+"""Token-budgeted conversation window with an incremental rolling summary.
+
+``call_model`` used to send the system prompt plus every message in the state
+on every step. ``build_window`` sends only the newest turns that fit within the
+token budget. Older turns are folded into ``State.summary``, and
+``State.summarized_through`` records the ID of the last message folded in.
+The cut always falls on a user message, so an AI tool call is never separated
+from its tool results. When the window overflows, it is cut down to
+``CONTEXT_WINDOW_TARGET_RATIO`` of the budget, and only the newly dropped
+messages are merged into the existing summary. The summary is therefore
+refreshed once every few turns, not regenerated on every step.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence
+
+from langchain_core.messages import (
+    AIMessage,
+    AnyMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langgraph.constants import TAG_NOSTREAM
+
+from react_agent.prompts import SUMMARY_PROMPT
+from react_agent.render import count_tokens
+from react_agent.utils import get_message_text
+
+# 넘쳤을 때 잘라낸 뒤 창이 차지할 예산 비율 (요약 갱신이 매 턴 일어나지 않도록 여유를 둠)
+CONTEXT_WINDOW_TARGET_RATIO = float(os.environ.get("CONTEXT_WINDOW_TARGET_RATIO", "0.5"))
+# 요약에 넣을 때 메시지 하나당 최대 문자 수
+SUMMARY_MESSAGE_CHARS = int(os.environ.get("SUMMARY_MESSAGE_CHARS", "1000"))
+SUMMARY_MAX_WORDS = int(os.environ.get("SUMMARY_MAX_WORDS", "300"))
+
+
+@dataclass
+class Window:
+    """모델에 보낼 메시지 창과 요약 상태."""
+
+    messages: List[AnyMessage]
+    summary: str
+    summarized_through: Optional[str]
+    dropped: List[AnyMessage]
+    """이번에 새로 창 밖으로 밀려나 요약에 합쳐야 하는 메시지"""
+
+
+def message_tokens(message: AnyMessage) -> int:
+    """메시지 하나의 토큰 수 (도구 호출 인자 포함)."""
+    tokens = count_tokens(get_message_text(message))
+    if isinstance(message, AIMessage) and message.tool_calls:
+        tokens += count_tokens(json.dumps(message.tool_calls, ensure_ascii=False))
+    return tokens
+
+
+def build_window(
+    messages: Sequence[AnyMessage],
+    summary: str,
+    summarized_through: Optional[str],
+    token_budget: int,
+) -> Window:
+    """요약 이후의 메시지 중 예산 안에 들어가는 최신 턴들을 고릅니다.
+
+    Args:
+        messages: 상태의 전체 메시지
+        summary: 현재 요약
+        summarized_through: 요약에 합쳐진 마지막 메시지의 ID (없으면 None)
+        token_budget: 요약과 창을 합친 토큰 예산. 0 이하이면 자르지 않음
+
+    Returns:
+        창에 남길 메시지, 그리고 요약에 새로 합칠 메시지 (없으면 빈 리스트)
+    """
+    start = 0
+    if summarized_through is not None:
+        ids = [m.id for m in messages]
+        if summarized_through in ids:
+            start = ids.index(summarized_through) + 1
+        else:
+            # 요약 기준 메시지가 사라졌으면 (대화가 교체됨) 요약을 버림
+            summary, summarized_through = "", None
+
+    tail = list(messages[start:])
+    if token_budget <= 0:
+        return Window(tail, summary, summarized_through, [])
+
+    tokens = [message_tokens(m) for m in tail]
+    if count_tokens(summary) + sum(tokens) <= token_budget:
+        return Window(tail, summary, summarized_through, [])
+
+    # 사용자 메시지에서만 자르고, 최신 턴부터 목표 예산까지 채움
+    boundaries = [i for i, m in enumerate(tail) if isinstance(m, HumanMessage)]
+    target = token_budget * CONTEXT_WINDOW_TARGET_RATIO
+    cut = boundaries[-1] if boundaries else 0
+    for boundary in reversed(boundaries):
+        if sum(tokens[boundary:]) > target:
+            break
+        cut = boundary
+    if cut == 0:
+        # 현재 턴 하나가 예산을 넘으면 더 자를 수 없음
+        return Window(tail, summary, summarized_through, [])
+    return Window(tail[cut:], summary, summarized_through, tail[:cut])
+
+
+def _render_for_summary(message: AnyMessage) -> str:
+    text = get_message_text(message)[:SUMMARY_MESSAGE_CHARS]
+    if isinstance(message, HumanMessage):
+        return f"사용자: {text}"
+    if isinstance(message, ToolMessage):
+        return f"도구 결과({message.name or message.tool_call_id}): {text}"
+    if isinstance(message, AIMessage) and message.tool_calls:
+        calls = ", ".join(
+            f"{c['name']}({json.dumps(c['args'], ensure_ascii=False)})" for c in message.tool_calls
+        )
+        return f"어시스턴트 도구 호출: {calls}" + (f"\n어시스턴트: {text}" if text else "")
+    return f"어시스턴트: {text}"
+
+
+async def update_summary(
+    model: Any, summary: str, dropped: Sequence[AnyMessage]
+) -> str:
+    """창 밖으로 밀려난 메시지를 기존 요약에 합친 새 요약을 만듭니다.
+
+    Args:
+        model: 요약에 쓸 채팅 모델 (도구 바인딩 없음). 이 호출은 메시지 스트림에 나오지 않음
+        summary: 현재 요약 (없으면 빈 문자열)
+        dropped: 새로 요약에 합칠 메시지
+    """
+    transcript = "\n".join(_render_for_summary(m) for m in dropped)
+    # 요약 토큰이 stream_mode="messages"로 답변처럼 클라이언트에 전달되지 않도록 제외
+    response = await model.with_config(tags=[TAG_NOSTREAM]).ainvoke([
+        SystemMessage(content=SUMMARY_PROMPT.format(max_words=SUMMARY_MAX_WORDS)),
+        HumanMessage(
+            content=f"현재 요약:\n{summary or '(없음)'}\n\n새 메시지:\n{transcript}\n\n업데이트된 요약:"
+        ),
+    ])
+    return get_message_text(response).strip()
+
+
+def with_summary(system_message: str, summary: str) -> str:
+    """시스템 프롬프트 뒤에 이전 대화 요약을 붙입니다."""
+    if not summary:
+        return system_message
+    return f"{system_message}\n\n이전 대화 요약:\n{summary}"
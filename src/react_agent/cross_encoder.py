@@ -0,0 +1,152 @@
+"""Optional cross-encoder reranking stage.
+
+A cross-encoder reads the query and a chunk together, so it ranks more precisely
+than vector or BM25 scores but costs a transformer forward pass per pair. To
+bound that cost, only the top ``max_candidates`` of the first-stage ranking are
+scored. All pairs go through one batched ``predict`` call with a capped
+sequence length. Pair scores are cached by (normalized query, passage hash), and
+the stage is skipped when the top first-stage score is already well ahead of
+the runner-up.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from react_agent.cache import LRUCache
+from react_agent.utils import normalize_query
+
+# 한국어 질문/조문에 맞게 다국어 mMARCO 모델을 기본으로 사용
+CROSS_ENCODER_MODEL = os.environ.get(
+    "CROSS_ENCODER_MODEL", "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"
+)
+CROSS_ENCODER_MAX_LENGTH = int(os.environ.get("CROSS_ENCODER_MAX_LENGTH", "256"))
+CROSS_ENCODER_BATCH_SIZE = int(os.environ.get("CROSS_ENCODER_BATCH_SIZE", "32"))
+# 교차 인코딩할 최대 후보 수 (지연 시간 상한)
+CROSS_ENCODER_MAX_CANDIDATES = int(os.environ.get("CROSS_ENCODER_MAX_CANDIDATES", "20"))
+# 1위 점수가 2위보다 이 비율 이상 앞서면 교차 인코더 생략 (비율의 기준은 is_decisive 참고)
+CROSS_ENCODER_SKIP_MARGIN = float(os.environ.get("CROSS_ENCODER_SKIP_MARGIN", "0.15"))
+CROSS_ENCODER_CACHE_SIZE = int(os.environ.get("CROSS_ENCODER_CACHE_SIZE", "10000"))
+CROSS_ENCODER_CACHE_TTL = float(os.environ.get("CROSS_ENCODER_CACHE_TTL", "86400"))
+
+
+def is_decisive(hits: Sequence[Dict[str, Any]], margin: float) -> bool:
+    """1위 점수가 2위보다 margin 비율 이상 앞서는지 확인합니다.
+
+    코사인 점수는 1위 점수 대비 차이로 비교합니다. RRF/DBSF 같은 융합 점수
+    (hit["score_source"])는 절대 크기에 의미가 없으므로 후보 점수 범위(1위 - 최하위)
+    대비 차이로 비교합니다.
+    """
+    if len(hits) < 2 or margin <= 0:
+        return len(hits) < 2
+    scores = sorted((hit["score"] for hit in hits), reverse=True)
+    first, second = scores[:2]
+    if any(hit.get("score_source", "cosine") != "cosine" for hit in hits):
+        spread = first - scores[-1]
+        return len(scores) >= 3 and spread > 0 and (first - second) / spread >= margin
+    return first > 0 and (first - second) / first >= margin
+
+
+class CrossEncoderReranker:
+    """(질문, 청크) 쌍을 배치로 교차 인코딩해 후보를 재정렬합니다."""
+
+    def __init__(
+        self,
+        predict: Callable[[List[Tuple[str, str]]], Sequence[float]],
+        *,
+        model_name: str = CROSS_ENCODER_MODEL,
+        max_candidates: int = CROSS_ENCODER_MAX_CANDIDATES,
+        skip_margin: float = CROSS_ENCODER_SKIP_MARGIN,
+        cache: Optional[LRUCache[float]] = None,
+    ) -> None:
+        """Create the reranker.
+
+        Args:
+            predict: 쌍 목록을 받아 점수 목록을 반환하는 함수 (한 번의 배치 forward)
+            model_name: 캐시 키에 포함할 모델 이름
+            max_candidates: 교차 인코딩할 최대 후보 수
+            skip_margin: 1위 점수가 이 비율 이상 앞서면 교차 인코딩 생략 (is_decisive 참고)
+            cache: 쌍 점수 캐시 (None이면 기본 크기의 LRU 캐시)
+        """
+        self.predict = predict
+        self.model_name = model_name
+        self.max_candidates = max_candidates
+        self.skip_margin = skip_margin
+        self.cache = cache or LRUCache(CROSS_ENCODER_CACHE_SIZE, CROSS_ENCODER_CACHE_TTL)
+        self.skipped = 0
+        self.scored_pairs = 0
+        self._lock = threading.Lock()
+
+    def key(self, query: str, text: str) -> str:
+        """쌍 점수 캐시 키를 만듭니다 (청크 ID는 유일하지 않으므로 본문 해시 사용)."""
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{self.model_name}\x00{normalize_query(query)}\x00{digest}"
+
+    def scores(self, query: str, hits: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """후보들의 교차 인코더 점수를 계산합니다 (캐시에 없는 쌍만 한 번에 예측)."""
+        texts = [hit["payload"].get("cleaned_content", "") for hit in hits]
+        keys = [self.key(query, text) for text in texts]
+        scores = np.zeros(len(hits), dtype=np.float32)
+        missing = []
+        for i, key in enumerate(keys):
+            cached = self.cache.get(key)
+            if cached is None:
+                missing.append(i)
+            else:
+                scores[i] = cached
+        if missing:
+            pairs = [(query, texts[i]) for i in missing]
+            predicted = np.asarray(self.predict(pairs), dtype=np.float32)
+            for i, score in zip(missing, predicted):
+                scores[i] = score
+                self.cache.set(keys[i], float(score))
+            with self._lock:
+                self.scored_pairs += len(missing)
+        return scores
+
+    def rerank(
+        self, query: str, hits: List[Dict[str, Any]], top_k: int
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """1차 순위의 상위 후보를 교차 인코더 점수로 재정렬합니다.
+
+        Returns:
+            (상위 top_k개 후보, 교차 인코딩을 생략했는지 여부)
+        """
+        if is_decisive(hits, self.skip_margin):
+            with self._lock:
+                self.skipped += 1
+            return hits[:top_k], True
+        candidates = hits[: max(top_k, self.max_candidates)]
+        scores = self.scores(query, candidates)
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return [candidates[i] for i in order], False
+
+    def stats(self) -> Dict[str, Any]:
+        """생략 횟수, 예측한 쌍 수, 캐시 통계를 반환합니다."""
+        return {
+            "skipped": self.skipped,
+            "scored_pairs": self.scored_pairs,
+            "cache": self.cache.stats(),
+        }
+
+
+@lru_cache(maxsize=None)
+def get_cross_encoder_reranker() -> CrossEncoderReranker:
+    """교차 인코더를 처음 호출될 때 한 번만 로드합니다 (CPU, max_length 제한)."""
+    from sentence_transformers import CrossEncoder
+
+    print(f"📌 교차 인코더 로드: {CROSS_ENCODER_MODEL} (max_length={CROSS_ENCODER_MAX_LENGTH})")
+    model = CrossEncoder(
+        CROSS_ENCODER_MODEL, max_length=CROSS_ENCODER_MAX_LENGTH, device="cpu"
+    )
+    return CrossEncoderReranker(
+        lambda pairs: model.predict(
+            pairs, batch_size=CROSS_ENCODER_BATCH_SIZE, show_progress_bar=False
+        )
+    )
@@ -0,0 +1,250 @@
+"""Micro-batching executor for query embeddings.
+
+Encoding runs on a worker thread instead of the event loop. Queries that arrive
+within a short window are coalesced into one batched ``encode`` call, and each
+caller gets its own future back. An optional ``EmbeddingCache`` short-circuits
+repeated queries before they reach the queue.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from react_agent.cache import DiskCache, LRUCache
+from react_agent.utils import normalize_query
+
+# 배치 크기 / 대기 시간 설정 (환경 변수로 조정 가능)
+EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_MAX_WAIT_MS = float(os.environ.get("EMBEDDING_MAX_WAIT_MS", "5"))
+
+# 임베딩 캐시 설정 (EMBEDDING_CACHE_PATH가 비어 있으면 디스크 캐시 미사용)
+EMBEDDING_CACHE_SIZE = int(os.environ.get("EMBEDDING_CACHE_SIZE", "1024"))
+EMBEDDING_CACHE_TTL = float(os.environ.get("EMBEDDING_CACHE_TTL", "86400"))
+EMBEDDING_CACHE_PATH = os.environ.get("EMBEDDING_CACHE_PATH", "")
+
+# 임베딩 백엔드: "torch"(SentenceTransformer) 또는 "onnx"(onnxruntime, torch 불필요)
+# ONNX 모델은 preprocessing/export_onnx_model.py로 미리 만들어 둠
+EMBEDDING_BACKEND = os.environ.get("EMBEDDING_BACKEND", "torch")
+EMBEDDING_ONNX_PATH = os.environ.get(
+    "EMBEDDING_ONNX_PATH", "finto/models/all-MiniLM-L6-v2-onnx"
+)
+EMBEDDING_ONNX_QUANTIZED = os.environ.get("EMBEDDING_ONNX_QUANTIZED", "false").lower() in (
+    "1", "true", "yes"
+)
+EMBEDDING_ONNX_THREADS = int(os.environ.get("EMBEDDING_ONNX_THREADS", "0"))
+
+
+def embedding_model_id(model_name: str, backend: str = EMBEDDING_BACKEND) -> str:
+    """캐시 키에 쓸 모델 식별자 (백엔드/양자화에 따라 벡터가 조금씩 다르므로 구분)."""
+    if backend == "onnx":
+        return f"{model_name}:onnx{'-int8' if EMBEDDING_ONNX_QUANTIZED else ''}"
+    return model_name
+
+
+def load_embedding_model(model_name: str, backend: str = EMBEDDING_BACKEND) -> Any:
+    """``encode(texts, batch_size=...)``를 제공하는 임베딩 모델을 만듭니다.
+
+    Args:
+        model_name: SentenceTransformer 모델 이름 (torch 백엔드)
+        backend: "torch" 또는 "onnx" (EMBEDDING_ONNX_PATH의 내보낸 모델 사용)
+    """
+    if backend == "onnx":
+        from react_agent.onnx_embedding import OnnxEncoder
+
+        return OnnxEncoder(
+            EMBEDDING_ONNX_PATH,
+            quantized=EMBEDDING_ONNX_QUANTIZED,
+            threads=EMBEDDING_ONNX_THREADS,
+        )
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+
+        return SentenceTransformer(model_name)
+    raise ValueError(f"알 수 없는 EMBEDDING_BACKEND 값입니다: {backend}")
+
+
+class EmbeddingCache:
+    """정규화된 쿼리 + 모델 이름을 키로 하는 임베딩 캐시 (메모리 LRU + 선택적 디스크)."""
+
+    def __init__(
+        self,
+        model_name: str,
+        *,
+        maxsize: int = EMBEDDING_CACHE_SIZE,
+        ttl: Optional[float] = EMBEDDING_CACHE_TTL,
+        disk_path: Optional[str] = EMBEDDING_CACHE_PATH,
+    ) -> None:
+        """Create the cache.
+
+        Args:
+            model_name: 임베딩 모델 이름 (모델이 바뀌면 키도 달라짐)
+            maxsize: 메모리에 유지할 최대 항목 수
+            ttl: 항목 유효 시간(초). None 또는 0이면 만료 없음
+            disk_path: 디스크 캐시(SQLite) 경로. 비어 있으면 메모리만 사용
+        """
+        self.model_name = model_name
+        self.memory: LRUCache[np.ndarray] = LRUCache(maxsize, ttl)
+        self.disk = DiskCache(disk_path, ttl=ttl) if disk_path else None
+
+    def key(self, text: str) -> str:
+        """캐시 키를 만듭니다."""
+        return f"{self.model_name}\x00{normalize_query(text)}"
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """캐시된 벡터를 반환합니다 (디스크 히트는 메모리로 승격)."""
+        key = self.key(text)
+        vector = self.memory.get(key)
+        if vector is None and self.disk is not None:
+            raw = self.disk.get(key)
+            if raw is not None:
+                vector = np.frombuffer(raw, dtype=np.float32)
+                self.memory.set(key, vector)
+        return vector
+
+    def set(self, text: str, vector: np.ndarray) -> None:
+        """벡터를 저장합니다."""
+        key = self.key(text)
+        vector = np.asarray(vector, dtype=np.float32)
+        self.memory.set(key, vector)
+        if self.disk is not None:
+            self.disk.set(key, vector.tobytes())
+
+    def stats(self) -> Dict[str, Any]:
+        """메모리/디스크 계층별 히트·미스 카운터를 반환합니다."""
+        stats = {"memory": self.memory.stats()}
+        if self.disk is not None:
+            stats["disk"] = self.disk.stats()
+        return stats
+
+
+class EmbeddingExecutor:
+    """쿼리 임베딩 요청을 모아 워커 스레드에서 배치로 인코딩합니다."""
+
+    def __init__(
+        self,
+        encode: Callable[[List[str]], np.ndarray],
+        *,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+        max_wait_ms: float = EMBEDDING_MAX_WAIT_MS,
+        cache: Optional[EmbeddingCache] = None,
+    ) -> None:
+        """Create the executor.
+
+        Args:
+            encode: 텍스트 리스트를 받아 (N, dim) 배열을 반환하는 함수
+            batch_size: 한 번에 인코딩할 최대 쿼리 수
+            max_wait_ms: 첫 요청 이후 추가 요청을 기다리는 최대 시간(ms)
+            cache: 쿼리 임베딩 캐시 (선택)
+        """
+        self._encode = encode
+        self.cache = cache
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: "queue.Queue[Tuple[str, Future[np.ndarray]]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+        self._batches = 0
+        self._encoded = 0
+        self._max_queue_depth = 0
+
+    def submit(self, text: str) -> Future[np.ndarray]:
+        """쿼리 하나를 큐에 넣고 결과 벡터에 대한 future를 반환합니다."""
+        future: Future[np.ndarray] = Future()
+        self._ensure_worker()
+        self._queue.put((text, future))
+        depth = self._queue.qsize()
+        if depth > self._max_queue_depth:
+            self._max_queue_depth = depth
+        return future
+
+    def submit_many(self, texts: Sequence[str]) -> List[Future[np.ndarray]]:
+        """여러 쿼리를 한꺼번에 큐에 넣습니다."""
+        return [self.submit(text) for text in texts]
+
+    async def embed(self, text: str) -> np.ndarray:
+        """이벤트 루프를 막지 않고 쿼리 임베딩을 기다립니다."""
+        return (await self.embed_many([text]))[0]
+
+    async def embed_many(self, texts: Sequence[str]) -> List[np.ndarray]:
+        """여러 쿼리의 임베딩을 기다립니다 (같은 배치로 묶일 수 있음).
+
+        캐시가 있으면 정규화된 쿼리로 조회하고, 미스만 인코딩합니다.
+        """
+        if self.cache is None:
+            futures = self.submit_many(texts)
+            return list(await asyncio.gather(*(asyncio.wrap_future(f) for f in futures)))
+
+        vectors: List[Optional[np.ndarray]] = [self.cache.get(t) for t in texts]
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        futures = self.submit_many([normalize_query(texts[i]) for i in missing])
+        encoded = await asyncio.gather(*(asyncio.wrap_future(f) for f in futures))
+        for i, vector in zip(missing, encoded):
+            self.cache.set(texts[i], vector)
+            vectors[i] = vector
+        return vectors  # type: ignore[return-value]
+
+    def stats(self) -> Dict[str, Any]:
+        """큐 깊이와 배치 통계(캐시가 있으면 캐시 통계 포함)를 반환합니다."""
+        stats: Dict[str, Any] = {
+            "queue_depth": self._queue.qsize(),
+            "max_queue_depth": self._max_queue_depth,
+            "batches": self._batches,
+            "encoded": self._encoded,
+            "avg_batch_size": self._encoded / self._batches if self._batches else 0.0,
+        }
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        return stats
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="embedding-executor", daemon=True
+                )
+                self._worker.start()
+
+    def _collect_batch(self) -> List[Tuple[str, Future[np.ndarray]]]:
+        # 첫 요청은 블로킹으로 기다리고, 이후 max_wait 동안 추가 요청을 모음
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = [
+                (text, future)
+                for text, future in self._collect_batch()
+                if future.set_running_or_notify_cancel()
+            ]
+            if not batch:
+                continue
+            try:
+                vectors = self._encode([text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self._batches += 1
+            self._encoded += len(batch)
+            for (_, future), vector in zip(batch, vectors):
+                future.set_result(vector)
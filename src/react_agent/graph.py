@@ -1,7 +1,8 @@
 from dotenv import load_dotenv
 load_dotenv()
 from datetime import datetime, timezone
-from typing import Dict, List, Literal, cast, Any, Annotated
+from functools import lru_cache
+from typing import Dict, List, Literal, cast, Any, Annotated, Callable, Tuple
 import os
 import sys
 import json
@@ -9,34 +10,84 @@ import json
 from langchain_core.messages import AIMessage, SystemMessage
 from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph
-from langgraph.prebuilt import ToolNode
 from pathlib import Path
+from react_agent.checkpointer import get_checkpointer
 from react_agent.configuration import Configuration
+from react_agent.context_window import build_window, update_summary, with_summary
 from react_agent.state import InputState, State
-from react_agent.tools import TOOLS, qdrant_search_reranked
+from react_agent.tool_results import ToolResultNode, expand_current_turn
+from react_agent.tools import TOOLS, qdrant_search_batch, qdrant_search_reranked
 from react_agent import utils
 from langgraph.prebuilt import create_react_agent
-from langchain_anthropic import ChatAnthropic
-from langgraph.checkpoint.memory import MemorySaver
 from langchain_core.runnables import RunnableConfig
 from langgraph.prebuilt.tool_node import InjectedToolArg
 
 
-memory = MemorySaver()
+# 대화 상태(메시지, 요약, 도구 결과 참조)를 thread_id별로 저장하는 바깥 그래프의 체크포인터
+# (CHECKPOINTER로 sqlite/memory 선택)
+memory = get_checkpointer()
+
+
+@lru_cache(maxsize=None)
+def get_chat_model(model: str) -> Any:
+    """모델 이름별 ChatAnthropic을 한 번만 만들어 재사용합니다.
+
+    langchain_anthropic은 같은 설정의 클라이언트끼리 httpx 커넥션 풀을 공유하므로
+    인스턴스를 재사용하면 HTTP 클라이언트도 공유됩니다.
+    """
+    # langchain_anthropic은 import 비용이 커서 처음 호출될 때 로드
+    from langchain_anthropic import ChatAnthropic
+
+    return ChatAnthropic(model=model, temperature=0.0, max_tokens=8192)
+
+
+@lru_cache(maxsize=32)
+def get_agent(model: str, tools: Tuple[Callable[..., Any], ...]) -> Any:
+    """(모델, 도구 목록)별로 컴파일한 ReAct 에이전트를 재사용합니다.
+
+    도구 스키마 생성과 그래프 컴파일을 턴마다 반복하지 않도록 캐시합니다.
+    시스템 프롬프트는 호출 시각을 포함해 매번 메시지로 전달하므로 키에 넣지 않습니다.
+    내부 에이전트의 도구 결과도 참조로 바꾸고 현재 턴 결과만 펼쳐 모델에 보냅니다.
+    대화 기록은 바깥 그래프의 상태에서 매번 전달하므로 내부 에이전트는 체크포인트하지 않습니다.
+    """
+    return create_react_agent(
+        get_chat_model(model),
+        ToolResultNode(list(tools)),
+        prompt=_agent_prompt,
+        checkpointer=False,
+    )
+
+
+def _agent_prompt(state: Dict[str, Any]) -> List[Any]:
+    return expand_current_turn(state["messages"])
+
+
+@lru_cache(maxsize=32)
+def get_tool_model(model: str, tools: Tuple[Callable[..., Any], ...]) -> Any:
+    """flat 모드에서 사용할, 도구 스키마를 바인딩한 모델을 재사용합니다."""
+    return get_chat_model(model).bind_tools(list(tools))
 
 async def call_model(
     state: State, config: RunnableConfig
-) -> Dict[str, List[AIMessage]]:
+) -> Dict[str, Any]:
     """Call the LLM powering our "agent".
 
     This function prepares the prompt, initializes the model, and processes the response.
 
+    In "nested" agent mode the model runs inside a ReAct agent with its own tool
+    loop over TOOLS. In "flat" mode it makes a single tool-bound model call and
+    the outer graph's "tools" node executes any tool calls.
+
+    History beyond ``context_token_budget`` is folded into the rolling summary in
+    the state, which is sent as part of the system prompt.
+
     Args:
         state (State): The current state of the conversation.
         config (RunnableConfig): Configuration for the model run.
 
     Returns:
-        dict: A dictionary containing the model's response message.
+        dict: A dictionary containing the model's response message, plus the
+        updated summary when older turns were dropped from the window.
     """
     configuration = Configuration.from_runnable_config(config)
 
@@ -45,31 +96,50 @@ async def call_model(
         system_time=datetime.now(tz=timezone.utc).isoformat()
     )
 
-    # 모델 초기화
-    model = ChatAnthropic(
-        model="claude-3-5-haiku-20241022", temperature=0.0, max_tokens=8192
+    # 토큰 예산을 넘는 이전 턴은 요약에 합치고 최신 턴만 보냄
+    window = build_window(
+        expand_current_turn(state.messages),
+        state.summary,
+        state.summarized_through,
+        configuration.context_token_budget,
     )
-    
-    # 기본 도구 설정
-    all_tools = TOOLS
-    
-    # 에이전트 생성
-    agent = create_react_agent(model, all_tools, checkpointer=memory)
-    
-    # Create the messages list
+    summary_update: Dict[str, Any] = {}
+    if window.dropped:
+        summary_update = {
+            "summary": await update_summary(
+                get_chat_model(configuration.model), window.summary, window.dropped
+            ),
+            "summarized_through": window.dropped[-1].id,
+        }
+    elif window.summarized_through != state.summarized_through:
+        summary_update = {"summary": window.summary, "summarized_through": None}
+
+    # Create the messages list (참조로 저장된 도구 결과는 현재 턴 것만 펼침)
     messages = [
-        SystemMessage(content=system_message),
-        *state.messages,
+        SystemMessage(
+            content=with_summary(
+                system_message, summary_update.get("summary", window.summary)
+            )
+        ),
+        *window.messages,
     ]
 
-    # Pass messages with the correct dictionary structure
-    response = cast(
-        AIMessage,
-        await agent.ainvoke(
+    if configuration.agent_mode == "flat":
+        # 모델 호출 한 번, 도구 실행은 바깥 그래프의 tools 노드가 담당
+        model = get_tool_model(configuration.model, tuple(tools_with_params))
+        response = cast(AIMessage, await model.ainvoke(messages, config))
+    elif configuration.agent_mode == "nested":
+        # 설정(모델, 도구)별로 캐시된 에이전트 사용
+        agent = get_agent(configuration.model, tuple(TOOLS))
+
+        # Pass messages with the correct dictionary structure
+        result = await agent.ainvoke(
             {"messages": messages},
             config,
-        ),
-    )
+        )
+        response = cast(AIMessage, result["messages"][-1])
+    else:
+        raise ValueError(f"알 수 없는 agent_mode 값입니다: {configuration.agent_mode}")
 
     # Handle the case when it's the last step and the model still wants to use a tool
     if state.is_last_step and response.tool_calls:
@@ -79,11 +149,12 @@ async def call_model(
                     id=response.id,
                     content="죄송합니다. 지정된 단계 수 내에서 질문에 대한 답변을 찾을 수 없었습니다.",
                 )
-            ]
+            ],
+            **summary_update,
         }
 
     # Return the model's response as a list to be added to existing messages
-    return {"messages": [response["messages"][-1]]}
+    return {"messages": [response], **summary_update}
 
 
 # 명시적인 래퍼 함수 정의 (람다 함수 대신 사용)
@@ -101,7 +172,10 @@ async def qdrant_search_with_params(
     Returns:
         검색 결과 목록
     """
-    return await qdrant_search_reranked(query, top_k=10, config=config)
+    configuration = Configuration.from_runnable_config(config)
+    return await qdrant_search_reranked(
+        query, top_k=configuration.max_search_results, config=config
+    )
 
 
 # Define a new graph
@@ -112,11 +186,12 @@ builder.add_node(call_model)
 
 # 도구 설정 시 파라미터 직접 지정
 tools_with_params = [
-    qdrant_search_with_params
+    qdrant_search_with_params,
+    qdrant_search_batch,
 ]
 
-# 도구 노드 추가
-builder.add_node("tools", ToolNode(tools_with_params))
+# 도구 노드 추가 (큰 결과는 저장소에 두고 상태에는 참조만 남김)
+builder.add_node("tools", ToolResultNode(tools_with_params))
 
 # Set the entrypoint as `call_model`
 # This means that this node is the first one called
@@ -154,6 +229,6 @@ builder.add_conditional_edges(
 # Add an edge from `tools` back to `call_model`
 builder.add_edge("tools", "call_model")
 
-# Finally, compile the graph
-graph = builder.compile()
+# Finally, compile the graph (thread_id별로 대화 상태를 체크포인트)
+graph = builder.compile(checkpointer=memory)
 graph.name = "ReAct Agent"  # This customizes the name in LangSmith
@@ -0,0 +1,249 @@
+"""Corpus-level BM25 index used for lexical reranking.
+
+The index is built once over all chunks by ``preprocessing/2_split_chunks.py``
+and saved next to ``structured_chunks.json``. Row ``i`` is the ``i``-th chunk
+with content, which is also its Qdrant point id. Chunk ids are not unique in
+this corpus, so they cannot be used as keys. At query time scoring a set of
+candidates is a sparse row lookup plus a dot product with the query terms. The
+same document rows are uploaded to Qdrant as sparse vectors for server-side
+hybrid search.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+LEXICAL_INDEX_PATH = os.environ.get(
+    "LEXICAL_INDEX_PATH", "finto/data/intermediate/lexical_index.json"
+)
+
+_WORD_RE = re.compile(r"[0-9A-Za-z가-힣①-⑳]+")
+
+
+def tokenize(text: str, n: int = 2) -> List[str]:
+    """한국어에 맞게 단어와 문자 n-gram으로 토큰화합니다.
+
+    조사/어미가 붙어도 매칭되도록 각 단어를 문자 n-gram으로 쪼개고,
+    정확한 일치를 위해 원래 단어도 함께 포함합니다.
+    """
+    terms: List[str] = []
+    for word in _WORD_RE.findall(unicodedata.normalize("NFC", text).lower()):
+        terms.append(word)
+        if len(word) > n:
+            terms.extend(word[i : i + n] for i in range(len(word) - n + 1))
+    return terms
+
+
+class LexicalIndex:
+    """청크 전체에 대해 미리 계산한 BM25 가중치 (문서 x 어휘 희소 행렬, 행 = 포인트 ID)."""
+
+    def __init__(
+        self,
+        vocab: Dict[str, int],
+        idf: np.ndarray,
+        matrix: sparse.csr_matrix,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> None:
+        """Wrap a prebuilt index (use ``build`` or ``load`` to create one)."""
+        self.vocab = vocab
+        self.idf = idf
+        self.matrix = matrix
+        self.k1 = k1
+        self.b = b
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    @classmethod
+    def build(
+        cls, texts: Sequence[str], k1: float = 1.2, b: float = 0.75
+    ) -> LexicalIndex:
+        """문서 텍스트 목록으로 BM25 인덱스를 만듭니다 (i번째 텍스트가 i번째 행)."""
+        vocab: Dict[str, int] = {}
+        counts = []
+        for text in texts:
+            tf = Counter(tokenize(text))
+            for term in tf:
+                vocab.setdefault(term, len(vocab))
+            counts.append(tf)
+
+        n_docs = len(texts)
+        lengths = np.array([sum(tf.values()) for tf in counts], dtype=np.float64)
+        avgdl = lengths.mean() if n_docs else 0.0
+        df = np.zeros(len(vocab), dtype=np.float64)
+        for tf in counts:
+            for term in tf:
+                df[vocab[term]] += 1
+        idf = np.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+
+        rows, cols, values = [], [], []
+        for row, tf in enumerate(counts):
+            norm = k1 * (1 - b + b * lengths[row] / avgdl) if avgdl else k1
+            for term, freq in tf.items():
+                col = vocab[term]
+                rows.append(row)
+                cols.append(col)
+                values.append(idf[col] * freq * (k1 + 1) / (freq + norm))
+        matrix = sparse.csr_matrix(
+            (values, (rows, cols)), shape=(n_docs, len(vocab)), dtype=np.float32
+        )
+        return cls(vocab, idf.astype(np.float32), matrix, k1, b)
+
+    def _row(self, row: Optional[int]) -> Optional[int]:
+        if row is None or not 0 <= int(row) < len(self):
+            return None
+        return int(row)
+
+    def query_vector(self, text: str) -> Tuple[List[int], List[float]]:
+        """쿼리를 어휘 인덱스/가중치 쌍으로 변환합니다 (모르는 단어는 무시)."""
+        tf = Counter(self.vocab[t] for t in tokenize(text) if t in self.vocab)
+        indices = sorted(tf)
+        return indices, [float(tf[i]) for i in indices]
+
+    def doc_vector(self, row: int) -> Tuple[List[int], List[float]]:
+        """행(포인트 ID)의 BM25 가중치를 희소 벡터(인덱스, 값)로 반환합니다."""
+        row = self._row(row)
+        if row is None:
+            return [], []
+        start, end = self.matrix.indptr[row], self.matrix.indptr[row + 1]
+        return (
+            self.matrix.indices[start:end].tolist(),
+            self.matrix.data[start:end].tolist(),
+        )
+
+    def score(self, query: str, point_ids: Sequence[Optional[int]]) -> np.ndarray:
+        """후보(포인트 ID)들의 BM25 점수를 계산합니다 (인덱스에 없는 행은 0점)."""
+        indices, values = self.query_vector(query)
+        scores = np.zeros(len(point_ids), dtype=np.float32)
+        rows = [self._row(p) for p in point_ids]
+        known = [i for i, r in enumerate(rows) if r is not None]
+        if not indices or not known:
+            return scores
+        q = np.zeros(self.matrix.shape[1], dtype=np.float32)
+        q[indices] = values
+        scores[known] = self.matrix[[rows[i] for i in known]] @ q
+        return scores
+
+    def score_many(
+        self, queries: Sequence[str], point_id_sets: Sequence[Sequence[Optional[int]]]
+    ) -> List[np.ndarray]:
+        """여러 (쿼리, 후보 목록)의 BM25 점수를 한 번의 희소 행렬 곱으로 계산합니다."""
+        owners, rows, positions = [], [], []
+        for q, point_ids in enumerate(point_id_sets):
+            for i, point_id in enumerate(point_ids):
+                row = self._row(point_id)
+                if row is not None:
+                    owners.append(q)
+                    rows.append(row)
+                    positions.append(i)
+        scores = [np.zeros(len(point_ids), dtype=np.float32) for point_ids in point_id_sets]
+        if not rows:
+            return scores
+
+        q_rows, q_cols, q_values = [], [], []
+        for q, query in enumerate(queries):
+            indices, values = self.query_vector(query)
+            q_rows.extend([q] * len(indices))
+            q_cols.extend(indices)
+            q_values.extend(values)
+        query_matrix = sparse.csr_matrix(
+            (q_values, (q_rows, q_cols)),
+            shape=(len(queries), self.matrix.shape[1]),
+            dtype=np.float32,
+        )
+        # (후보 행 x 쿼리) 점수 중 각 후보가 속한 쿼리의 열만 사용
+        products = (self.matrix[rows] @ query_matrix.T).toarray()
+        picked = products[np.arange(len(rows)), owners]
+        for q, i, score in zip(owners, positions, picked):
+            scores[q][i] = score
+        return scores
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON으로 저장할 수 있는 형태로 변환합니다."""
+        terms = [""] * len(self.vocab)
+        for term, i in self.vocab.items():
+            terms[i] = term
+        docs = []
+        for row in range(len(self)):
+            start, end = self.matrix.indptr[row], self.matrix.indptr[row + 1]
+            docs.append([
+                self.matrix.indices[start:end].tolist(),
+                [round(float(v), 6) for v in self.matrix.data[start:end]],
+            ])
+        return {
+            "k1": self.k1,
+            "b": self.b,
+            "vocab": terms,
+            "idf": [round(float(v), 6) for v in self.idf],
+            "docs": docs,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> LexicalIndex:
+        """``to_dict`` 결과로부터 인덱스를 복원합니다.
+
+        Raises:
+            ValueError: 청크 ID를 키로 쓰던 이전 형식인 경우 (중복 ID 행이 사라져 행이 어긋남)
+        """
+        if isinstance(data["docs"], dict):
+            raise ValueError(
+                "청크 ID를 키로 저장한 이전 형식의 어휘 인덱스입니다. "
+                "preprocessing/2_split_chunks.py로 다시 만드세요."
+            )
+        vocab = {term: i for i, term in enumerate(data["vocab"])}
+        rows, cols, values = [], [], []
+        for row, (indices, weights) in enumerate(data["docs"]):
+            rows.extend([row] * len(indices))
+            cols.extend(indices)
+            values.extend(weights)
+        matrix = sparse.csr_matrix(
+            (values, (rows, cols)), shape=(len(data["docs"]), len(vocab)), dtype=np.float32
+        )
+        idf = np.asarray(data["idf"], dtype=np.float32)
+        return cls(vocab, idf, matrix, data["k1"], data["b"])
+
+    def save(self, path: str | Path) -> None:
+        """인덱스를 JSON 파일로 저장합니다."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str | Path) -> LexicalIndex:
+        """JSON 파일에서 인덱스를 읽어옵니다."""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+_index: Optional[LexicalIndex] = None
+_index_loaded = False
+_index_lock = threading.Lock()
+
+
+def get_lexical_index() -> Optional[LexicalIndex]:
+    """처음 호출될 때 인덱스를 읽어 재사용합니다. 파일이 없으면 None."""
+    global _index, _index_loaded
+    if not _index_loaded:
+        with _index_lock:
+            if not _index_loaded:
+                path = Path(LEXICAL_INDEX_PATH)
+                if path.exists():
+                    try:
+                        _index = LexicalIndex.load(path)
+                        print(f"📌 어휘 인덱스 로드: {len(_index)}개 문서 ({path})")
+                    except ValueError as e:
+                        print(f"📌 어휘 인덱스를 사용하지 않고 쿼리별 TF-IDF를 사용합니다: {str(e)}")
+                else:
+                    print(f"📌 어휘 인덱스 파일이 없어 쿼리별 TF-IDF를 사용합니다: {path}")
+                _index_loaded = True
+    return _index
@@ -0,0 +1,164 @@
+"""ONNX Runtime sentence encoder (no torch at serving time).
+
+``export_onnx_model`` converts a sentence-transformers checkpoint to
+``model.onnx`` and, optionally, a dynamically int8-quantized
+``model_int8.onnx``, next to the fast tokenizer's ``tokenizer.json``.
+``OnnxEncoder`` loads that directory with ``onnxruntime`` and ``tokenizers``
+and reproduces the Transformer -> mean pooling -> normalize pipeline of
+all-MiniLM-L6-v2 behind the same ``encode`` interface as SentenceTransformer.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, Sequence, Union
+
+import numpy as np
+
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_INT8_MODEL_FILE = "model_int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+
+
+class OnnxEncoder:
+    """onnxruntime으로 문장 임베딩을 계산합니다 (mean pooling + L2 정규화)."""
+
+    def __init__(
+        self,
+        model_dir: Union[str, Path],
+        *,
+        quantized: bool = False,
+        max_length: int = 256,
+        threads: int = 0,
+    ) -> None:
+        """Load an exported model directory.
+
+        Args:
+            model_dir: ``export_onnx_model``이 만든 디렉터리
+            quantized: int8 양자화 모델(model_int8.onnx) 사용 여부
+            max_length: 최대 토큰 수 (all-MiniLM-L6-v2의 max_seq_length와 동일하게 256)
+            threads: onnxruntime intra-op 스레드 수 (0이면 onnxruntime 기본값)
+        """
+        try:
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError(
+                "ONNX 임베딩 백엔드를 사용하려면 onnxruntime과 tokenizers가 필요합니다: "
+                "pip install 'FinTo[onnx]'"
+            ) from e
+
+        model_dir = Path(model_dir)
+        model_file = model_dir / (ONNX_INT8_MODEL_FILE if quantized else ONNX_MODEL_FILE)
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            str(model_file), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = Tokenizer.from_file(str(model_dir / TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length)
+        self.tokenizer.enable_padding()
+
+    def encode(
+        self,
+        sentences: Union[str, Sequence[str]],
+        batch_size: int = 32,
+        **kwargs,
+    ) -> np.ndarray:
+        """SentenceTransformer.encode와 같이 문자열 하나면 1차원, 목록이면 2차원 배열을 반환합니다.
+
+        show_progress_bar 등 나머지 인자는 호환을 위해 받기만 합니다.
+        """
+        single = isinstance(sentences, str)
+        texts: List[str] = [sentences] if single else list(sentences)
+        outputs = [
+            self._encode_batch(texts[i : i + batch_size])
+            for i in range(0, len(texts), batch_size)
+        ]
+        dim = self.session.get_outputs()[0].shape[-1]
+        vectors = np.concatenate(outputs) if outputs else np.zeros((0, dim), dtype=np.float32)
+        return vectors[0] if single else vectors
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        hidden = self.session.run(
+            None, {k: v for k, v in feeds.items() if k in self.input_names}
+        )[0]
+        mask = feeds["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+def export_onnx_model(
+    model_name: str,
+    output_dir: Union[str, Path],
+    *,
+    quantize: bool = True,
+    opset: int = 17,
+) -> Path:
+    """Hugging Face 체크포인트를 ONNX로 내보냅니다 (torch, transformers, onnx 필요).
+
+    Args:
+        model_name: 모델 이름 또는 경로 (예: sentence-transformers/all-MiniLM-L6-v2)
+        output_dir: model.onnx, tokenizer.json을 저장할 디렉터리
+        quantize: model_int8.onnx(동적 int8 양자화)도 함께 만들지 여부
+        opset: ONNX opset 버전
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    # sdpa 경로는 trace 시 attention mask가 상수로 고정될 수 있어 eager 사용
+    model = AutoModel.from_pretrained(model_name, attn_implementation="eager").eval()
+
+    class _HiddenStates(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.model(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                token_type_ids=token_type_ids,
+            ).last_hidden_state
+
+    # 패딩이 있는 배치로 trace해야 마스크 처리가 그래프에 남음
+    sample = tokenizer(["외국환거래법 제1조 목적", "신고"], padding=True, return_tensors="pt")
+    names = ["input_ids", "attention_mask", "token_type_ids"]
+    model_file = output_dir / ONNX_MODEL_FILE
+    with torch.no_grad():
+        torch.onnx.export(
+            _HiddenStates(model),
+            tuple(sample[name] for name in names),
+            str(model_file),
+            input_names=names,
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                name: {0: "batch", 1: "sequence"}
+                for name in names + ["last_hidden_state"]
+            },
+            opset_version=opset,
+            dynamo=False,
+        )
+    tokenizer.backend_tokenizer.save(str(output_dir / TOKENIZER_FILE))
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(
+            str(model_file), str(output_dir / ONNX_INT8_MODEL_FILE), weight_type=QuantType.QInt8
+        )
+    return output_dir
+
@@ -15,3 +15,12 @@ No need to use any tools for simple greetings. If someone says "hello" or "안
 Answer in Korean.
 
 System time: {system_time}"""
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a user and a legal/financial search assistant.
+You are given the current summary (possibly empty) and the messages that are being dropped from the context window.
+Return an updated summary that merges the new messages into the current one.
+
+Keep: the user's questions and goals, the laws, articles (조/항) and facts that were found, the answers given, and any open follow-ups.
+Drop: raw search result text, greetings and repetition.
+
+Write the summary in Korean, as concise bullet points, at most {max_words} words."""
@@ -0,0 +1,112 @@
+"""Pooled async HTTP transport for the Qdrant REST API.
+
+The search tools run inside the LangGraph event loop, so Qdrant calls must not
+block it. This module keeps one keep-alive connection pool per event loop and
+exposes thin helpers around the REST endpoints the tools use.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import weakref
+from typing import Any, Dict, Optional
+
+import httpx
+
+QDRANT_URL = os.environ.get("QDRANT_URL", "http://localhost:6333")
+QDRANT_API_KEY = os.environ.get("QDRANT_API_KEY")
+
+# 커넥션 풀 / 타임아웃 설정 (환경 변수로 조정 가능)
+QDRANT_POOL_SIZE = int(os.environ.get("QDRANT_POOL_SIZE", "20"))
+QDRANT_KEEPALIVE_EXPIRY = float(os.environ.get("QDRANT_KEEPALIVE_EXPIRY", "30"))
+QDRANT_TIMEOUT = float(os.environ.get("QDRANT_TIMEOUT", "10"))
+QDRANT_CONNECT_TIMEOUT = float(os.environ.get("QDRANT_CONNECT_TIMEOUT", "3"))
+
+
+class QdrantTransport:
+    """Qdrant REST API용 비동기 HTTP 클라이언트 (커넥션 풀 + keep-alive)."""
+
+    def __init__(
+        self,
+        url: str = QDRANT_URL,
+        *,
+        pool_size: int = QDRANT_POOL_SIZE,
+        keepalive_expiry: float = QDRANT_KEEPALIVE_EXPIRY,
+        timeout: float = QDRANT_TIMEOUT,
+        connect_timeout: float = QDRANT_CONNECT_TIMEOUT,
+        api_key: Optional[str] = QDRANT_API_KEY,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        """Create the pooled client.
+
+        Args:
+            url: Qdrant 서버 주소
+            pool_size: 동시에 유지할 최대 커넥션 수
+            keepalive_expiry: 유휴 커넥션을 유지할 시간(초)
+            timeout: 요청별 기본 타임아웃(초)
+            connect_timeout: 커넥션 수립 타임아웃(초)
+            api_key: Qdrant API 키 (선택)
+            transport: 테스트용 httpx 트랜스포트 (선택)
+        """
+        headers = {"api-key": api_key} if api_key else None
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self._client = httpx.AsyncClient(
+            base_url=self.url,
+            headers=headers,
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            transport=transport,
+        )
+
+    async def post(
+        self, path: str, payload: Dict[str, Any], *, timeout: Optional[float] = None
+    ) -> httpx.Response:
+        """POST 요청을 보내고 응답을 그대로 반환합니다.
+
+        Args:
+            path: 서버 주소 이후의 경로 (예: "/collections/c/points/search")
+            payload: JSON 본문
+            timeout: 이 호출에만 적용할 타임아웃(초)
+        """
+        if timeout is None:
+            return await self._client.post(path, json=payload)
+        return await self._client.post(path, json=payload, timeout=timeout)
+
+    async def get(
+        self, path: str, *, timeout: Optional[float] = None
+    ) -> httpx.Response:
+        """GET 요청을 보내고 응답을 그대로 반환합니다."""
+        if timeout is None:
+            return await self._client.get(path)
+        return await self._client.get(path, timeout=timeout)
+
+    async def aclose(self) -> None:
+        """커넥션 풀을 닫습니다."""
+        await self._client.aclose()
+
+
+# 이벤트 루프별로 하나의 트랜스포트를 공유 (httpx 커넥션은 루프에 묶여 있음)
+_transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, QdrantTransport]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_transport() -> QdrantTransport:
+    """현재 이벤트 루프에서 공유되는 QdrantTransport를 반환합니다."""
+    loop = asyncio.get_running_loop()
+    transport = _transports.get(loop)
+    if transport is None:
+        transport = QdrantTransport()
+        _transports[loop] = transport
+    return transport
+
+
+def set_transport(transport: QdrantTransport) -> None:
+    """현재 이벤트 루프의 공유 트랜스포트를 교체합니다 (테스트/벤치마크용)."""
+    _transports[asyncio.get_running_loop()] = transport
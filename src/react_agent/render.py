@@ -0,0 +1,137 @@
+"""Compact rendering of search hits for the LLM.
+
+Raw Qdrant payloads repeat the chunk text twice, along with law-level metadata
+that is the same on every chunk. The renderer keeps only what the model needs.
+It merges each 항 under its 조 in hit order, strips amendment annotations such
+as ``<개정 2009. 1. 30.>`` and packs the merged entries into a token budget.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Qdrant에 요청할 payload 필드 (with_payload include 목록)
+RESULT_PAYLOAD_FIELDS = [
+    "id",
+    "cleaned_content",
+    "chapter_no",
+    "chapter_title",
+    "article_no",
+    "article_title",
+    "item_no",
+]
+
+_ANNOTATION_RE = re.compile(r"<(?:개정|신설)[^>]*>|\[(?:전문개정|본조신설)[^\]]*\]")
+_HANGUL_RE = re.compile(r"[가-힣]")
+
+
+def strip_annotations(text: str) -> str:
+    """<개정 …>, <신설 …>, [전문개정 …], [본조신설 …] 표시를 지우고 공백을 정리합니다."""
+    return re.sub(r"\s+", " ", _ANNOTATION_RE.sub("", text)).strip()
+
+
+@lru_cache(maxsize=1)
+def _tiktoken_counter() -> Optional[Callable[[str], int]]:
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+    return lambda text: len(encoding.encode(text))
+
+
+def count_tokens(text: str) -> int:
+    """토큰 수를 셉니다 (tiktoken이 없으면 한글 1자=1토큰, 그 외 4자=1토큰으로 근사)."""
+    counter = _tiktoken_counter()
+    if counter is not None:
+        return counter(text)
+    hangul = len(_HANGUL_RE.findall(text))
+    return hangul + math.ceil((len(text) - hangul) / 4)
+
+
+def _item_order(payload: Dict[str, Any]) -> Tuple[int, int]:
+    item = payload.get("item_no")
+    return (0, 0) if not item else (1, ord(item[0]))
+
+
+def _reference(payload: Dict[str, Any]) -> str:
+    parts = [payload.get("chapter_no"), payload.get("chapter_title")]
+    article = payload.get("article_no")
+    if article:
+        title = payload.get("article_title")
+        parts.append(f"{article}({title})" if title else article)
+    return " ".join(p for p in parts if p)
+
+
+def group_by_article(payloads: Sequence[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """같은 조의 청크(조 본문과 항)를 처음 등장한 순서대로 묶습니다."""
+    groups: Dict[Any, List[Dict[str, Any]]] = {}
+    for payload in payloads:
+        if payload.get("chapter_no") and payload.get("article_no"):
+            key: Any = (payload["chapter_no"], payload["article_no"])
+        else:
+            key = ("id", payload.get("id"), len(groups))
+        groups.setdefault(key, []).append(payload)
+    return [sorted(group, key=_item_order) for group in groups.values()]
+
+
+def render_group(group: Sequence[Dict[str, Any]]) -> Dict[str, str]:
+    """한 조의 청크들을 하나의 항목으로 만듭니다."""
+    seen = set()
+    texts = []
+    for payload in group:
+        text = strip_annotations(payload.get("cleaned_content") or payload.get("content") or "")
+        if text and text not in seen:
+            seen.add(text)
+            texts.append(text)
+    rendered = {"id": ",".join(str(p.get("id")) for p in group)}
+    reference = _reference(group[0])
+    if reference:
+        rendered["ref"] = reference
+    rendered["text"] = "\n".join(texts)
+    return rendered
+
+
+def render_results(
+    payloads: Sequence[Dict[str, Any]], token_budget: int = 0
+) -> List[Dict[str, str]]:
+    """검색 결과를 조 단위로 합쳐 토큰 예산 안에 들어가도록 정리합니다.
+
+    Args:
+        payloads: 순위순 검색 결과 payload
+        token_budget: 전체 토큰 예산 (0이면 제한 없음). 예산을 넘는 항목은 건너뛰고,
+            첫 항목조차 넘으면 그 본문을 예산에 맞게 자릅니다.
+    """
+    rendered = [render_group(group) for group in group_by_article(payloads)]
+    if token_budget <= 0:
+        return rendered
+
+    packed: List[Dict[str, str]] = []
+    used = 0
+    for entry in rendered:
+        tokens = count_tokens(" ".join(entry.values()))
+        if used + tokens <= token_budget:
+            packed.append(entry)
+            used += tokens
+        elif not packed:
+            packed.append(_truncate(entry, token_budget))
+            break
+    return packed
+
+
+def _truncate(entry: Dict[str, str], token_budget: int) -> Dict[str, str]:
+    overhead = count_tokens(" ".join(v for k, v in entry.items() if k != "text"))
+    text = entry["text"]
+    low, high = 0, len(text)
+    # 예산에 맞는 가장 긴 앞부분을 이분 탐색
+    while low < high:
+        mid = (low + high + 1) // 2
+        if overhead + count_tokens(text[:mid]) + 1 <= token_budget:
+            low = mid
+        else:
+            high = mid - 1
+    return {**entry, "text": text[:low] + "…"}
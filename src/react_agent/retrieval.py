@@ -0,0 +1,928 @@
+"""Staged retrieval pipeline behind the search tools.
+
+A search runs as rewrite -> embed -> search -> rerank -> project. Every stage
+runs exactly once, hands a typed result to the next one and records its own
+latency so callers can get a per-stage breakdown. In speculative mode the raw
+query is embedded and searched while the rewrite is still in flight.
+``run_batch_search_pipeline`` runs the same stages for many queries at once: one
+batched encode, one batch search request and one vectorized rerank.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from react_agent.cross_encoder import (
+    CROSS_ENCODER_MAX_CANDIDATES,
+    get_cross_encoder_reranker,
+)
+from react_agent.embedding import (
+    EMBEDDING_BATCH_SIZE,
+    EmbeddingCache,
+    EmbeddingExecutor,
+    embedding_model_id,
+    load_embedding_model,
+)
+from react_agent.lexical import get_lexical_index
+from react_agent.rewrite import restructure_query_with_llm
+from react_agent.semantic_cache import SEMANTIC_CACHE_VERSION_TTL, SemanticCache
+from react_agent.structure_index import get_structural_index, parse_structure_ref
+from react_agent.utils import normalize_query
+from react_agent.vector_store import (
+    EMBEDDING_MODEL,
+    get_vector_store,
+    hit_vector,
+)
+
+# MMR 리랭킹의 관련성 가중치 (1이면 다양성 고려 없음)
+MMR_LAMBDA = 0.7
+
+
+
+@lru_cache(maxsize=None)
+def get_embedding_model() -> Any:
+    """임베딩 모델을 처음 호출될 때 한 번만 로드합니다 (import 시점에는 로드하지 않음)."""
+    print(f"📌 임베딩 모델 로드: {EMBEDDING_MODEL}")
+    return load_embedding_model(EMBEDDING_MODEL)
+
+
+# 쿼리 인코딩은 워커 스레드에서 배치로 처리 (이벤트 루프 블로킹 방지)
+# 모델은 첫 인코딩 때 워커 스레드에서 로드됨
+embedding_executor = EmbeddingExecutor(
+    lambda texts: get_embedding_model().encode(texts, batch_size=EMBEDDING_BATCH_SIZE),
+    cache=EmbeddingCache(embedding_model_id(EMBEDDING_MODEL)),
+)
+
+
+# 필터 검색 / 필터 없는 결과로 보충한 횟수
+SEARCH_STATS: Counter[str] = Counter(filtered_searches=0, fallback_used=0)
+
+# 비슷한 질문(원본 질문 임베딩 기준)의 최종 결과를 재사용하는 캐시
+semantic_cache: SemanticCache[PipelineResult] = SemanticCache()
+_semantic_cache_checked_at = 0.0
+
+
+@dataclass
+class RewriteResult:
+    """rewrite 단계 결과: 원본 질문과 검색에 사용할 질문."""
+
+    query: str
+    search_query: str
+
+
+@dataclass
+class EmbedResult:
+    """embed 단계 결과: 검색 질문과 그 벡터."""
+
+    search_query: str
+    vector: List[float]
+
+
+@dataclass
+class SearchResult:
+    """search 단계 결과: Qdrant 후보 목록 (score, payload 포함)."""
+
+    hits: List[Dict[str, Any]]
+    filter: Optional[Dict[str, Any]] = None
+    used_fallback: bool = False
+
+
+@dataclass
+class RerankResult:
+    """rerank 단계 결과: 최종 순서로 정렬된 후보."""
+
+    hits: List[Dict[str, Any]]
+    method: str
+
+
+@dataclass
+class PipelineResult:
+    """파이프라인 전체 결과: 반환할 payload 목록과 단계별 소요 시간(ms)."""
+
+    query: str
+    search_query: str
+    results: List[Dict[str, Any]]
+    candidates: int
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    def debug_info(self) -> Dict[str, Any]:
+        """디버그 모드에서 도구 결과에 덧붙일 정보를 반환합니다."""
+        return {
+            "query": self.query,
+            "search_query": self.search_query,
+            "candidates": self.candidates,
+            "timings_ms": {k: round(v, 2) for k, v in self.timings.items()},
+        }
+
+
+@contextmanager
+def _timed(timings: Dict[str, float], stage: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = (time.perf_counter() - start) * 1000
+
+
+def parse_structure_filter(query: str) -> Optional[Dict[str, Any]]:
+    """질문에 포함된 제N장/제N조(제N조의M 포함)를 Qdrant payload 필터로 변환합니다.
+
+    구조 인덱스, 시맨틱 캐시 키와 같은 parse_structure_ref 규칙으로 장/조를 추출합니다.
+    """
+    chapter, article, _ = parse_structure_ref(query)
+
+    must_conditions = []
+    if chapter:
+        must_conditions.append({"key": "chapter_no", "match": {"value": chapter}})
+    if article:
+        must_conditions.append({"key": "article_no", "match": {"value": article}})
+    return {"must": must_conditions} if must_conditions else None
+
+
+def search_stats() -> Dict[str, int]:
+    """구조 필터 검색 횟수와 필터 없는 결과로 보충한 횟수를 반환합니다."""
+    return dict(SEARCH_STATS)
+
+
+def lexical_scores(query, results):
+    """후보들의 어휘 유사도 점수를 계산합니다.
+
+    수집 단계에서 만든 코퍼스 단위 BM25 인덱스가 있으면 희소 행 조회와 내적만 수행하고,
+    없으면 후보 텍스트로 TF-IDF를 새로 학습합니다.
+    """
+    index = get_lexical_index()
+    if index is not None:
+        return index.score(query, [result.get("id") for result in results])
+
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    # 결과에서 텍스트 추출
+    texts = [result["payload"].get("cleaned_content", "") for result in results]
+
+    # 쿼리와 텍스트를 함께 TF-IDF 변환
+    tfidf = TfidfVectorizer().fit_transform(texts + [query])
+
+    # 마지막 벡터(쿼리)와 다른 모든 텍스트 간의 유사도 계산
+    return cosine_similarity(tfidf[-1:], tfidf[:-1])[0]
+
+
+def rerank_with_tfidf(query, results, top_n=5):
+    """TF-IDF(BM25) 기반으로 결과를 재랭킹합니다."""
+    # 후보가 top_n 이하여도 정렬은 해야 하므로 정렬할 것이 없을 때만 그대로 반환
+    if len(results) <= 1:
+        return results
+
+    similarities = lexical_scores(query, results)
+
+    # 유사도에 따라 정렬
+    reranked_indices = similarities.argsort()[::-1][:top_n]
+
+    print(f"📌 TF-IDF 리랭킹 상위 점수: {[similarities[i] for i in reranked_indices[:3]]}")
+
+    return [results[i] for i in reranked_indices]
+
+
+def hybrid_scores(query, results, alpha=0.6):
+    """정규화한 벡터 검색 점수와 TF-IDF(BM25) 점수를 alpha 비율로 조합합니다."""
+    # 벡터 검색 점수 정규화
+    vector_scores = np.array([result["score"] for result in results])
+    if vector_scores.max() != vector_scores.min():  # 분모가 0이 되지 않도록 체크
+        vector_scores = (vector_scores - vector_scores.min()) / (vector_scores.max() - vector_scores.min())
+    else:
+        vector_scores = np.ones_like(vector_scores)
+
+    # 텍스트 기반 유사도 계산
+    try:
+        tfidf_scores = lexical_scores(query, results)
+
+        if tfidf_scores.max() != tfidf_scores.min():  # 분모가 0이 되지 않도록 체크
+            tfidf_scores = (tfidf_scores - tfidf_scores.min()) / (tfidf_scores.max() - tfidf_scores.min())
+        else:
+            tfidf_scores = np.ones_like(tfidf_scores)
+
+        # 점수 조합
+        return alpha * vector_scores + (1 - alpha) * tfidf_scores
+    except Exception as e:
+        print(f"📌 TF-IDF 계산 중 오류, 벡터 점수만 사용합니다: {str(e)}")
+        return vector_scores
+
+
+def rerank_with_hybrid(query, results, top_n=5, alpha=0.6):
+    """벡터 검색 점수와 TF-IDF 점수를 조합하여 하이브리드 재랭킹을 수행합니다."""
+    # 후보가 top_n 이하여도 정렬은 해야 하므로 정렬할 것이 없을 때만 그대로 반환
+    if len(results) <= 1:
+        return results
+
+    combined_scores = hybrid_scores(query, results, alpha)
+
+    # 조합된 점수로 정렬
+    reranked_indices = combined_scores.argsort()[::-1][:top_n]
+
+    print(f"📌 하이브리드 리랭킹 상위 점수: {[combined_scores[i] for i in reranked_indices[:3]]}")
+
+    return [results[i] for i in reranked_indices]
+
+
+def mmr_select(relevance, vectors, top_n, mmr_lambda=MMR_LAMBDA):
+    """MMR(maximal marginal relevance)로 관련성이 높으면서 서로 다른 후보를 고릅니다.
+
+    후보 간 코사인 유사도 행렬을 한 번 계산한 뒤, 매 단계
+    lambda * 관련성 - (1 - lambda) * (이미 고른 후보와의 최대 유사도)가 가장 큰 후보를 고릅니다.
+
+    Args:
+        relevance: 후보별 관련성 점수 (n,)
+        vectors: 후보 임베딩 (n, dim)
+        top_n: 고를 후보 수
+        mmr_lambda: 1이면 관련성 순서 그대로, 0에 가까울수록 다양성 우선
+
+    Returns:
+        고른 후보의 인덱스 (선택 순서)
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    similarity = vectors @ vectors.T
+    relevance = np.asarray(relevance, dtype=np.float32)
+
+    selected: List[int] = []
+    max_similarity = np.full(len(relevance), -np.inf, dtype=np.float32)
+    available = np.ones(len(relevance), dtype=bool)
+    for _ in range(min(top_n, len(relevance))):
+        penalty = np.where(np.isfinite(max_similarity), max_similarity, 0.0)
+        marginal = mmr_lambda * relevance - (1 - mmr_lambda) * penalty
+        best = int(np.argmax(np.where(available, marginal, -np.inf)))
+        selected.append(best)
+        available[best] = False
+        max_similarity = np.maximum(max_similarity, similarity[best])
+    return selected
+
+
+def rerank_with_mmr(query, results, top_n=5, mmr_lambda=MMR_LAMBDA, alpha=0.6):
+    """하이브리드 점수를 관련성으로 사용해 MMR로 중복이 적은 결과를 고릅니다.
+
+    후보에 벡터가 없으면(with_vectors 없이 검색한 경우) 하이브리드 재랭킹을 사용합니다.
+    """
+    if len(results) <= 1:
+        return results
+    vectors = [hit_vector(result) for result in results]
+    if any(v is None for v in vectors):
+        print("📌 후보에 벡터가 없어 하이브리드 리랭킹을 사용합니다.")
+        return rerank_with_hybrid(query, results, top_n, alpha)
+
+    selected = mmr_select(hybrid_scores(query, results, alpha), vectors, top_n, mmr_lambda)
+    return [results[i] for i in selected]
+
+
+def _normalize_rows(scores: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    # 행마다 min-max 정규화 (유효한 값이 모두 같으면 1)
+    low = np.where(mask, scores, np.inf).min(axis=1, keepdims=True)
+    high = np.where(mask, scores, -np.inf).max(axis=1, keepdims=True)
+    span = high - low
+    normalized = (scores - low) / np.where(span > 0, span, 1.0)
+    return np.where(span > 0, normalized, 1.0)
+
+
+def lexical_scores_many(queries, candidate_sets):
+    """여러 질문의 후보 어휘 점수를 계산합니다 (BM25 인덱스가 있으면 한 번의 행렬 곱)."""
+    index = get_lexical_index()
+    if index is not None:
+        return index.score_many(
+            queries,
+            [[hit.get("id") for hit in hits] for hits in candidate_sets],
+        )
+    return [lexical_scores(q, hits) for q, hits in zip(queries, candidate_sets)]
+
+
+def rerank_batch(
+    queries, candidate_sets, top_n=5, method="hybrid", alpha=0.6, mmr_lambda=MMR_LAMBDA
+):
+    """여러 질문의 후보 목록을 한 번의 벡터 연산으로 재랭킹합니다.
+
+    후보 목록을 (질문 수 x 최대 후보 수) 행렬로 채워 정규화/조합/정렬을 행 단위로
+    한꺼번에 처리합니다. 질문별 결과는 rerank_with_hybrid/rerank_with_tfidf와 같고,
+    'mmr'이면 조합 점수를 관련성으로 질문마다 MMR 선택을 합니다.
+    """
+    reranked = [list(hits) for hits in candidate_sets]
+    rows = [i for i, hits in enumerate(candidate_sets) if len(hits) > 1]
+    if not rows:
+        return reranked
+
+    width = max(len(candidate_sets[i]) for i in rows)
+    mask = np.zeros((len(rows), width), dtype=bool)
+    vector_scores = np.zeros((len(rows), width), dtype=np.float32)
+    for r, i in enumerate(rows):
+        mask[r, : len(candidate_sets[i])] = True
+        vector_scores[r, : len(candidate_sets[i])] = [hit["score"] for hit in candidate_sets[i]]
+
+    combined = _normalize_rows(vector_scores, mask)
+    try:
+        lexical = np.zeros_like(vector_scores)
+        for r, scores in enumerate(
+            lexical_scores_many([queries[i] for i in rows], [candidate_sets[i] for i in rows])
+        ):
+            lexical[r, : len(scores)] = scores
+        if method == "tfidf":
+            combined = lexical
+        else:
+            combined = alpha * combined + (1 - alpha) * _normalize_rows(lexical, mask)
+    except Exception as e:
+        if method == "tfidf":
+            raise
+        print(f"📌 TF-IDF 계산 중 오류, 벡터 점수만 사용합니다: {str(e)}")
+
+    order = np.argsort(-np.where(mask, combined, -np.inf), axis=1, kind="stable")[:, :top_n]
+    for r, i in enumerate(rows):
+        hits = candidate_sets[i]
+        vectors = [hit_vector(hit) for hit in hits] if method == "mmr" else []
+        if vectors and all(v is not None for v in vectors):
+            selected = mmr_select(combined[r, : len(hits)], vectors, top_n, mmr_lambda)
+            reranked[i] = [hits[j] for j in selected]
+        else:
+            reranked[i] = [hits[j] for j in order[r][: len(hits)]]
+    print(f"📌 배치 리랭킹 완료: {len(candidate_sets)}개 질문 ({len(rows)}개 재정렬)")
+    return reranked
+
+
+async def rewrite_stage(query: str, enabled: bool = True) -> RewriteResult:
+    """LLM으로 질문을 재구성합니다 (비활성화 시 원본 그대로 사용)."""
+    if not enabled:
+        return RewriteResult(query=query, search_query=query)
+    restructured_query = await restructure_query_with_llm(query)
+    print(f"원본 질문: {query}")
+    print(f"재구성된 질문: {restructured_query}")
+    return RewriteResult(query=query, search_query=restructured_query)
+
+
+async def embed_stage(search_query: str) -> EmbedResult:
+    """검색 질문을 벡터로 변환합니다."""
+    vector = await embedding_executor.embed(search_query)
+    return EmbedResult(search_query=search_query, vector=vector.tolist())
+
+
+def merge_filtered_results(
+    filtered: List[Dict[str, Any]], unfiltered: List[Dict[str, Any]], limit: int
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """필터 검색 결과를 우선하고, 부족하면 필터 없는 결과를 중복 없이 뒤에 붙입니다.
+
+    Returns:
+        (병합된 후보 목록, 필터 없는 결과를 사용했는지 여부)
+    """
+    if len(filtered) >= limit / 2:
+        return filtered, False
+    seen = {hit["id"] for hit in filtered}
+    merged = filtered + [hit for hit in unfiltered if hit["id"] not in seen]
+    return merged[:limit], True
+
+
+async def search_stage(
+    embedded: EmbedResult, initial_k: int, with_vectors: bool = False
+) -> SearchResult:
+    """벡터 저장소에서 후보를 가져옵니다.
+
+    질문에 제N장/제N조가 있으면 필터 검색과 필터 없는 검색을 함께 요청하고
+    (Qdrant에서는 하나의 batch 요청),
+    필터 결과가 부족할 때만 필터 없는 결과로 보충합니다.
+    with_vectors가 켜져 있으면 후보의 임베딩 벡터도 함께 가져옵니다 (MMR용).
+    """
+    query = embedded.search_query
+    filter_conditions = parse_structure_filter(query)
+    store = get_vector_store()
+
+    # 초기 검색에서 더 많은 수의 결과를 가져오기 위해 initial_k 사용
+    if not filter_conditions:
+        hits = await store.search(query, embedded.vector, initial_k, with_vectors=with_vectors)
+        print(f"📌 초기 검색: {len(hits)}개 항목 가져옴")
+        return SearchResult(hits=hits)
+
+    print(f"📌 Qdrant 검색 필터 적용: {json.dumps(filter_conditions)}")
+    filtered, unfiltered = await store.search_many(
+        query, embedded.vector, initial_k, [filter_conditions, None], with_vectors
+    )
+    print(f"📌 초기 검색: 필터 {len(filtered)}개 / 필터 없음 {len(unfiltered)}개 항목 가져옴")
+
+    hits, used_fallback = merge_filtered_results(filtered, unfiltered, initial_k)
+    SEARCH_STATS["filtered_searches"] += 1
+    if used_fallback:
+        SEARCH_STATS["fallback_used"] += 1
+        print("📌 필터 검색 결과가 충분하지 않아 필터 없는 결과로 보충합니다.")
+    return SearchResult(hits=hits, filter=filter_conditions, used_fallback=used_fallback)
+
+
+async def search_batch_stage(
+    search_queries: List[str],
+    vectors: List[List[float]],
+    initial_k: int,
+    with_vectors: bool = False,
+) -> List[SearchResult]:
+    """여러 질문의 후보를 하나의 batch 요청으로 가져옵니다.
+
+    구조 필터가 있는 질문은 필터 검색과 필터 없는 검색을 함께 넣고,
+    search_stage와 같은 규칙으로 보충합니다.
+    """
+    queries, query_vectors, filters, owners = [], [], [], []
+    conditions = [parse_structure_filter(q) for q in search_queries]
+    for i, (query, vector, condition) in enumerate(zip(search_queries, vectors, conditions)):
+        for f in ([condition, None] if condition else [None]):
+            queries.append(query)
+            query_vectors.append(vector)
+            filters.append(f)
+            owners.append(i)
+    responses = await get_vector_store().search_batch(
+        queries, query_vectors, initial_k, filters, with_vectors
+    )
+    print(f"📌 배치 검색: {len(search_queries)}개 질문, {len(responses)}개 검색을 한 번에 요청")
+
+    grouped: List[List[List[Dict[str, Any]]]] = [[] for _ in search_queries]
+    for owner, hits in zip(owners, responses):
+        grouped[owner].append(hits)
+    results = []
+    for condition, hits in zip(conditions, grouped):
+        if not condition:
+            results.append(SearchResult(hits=hits[0]))
+            continue
+        merged, used_fallback = merge_filtered_results(hits[0], hits[1], initial_k)
+        SEARCH_STATS["filtered_searches"] += 1
+        if used_fallback:
+            SEARCH_STATS["fallback_used"] += 1
+        results.append(SearchResult(hits=merged, filter=condition, used_fallback=used_fallback))
+    return results
+
+
+def rerank_stage(
+    search_query: str,
+    candidates: SearchResult,
+    top_k: int,
+    method: str,
+    mmr_lambda: float = MMR_LAMBDA,
+) -> RerankResult:
+    """후보를 재랭킹합니다 ('hybrid', 'tfidf' 또는 'mmr')."""
+    if method == "mmr":
+        hits = rerank_with_mmr(search_query, candidates.hits, top_k, mmr_lambda)
+        print(f"📌 MMR 리랭킹 완료: {len(hits)}개 결과 (lambda={mmr_lambda})")
+    elif method == "tfidf":
+        hits = rerank_with_tfidf(search_query, candidates.hits, top_k)
+        print(f"📌 TF-IDF 리랭킹 완료: {len(hits)}개 결과")
+    else:  # hybrid 방식 사용
+        hits = rerank_with_hybrid(search_query, candidates.hits, top_k)
+        print(f"📌 하이브리드 리랭킹 완료: {len(hits)}개 결과")
+    return RerankResult(hits=hits, method=method)
+
+
+async def cross_encoder_stage(
+    search_query: str, ranked: RerankResult, top_k: int
+) -> RerankResult:
+    """1차 순위의 상위 후보를 교차 인코더로 재정렬합니다 (실패 시 1차 순위 유지)."""
+    try:
+        reranker = await asyncio.to_thread(get_cross_encoder_reranker)
+        hits, skipped = await asyncio.to_thread(reranker.rerank, search_query, ranked.hits, top_k)
+    except Exception as e:
+        print(f"📌 교차 인코더 재랭킹 실패, 1차 순위를 사용합니다: {str(e)}")
+        return RerankResult(hits=ranked.hits[:top_k], method=ranked.method)
+    if skipped:
+        print("📌 1위 점수가 충분히 앞서 교차 인코더를 생략합니다.")
+        return RerankResult(hits=hits, method=ranked.method)
+    print(f"📌 교차 인코더 리랭킹 완료: {len(hits)}개 결과")
+    return RerankResult(hits=hits, method="cross_encoder")
+
+
+def project_stage(ranked: RerankResult) -> List[Dict[str, Any]]:
+    """도구 결과로 반환할 payload만 남깁니다."""
+    return [hit["payload"] for hit in ranked.hits]
+
+
+_ITEM_MARKS = "①②③④⑤⑥⑦⑧⑨⑩⑪⑫⑬⑭⑮⑯⑰⑱⑲⑳"
+_CHUNK_ID_RE = re.compile(r"^(\d+-\d+)(?:-([①-⑳]))?$")
+
+
+def neighbor_chunk_ids(chunk_id: str, depth: int) -> List[str]:
+    """청크 ID 규칙(장-조, 장-조-항)으로 상위 조와 앞뒤 depth개 항의 ID를 만듭니다.
+
+    예: neighbor_chunk_ids('2-10-③', 1) -> ['2-10', '2-10-②', '2-10-④']
+    조 본문('2-10')이면 첫 depth개 항을 반환합니다. 규칙에 맞지 않는 ID는 확장하지 않습니다.
+    """
+    match = _CHUNK_ID_RE.match(chunk_id or "")
+    if not match or depth <= 0:
+        return []
+    article, item = match.groups()
+    if item is None:
+        return [f"{article}-{mark}" for mark in _ITEM_MARKS[:depth]]
+    position = _ITEM_MARKS.index(item)
+    window = range(max(0, position - depth), min(len(_ITEM_MARKS), position + depth + 1))
+    return [article] + [f"{article}-{_ITEM_MARKS[i]}" for i in window if i != position]
+
+
+async def expand_stage(results: List[Dict[str, Any]], depth: int) -> List[Dict[str, Any]]:
+    """각 결과 뒤에 상위 조와 이웃 항을 붙입니다 (청크 ID로 한 번에 조회, 실패 시 원래 결과 유지)."""
+    return (await expand_many([results], depth))[0]
+
+
+async def expand_many(
+    result_sets: List[List[Dict[str, Any]]], depth: int
+) -> List[List[Dict[str, Any]]]:
+    """여러 결과 목록의 이웃 청크를 한 번의 조회로 가져와 각각 확장합니다."""
+    wanted: List[Dict[str, List[str]]] = []
+    for results in result_sets:
+        present = {str(payload.get("id")) for payload in results}
+        wanted.append({
+            str(payload.get("id")): [
+                i for i in neighbor_chunk_ids(str(payload.get("id")), depth) if i not in present
+            ]
+            for payload in results
+        })
+    missing = list(dict.fromkeys(
+        i for per_set in wanted for ids in per_set.values() for i in ids
+    ))
+    if not missing:
+        return result_sets
+
+    try:
+        fetched = await get_vector_store().fetch_by_chunk_ids(missing)
+    except Exception as e:
+        print(f"📌 이웃 청크 확장 실패, 원래 결과를 사용합니다: {str(e)}")
+        return result_sets
+    # 청크 ID가 같은 청크가 여러 개일 수 있으므로 모두 붙임
+    by_id: Dict[str, List[Dict[str, Any]]] = {}
+    for payload in fetched:
+        by_id.setdefault(str(payload.get("id")), []).append(payload)
+
+    expanded_sets = []
+    for results, per_set in zip(result_sets, wanted):
+        present = {str(payload.get("id")) for payload in results}
+        expanded: List[Dict[str, Any]] = []
+        for payload in results:
+            expanded.append(payload)
+            for neighbor_id in per_set[str(payload.get("id"))]:
+                if neighbor_id in by_id and neighbor_id not in present:
+                    present.add(neighbor_id)
+                    expanded.extend(by_id[neighbor_id])
+        print(f"📌 이웃 청크 확장: {len(results)}개 -> {len(expanded)}개")
+        expanded_sets.append(expanded)
+    return expanded_sets
+
+
+def fuse_search_results(
+    results: List[SearchResult], limit: int, k: int = 60
+) -> SearchResult:
+    """여러 후보 목록을 RRF(reciprocal rank fusion)로 합칩니다 (포인트 ID 기준 중복 제거)."""
+    scores: Dict[Any, float] = {}
+    hits: Dict[Any, Dict[str, Any]] = {}
+    for result in results:
+        for rank, hit in enumerate(result.hits):
+            scores[hit["id"]] = scores.get(hit["id"], 0.0) + 1.0 / (k + rank + 1)
+            hits.setdefault(hit["id"], hit)
+    ordered = sorted(scores, key=scores.__getitem__, reverse=True)[:limit]
+    return SearchResult(
+        hits=[
+            {**hits[point_id], "score": scores[point_id], "score_source": "rrf"}
+            for point_id in ordered
+        ],
+        filter=results[0].filter if results else None,
+        used_fallback=any(r.used_fallback for r in results),
+    )
+
+
+async def _embed_and_search(
+    search_query: str,
+    initial_k: int,
+    timings: Dict[str, float],
+    prefix: str = "",
+    with_vectors: bool = False,
+) -> SearchResult:
+    with _timed(timings, f"{prefix}embed"):
+        embedded = await embed_stage(search_query)
+    with _timed(timings, f"{prefix}search"):
+        return await search_stage(embedded, initial_k, with_vectors)
+
+
+async def _timed_rewrite(query: str, timings: Dict[str, float]) -> RewriteResult:
+    with _timed(timings, "rewrite"):
+        return await rewrite_stage(query)
+
+
+async def _speculative_candidates(
+    query: str,
+    initial_k: int,
+    deadline_ms: Optional[float],
+    timings: Dict[str, float],
+    with_vectors: bool = False,
+) -> Tuple[RewriteResult, SearchResult]:
+    """재구성과 원본 질문 검색을 동시에 시작하고, 재구성이 오면 그 검색 결과와 융합합니다."""
+    rewrite_task = asyncio.ensure_future(_timed_rewrite(query, timings))
+    # 마감 후에도 재구성은 계속 진행되어 캐시에 남음 (예외는 여기서 소비)
+    rewrite_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    raw_task = asyncio.ensure_future(
+        _embed_and_search(query, initial_k, timings, "raw_", with_vectors)
+    )
+
+    rewritten: Optional[RewriteResult] = None
+    try:
+        if deadline_ms:
+            rewritten = await asyncio.wait_for(asyncio.shield(rewrite_task), deadline_ms / 1000)
+        else:
+            rewritten = await rewrite_task
+    except TimeoutError:
+        print(f"📌 질문 재구성이 {deadline_ms}ms 안에 끝나지 않아 원본 질문 검색 결과를 사용합니다.")
+    except Exception as e:
+        print(f"📌 질문 재구성 실패, 원본 질문 검색 결과를 사용합니다: {str(e)}")
+
+    raw = await raw_task
+    if rewritten is None or normalize_query(rewritten.search_query) == normalize_query(query):
+        return RewriteResult(query=query, search_query=query), raw
+
+    candidates = await _embed_and_search(
+        rewritten.search_query, initial_k, timings, "rewritten_", with_vectors
+    )
+    with _timed(timings, "fuse"):
+        fused = fuse_search_results([candidates, raw], initial_k)
+    return rewritten, fused
+
+
+def semantic_cache_stats() -> Dict[str, Any]:
+    """시맨틱 결과 캐시의 히트율 등 통계를 반환합니다."""
+    return semantic_cache.stats()
+
+
+async def _check_semantic_cache_version() -> None:
+    # 컬렉션 버전 확인은 SEMANTIC_CACHE_VERSION_TTL마다 한 번만 요청
+    global _semantic_cache_checked_at
+    now = time.monotonic()
+    if now - _semantic_cache_checked_at < SEMANTIC_CACHE_VERSION_TTL:
+        return
+    _semantic_cache_checked_at = now
+    try:
+        version = await get_vector_store().version()
+    except Exception as e:
+        print(f"📌 컬렉션 버전을 확인하지 못했습니다: {str(e)}")
+        return
+    if semantic_cache.check_version(version):
+        print(f"📌 컬렉션이 다시 적재되어 시맨틱 캐시를 비웁니다 (버전 {version})")
+
+
+async def structural_lookup(
+    query: str, timings: Dict[str, float]
+) -> Optional[List[Dict[str, Any]]]:
+    """질문이 특정 조/항을 완전히 지정하면 구조 인덱스에서 해당 청크를 반환합니다."""
+    index = await get_structural_index()
+    if index is None:
+        return None
+    with _timed(timings, "structure_lookup"):
+        hits = index.lookup(query)
+    if hits is not None:
+        print(f"📌 구조 인덱스 직접 조회: {len(hits)}개 청크 (재구성/벡터 검색 생략)")
+    return hits
+
+
+async def warmup(cross_encoder: bool = False) -> Dict[str, float]:
+    """무거운 리소스를 미리 준비해 첫 검색 요청의 지연을 없앱니다 (배포 직후 호출).
+
+    임베딩 모델 로드와 더미 인코딩, 어휘/구조 인덱스 로드, 벡터 저장소 연결 확인을
+    순서대로 수행합니다.
+
+    Args:
+        cross_encoder: 교차 인코더 모델도 미리 로드할지 여부
+
+    Returns:
+        단계별 소요 시간(ms)
+
+    Raises:
+        SearchError: Qdrant 컬렉션을 확인할 수 없는 경우
+    """
+    timings: Dict[str, float] = {}
+    with _timed(timings, "embedding_model"):
+        model = await asyncio.to_thread(get_embedding_model)
+    with _timed(timings, "dummy_encode"):
+        # 캐시를 거치지 않고 모델을 직접 호출
+        await asyncio.to_thread(model.encode, ["외국환거래법 warmup"])
+    if cross_encoder:
+        with _timed(timings, "cross_encoder"):
+            await asyncio.to_thread(get_cross_encoder_reranker)
+    with _timed(timings, "lexical_index"):
+        await asyncio.to_thread(get_lexical_index)
+    with _timed(timings, "structural_index"):
+        await get_structural_index()
+    with _timed(timings, "vector_store"):
+        store = await asyncio.to_thread(get_vector_store)
+        await store.healthcheck()
+    print(f"📌 워밍업 완료: { {k: round(v, 1) for k, v in timings.items()} }")
+    return timings
+
+
+async def run_search_pipeline(
+    query: str,
+    *,
+    top_k: int = 5,
+    initial_k: int = 20,
+    reranking_method: str = "hybrid",
+    rewrite: bool = True,
+    speculative: bool = False,
+    rewrite_deadline_ms: Optional[float] = None,
+    structural: bool = True,
+    cross_encoder: bool = False,
+    expand_depth: int = 0,
+    mmr_lambda: float = MMR_LAMBDA,
+    use_semantic_cache: bool = False,
+    semantic_cache_threshold: float = 0.95,
+) -> PipelineResult:
+    """rewrite -> embed -> search -> rerank -> project 순서로 검색을 실행합니다.
+
+    structural이 켜져 있고 질문이 특정 조(또는 항)를 완전히 지정하면
+    (예: '제3조 정의', '제2장 제10조 제3항') 구조 인덱스에서 해당 청크를 바로
+    반환하고 재구성과 벡터 검색을 건너뜁니다.
+
+    speculative 모드에서는 원본 질문의 임베딩/검색을 재구성과 동시에 시작하고,
+    재구성된 질문의 검색 결과와 RRF로 융합합니다. rewrite_deadline_ms를 넘기면
+    원본 질문의 결과만 사용합니다.
+
+    use_semantic_cache가 켜져 있으면 원본 질문 임베딩이 이전 질문과 충분히 가까울 때
+    (같은 검색 설정에서) 그 결과를 그대로 반환합니다.
+
+    Args:
+        query: 사용자 질문
+        top_k: 리랭킹 후 반환할 결과 수
+        initial_k: 리랭킹을 위해 처음 가져올 후보 수
+        reranking_method: 리랭킹 방식 ('hybrid', 'tfidf', 'mmr')
+        rewrite: LLM 질문 재구성 여부
+        speculative: 재구성과 원본 질문 검색을 병렬로 실행할지 여부
+        rewrite_deadline_ms: speculative 모드에서 재구성을 기다릴 최대 시간(ms)
+        structural: 구조 인덱스 직접 조회(fast path) 사용 여부
+        cross_encoder: 1차 리랭킹 상위 후보를 교차 인코더로 다시 정렬할지 여부
+        expand_depth: 결과마다 붙일 상위 조/이웃 항의 범위 (0이면 확장하지 않음)
+        mmr_lambda: 'mmr' 리랭킹의 관련성 가중치 (0~1, 작을수록 다양성 우선)
+        use_semantic_cache: 시맨틱 결과 캐시 사용 여부
+        semantic_cache_threshold: 캐시된 질문으로 볼 최소 코사인 유사도
+
+    Raises:
+        SearchError: Qdrant 요청이 실패한 경우
+    """
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    with_vectors = reranking_method == "mmr"
+    if structural:
+        direct = await structural_lookup(query, timings)
+        if direct is not None:
+            timings["total"] = (time.perf_counter() - start) * 1000
+            return PipelineResult(
+                query=query,
+                search_query=query,
+                results=direct,
+                candidates=len(direct),
+                timings=timings,
+            )
+    if use_semantic_cache:
+        # 임베딩이 거의 같아도 가리키는 장/조/항이 다르면 검색 필터가 달라지므로 키에 포함
+        cache_params = (
+            top_k, initial_k, reranking_method, rewrite, cross_encoder, expand_depth, mmr_lambda,
+            parse_structure_ref(query),
+        )
+        with _timed(timings, "semantic_cache"):
+            await _check_semantic_cache_version()
+            query_vector = await embedding_executor.embed(query)
+            cached = semantic_cache.get(query_vector, cache_params, semantic_cache_threshold)
+        if cached is not None:
+            hit, similarity = cached
+            print(f"📌 시맨틱 캐시 히트 (유사도 {similarity:.3f}): '{hit.query}'의 결과를 재사용합니다.")
+            timings["total"] = (time.perf_counter() - start) * 1000
+            return PipelineResult(
+                query=query,
+                search_query=hit.search_query,
+                results=hit.results,
+                candidates=hit.candidates,
+                timings=timings,
+            )
+    if rewrite and speculative:
+        rewritten, candidates = await _speculative_candidates(
+            query, initial_k, rewrite_deadline_ms, timings, with_vectors
+        )
+    else:
+        with _timed(timings, "rewrite"):
+            rewritten = await rewrite_stage(query, rewrite)
+        candidates = await _embed_and_search(
+            rewritten.search_query, initial_k, timings, with_vectors=with_vectors
+        )
+    # 교차 인코더를 쓰면 1차 리랭킹에서 더 많은 후보를 남김
+    first_k = max(top_k, CROSS_ENCODER_MAX_CANDIDATES) if cross_encoder else top_k
+    with _timed(timings, "rerank"):
+        ranked = rerank_stage(
+            rewritten.search_query, candidates, first_k, reranking_method, mmr_lambda
+        )
+    if cross_encoder:
+        with _timed(timings, "cross_encode"):
+            ranked = await cross_encoder_stage(rewritten.search_query, ranked, top_k)
+    with _timed(timings, "project"):
+        results = project_stage(ranked)
+    if expand_depth > 0:
+        with _timed(timings, "expand"):
+            results = await expand_stage(results, expand_depth)
+    timings["total"] = (time.perf_counter() - start) * 1000
+
+    result = PipelineResult(
+        query=query,
+        search_query=rewritten.search_query,
+        results=results,
+        candidates=len(candidates.hits),
+        timings=timings,
+    )
+    if use_semantic_cache:
+        semantic_cache.set(query_vector, cache_params, result)
+    return result
+
+
+async def run_batch_search_pipeline(
+    queries: List[str],
+    *,
+    top_k: int = 5,
+    initial_k: int = 20,
+    reranking_method: str = "hybrid",
+    rewrite: bool = False,
+    structural: bool = True,
+    expand_depth: int = 0,
+    mmr_lambda: float = MMR_LAMBDA,
+) -> List[PipelineResult]:
+    """여러 질문을 한 번에 검색합니다 (하위 질문, 평가용 질문 등).
+
+    구조 인덱스로 바로 답할 수 있는 질문을 먼저 처리하고, 나머지 질문은
+    임베딩 한 번(배치), 검색 요청 한 번(/points/search/batch), 행렬 단위 리랭킹
+    한 번으로 처리합니다. 단계별 소요 시간은 배치 전체 기준이며 모든 결과가 공유합니다.
+
+    Args:
+        queries: 검색할 질문 목록
+        top_k: 질문마다 리랭킹 후 반환할 결과 수
+        initial_k: 질문마다 리랭킹을 위해 처음 가져올 후보 수
+        reranking_method: 리랭킹 방식 ('hybrid', 'tfidf', 'mmr')
+        rewrite: 질문마다 LLM 질문 재구성을 할지 여부 (동시에 실행)
+        structural: 구조 인덱스 직접 조회(fast path) 사용 여부
+        expand_depth: 결과마다 붙일 상위 조/이웃 항의 범위 (0이면 확장하지 않음)
+        mmr_lambda: 'mmr' 리랭킹의 관련성 가중치 (0~1, 작을수록 다양성 우선)
+
+    Returns:
+        질문 순서대로의 PipelineResult 목록
+
+    Raises:
+        SearchError: Qdrant 요청이 실패한 경우
+    """
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    results: List[Optional[PipelineResult]] = [None] * len(queries)
+
+    index = await get_structural_index() if structural else None
+    if index is not None:
+        with _timed(timings, "structure_lookup"):
+            for i, query in enumerate(queries):
+                direct = index.lookup(query)
+                if direct is not None:
+                    results[i] = PipelineResult(
+                        query=query, search_query=query, results=direct,
+                        candidates=len(direct), timings=timings,
+                    )
+    pending = [i for i, result in enumerate(results) if result is None]
+
+    if pending:
+        with _timed(timings, "rewrite"):
+            rewritten = await asyncio.gather(
+                *(rewrite_stage(queries[i], rewrite) for i in pending)
+            )
+        search_queries = [r.search_query for r in rewritten]
+        with _timed(timings, "embed"):
+            vectors = await embedding_executor.embed_many(search_queries)
+        with _timed(timings, "search"):
+            candidates = await search_batch_stage(
+                search_queries,
+                [v.tolist() for v in vectors],
+                initial_k,
+                with_vectors=reranking_method == "mmr",
+            )
+        with _timed(timings, "rerank"):
+            ranked = rerank_batch(
+                search_queries,
+                [c.hits for c in candidates],
+                top_k,
+                reranking_method,
+                mmr_lambda=mmr_lambda,
+            )
+        with _timed(timings, "project"):
+            projected = [[hit["payload"] for hit in hits] for hits in ranked]
+        if expand_depth > 0:
+            with _timed(timings, "expand"):
+                projected = await expand_many(projected, expand_depth)
+        for i, rewrite_result, candidate, payloads in zip(
+            pending, rewritten, candidates, projected
+        ):
+            results[i] = PipelineResult(
+                query=queries[i],
+                search_query=rewrite_result.search_query,
+                results=payloads,
+                candidates=len(candidate.hits),
+                timings=timings,
+            )
+    timings["total"] = (time.perf_counter() - start) * 1000
+    return results  # type: ignore[return-value]
@@ -0,0 +1,134 @@
+"""LLM query rewriting for legal document search.
+
+Rewrites are cached by normalized query, prompt version and model, in memory
+and in a bounded SQLite file, and concurrent identical rewrites share a single
+in-flight LLM call.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import threading
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from react_agent.cache import DiskCache, LRUCache
+from react_agent.utils import normalize_query
+
+if TYPE_CHECKING:
+    from langchain_anthropic import ChatAnthropic
+
+REWRITE_MODEL = "claude-3-5-haiku-20241022"
+
+REWRITE_SYSTEM_PROMPT = """당신은 법률 검색 전문가입니다. 사용자의 질문을 법률 검색에 최적화된 형태로 재구성해주세요.
+    다음 사항을 고려하여 재구성해주세요:
+    1. 법률 용어를 정확하게 사용
+    2. 법률 문서 구조를 고려 (조, 장, 절 등)
+    3. 검색 의도를 명확히 표현
+    4. 관련 법률 분야를 명시
+    5. 구체적인 법률 개념을 포함
+
+    재구성된 질문은 검색에 최적화되어야 하며, 원래 의도를 유지해야 합니다."""
+
+# 프롬프트가 바뀌면 캐시 키도 바뀌도록 프롬프트 해시를 버전으로 사용
+REWRITE_PROMPT_VERSION = hashlib.sha1(REWRITE_SYSTEM_PROMPT.encode("utf-8")).hexdigest()[:12]
+
+# 재구성 캐시 설정 (REWRITE_CACHE_PATH가 비어 있으면 디스크 캐시 미사용)
+REWRITE_CACHE_SIZE = int(os.environ.get("REWRITE_CACHE_SIZE", "10000"))
+REWRITE_CACHE_TTL = float(os.environ.get("REWRITE_CACHE_TTL", "0"))
+REWRITE_CACHE_PATH = os.environ.get(
+    "REWRITE_CACHE_PATH", "finto/data/cache/rewrite_cache.sqlite"
+)
+
+_memory: LRUCache[str] = LRUCache(REWRITE_CACHE_SIZE, REWRITE_CACHE_TTL)
+_disk: Optional[DiskCache] = None
+_disk_lock = threading.Lock()
+_inflight: Dict[Tuple[int, str], "asyncio.Task[str]"] = {}
+
+
+@lru_cache(maxsize=None)
+def get_rewrite_model(model: str = REWRITE_MODEL) -> ChatAnthropic:
+    """재구성용 ChatAnthropic 클라이언트를 한 번만 만들어 재사용합니다."""
+    from langchain_anthropic import ChatAnthropic
+
+    return ChatAnthropic(
+        model=model,
+        temperature=0.0,
+        max_tokens=1000
+    )
+
+
+def _get_disk_cache() -> Optional[DiskCache]:
+    global _disk
+    if _disk is None and REWRITE_CACHE_PATH:
+        with _disk_lock:
+            if _disk is None:
+                _disk = DiskCache(REWRITE_CACHE_PATH, REWRITE_CACHE_SIZE, REWRITE_CACHE_TTL)
+    return _disk
+
+
+def rewrite_cache_key(query: str) -> str:
+    """정규화된 질문 + 프롬프트 버전 + 모델로 캐시 키를 만듭니다."""
+    return f"{REWRITE_PROMPT_VERSION}\x00{REWRITE_MODEL}\x00{normalize_query(query)}"
+
+
+def rewrite_cache_stats() -> Dict[str, Any]:
+    """메모리/디스크 캐시의 히트·미스 카운터와 진행 중인 호출 수를 반환합니다."""
+    stats: Dict[str, Any] = {"memory": _memory.stats(), "inflight": len(_inflight)}
+    disk = _get_disk_cache()
+    if disk is not None:
+        stats["disk"] = disk.stats()
+    return stats
+
+
+async def _call_llm(query: str) -> str:
+    messages = [
+        SystemMessage(content=REWRITE_SYSTEM_PROMPT),
+        HumanMessage(content=f"원본 질문: {query}\n\n재구성된 질문:")
+    ]
+
+    response = await get_rewrite_model().ainvoke(messages)
+    return response.content.strip()
+
+
+async def _rewrite_and_store(query: str, key: str) -> str:
+    rewritten = await _call_llm(query)
+    _memory.set(key, rewritten)
+    disk = _get_disk_cache()
+    if disk is not None:
+        await asyncio.to_thread(disk.set, key, rewritten.encode("utf-8"))
+    return rewritten
+
+
+async def restructure_query_with_llm(query: str) -> str:
+    """LLM을 사용하여 법률 검색에 최적화된 형태로 질문을 재구성합니다.
+
+    캐시에 있으면 LLM을 호출하지 않고, 같은 질문이 동시에 들어오면
+    하나의 LLM 호출 결과를 함께 기다립니다.
+    """
+    key = rewrite_cache_key(query)
+    cached = _memory.get(key)
+    if cached is not None:
+        return cached
+
+    disk = _get_disk_cache()
+    if disk is not None:
+        raw = await asyncio.to_thread(disk.get, key)
+        if raw is not None:
+            cached = raw.decode("utf-8")
+            _memory.set(key, cached)
+            return cached
+
+    loop = asyncio.get_running_loop()
+    flight_key = (id(loop), key)
+    task = _inflight.get(flight_key)
+    if task is None:
+        task = loop.create_task(_rewrite_and_store(query, key))
+        _inflight[flight_key] = task
+        task.add_done_callback(lambda _: _inflight.pop(flight_key, None))
+    # 한 호출자가 취소되어도 다른 호출자가 기다리는 LLM 호출은 계속 진행
+    return await asyncio.shield(task)
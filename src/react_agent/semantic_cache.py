@@ -0,0 +1,129 @@
+"""Semantic result cache keyed by query-embedding similarity.
+
+Users often ask the same question in different words. ``SemanticCache`` keeps
+the normalized embeddings of recent raw queries in one matrix. A lookup is a
+single matrix-vector product: when the closest cached query is within the
+cosine threshold, its reranked results are returned and the rewrite, search and
+rerank stages are skipped. Entries are evicted LRU. The whole cache is dropped
+when the vector store reports a new collection version, i.e. after re-ingestion.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+import numpy as np
+
+SEMANTIC_CACHE_SIZE = int(os.environ.get("SEMANTIC_CACHE_SIZE", "1024"))
+# 컬렉션 버전을 다시 확인하는 간격(초)
+SEMANTIC_CACHE_VERSION_TTL = float(os.environ.get("SEMANTIC_CACHE_VERSION_TTL", "60"))
+
+T = TypeVar("T")
+
+
+class SemanticCache(Generic[T]):
+    """질문 임베딩의 코사인 유사도로 찾는 LRU 결과 캐시."""
+
+    def __init__(self, maxsize: int = SEMANTIC_CACHE_SIZE) -> None:
+        """Create the cache.
+
+        Args:
+            maxsize: 유지할 최대 항목 수 (넘으면 가장 오래 쓰지 않은 항목부터 제거)
+        """
+        self.maxsize = max(1, maxsize)
+        self.version: Optional[str] = None
+        self._vectors: Optional[np.ndarray] = None
+        self._params = np.empty(self.maxsize, dtype=object)
+        self._values: Dict[int, T] = {}
+        # slot -> None, 앞쪽이 가장 오래 쓰지 않은 항목
+        self._order: "OrderedDict[int, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def check_version(self, version: str) -> bool:
+        """컬렉션 버전이 바뀌었으면 캐시를 비웁니다. 비웠으면 True."""
+        with self._lock:
+            if self.version == version:
+                return False
+            changed = self.version is not None
+            self.version = version
+            if changed:
+                self._values.clear()
+                self._order.clear()
+                self.invalidations += 1
+            return changed
+
+    def get(
+        self, vector: np.ndarray, params: Hashable, threshold: float
+    ) -> Optional[Tuple[T, float]]:
+        """같은 검색 설정(params)의 항목 중 가장 가까운 질문의 결과를 찾습니다.
+
+        Returns:
+            (캐시된 결과, 코사인 유사도). threshold 미만이면 None
+        """
+        q = _normalize(vector)
+        with self._lock:
+            if self._values:
+                slots = np.fromiter(self._order, dtype=np.int64, count=len(self._order))
+                similarities = self._vectors[slots] @ q
+                same_params = np.array([self._params[s] == params for s in slots], dtype=bool)
+                similarities = np.where(same_params, similarities, -np.inf)
+                best = int(np.argmax(similarities))
+                if similarities[best] >= threshold:
+                    slot = int(slots[best])
+                    self._order.move_to_end(slot)
+                    self.hits += 1
+                    return self._values[slot], float(similarities[best])
+            self.misses += 1
+            return None
+
+    def set(self, vector: np.ndarray, params: Hashable, value: T) -> None:
+        """질문 임베딩과 결과를 저장합니다."""
+        q = _normalize(vector)
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.maxsize, len(q)), dtype=np.float32)
+            if len(self._values) < self.maxsize:
+                slot = next(i for i in range(self.maxsize) if i not in self._values)
+            else:
+                slot, _ = self._order.popitem(last=False)
+                self.evictions += 1
+            self._vectors[slot] = q
+            self._params[slot] = params
+            self._values[slot] = value
+            self._order[slot] = None
+            self._order.move_to_end(slot)
+
+    def clear(self) -> None:
+        """모든 항목을 지웁니다 (통계는 유지)."""
+        with self._lock:
+            self._values.clear()
+            self._order.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """히트·미스 수, 히트율, 크기, 제거/무효화 횟수를 반환합니다."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._values),
+            "maxsize": self.maxsize,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "version": self.version,
+        }
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / max(float(np.linalg.norm(vector)), 1e-12)
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Sequence
+from typing import Optional, Sequence
 
 from langchain_core.messages import AnyMessage
 from langgraph.graph import add_messages
@@ -53,6 +53,19 @@ class State(InputState):
     It is set to 'True' when the step count reaches recursion_limit - 1.
     """
 
+    summary: str = field(default="")
+    """
+    Rolling summary of the messages that no longer fit in the model's context window.
+
+    It is extended incrementally by call_model when older turns are dropped from the
+    window, so it is not regenerated on every step.
+    """
+
+    summarized_through: Optional[str] = field(default=None)
+    """
+    ID of the last message folded into `summary`. Later messages are still sent verbatim.
+    """
+
     # Additional attributes can be added here as needed.
     # Common examples include:
     # retrieved_documents: List[Document] = field(default_factory=list)
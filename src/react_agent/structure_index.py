@@ -0,0 +1,201 @@
+"""In-memory 장-조-항 index for direct structural lookups.
+
+Questions such as "제3조 정의" or "외국환거래법 제2장 제10조 제3항" name their
+target outright. The index maps (chapter, article, item) to chunk payloads so
+those questions are answered from memory, without an LLM rewrite, an embedding
+or an ANN search. Only a query that is a single structural reference takes this
+path. The reference may be preceded by a law name and followed by the indexed
+article title or a short request such as "내용". Anything else ("제3조를 위반하면 …",
+"제3조와 제5조의 차이") goes to search.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from react_agent.qdrant_transport import get_transport
+
+STRUCTURED_CHUNKS_PATH = os.environ.get(
+    "STRUCTURED_CHUNKS_PATH", "finto/data/intermediate/structured_chunks.json"
+)
+COLLECTION_NAME = os.environ.get("COLLECTION_NAME", "my-collection")
+
+# Qdrant에서 읽어오기에 실패하면 이 시간(초)이 지난 뒤 다시 시도
+_RETRY_AFTER = 60.0
+
+_ITEM_MARKS = "①②③④⑤⑥⑦⑧⑨⑩⑪⑫⑬⑭⑮⑯⑰⑱⑲⑳"
+
+_ARTICLE = r"(?:제\s*)?(\d+)\s*조(?:\s*의\s*(\d+))?"
+
+# 앞에 붙는 법령 이름 (예: '외국환거래법', '「외국환거래법」'). 시행령/시행규칙은 다른 문서이므로 제외
+_LAW_NAME = r"(?:「?\s*[가-힣·\s]*?(?:법|법률)\s*」?\s*)?"
+
+# 질문 전체가 하나의 구조 참조일 때만 매칭. 참조 뒤에는 조문 제목(title, lookup에서 인덱스의
+# article_title과 비교)과 '내용', '전문' 등 짧은 요청만 허용
+_STRUCTURE_QUERY_RE = re.compile(
+    r"\s*" + _LAW_NAME + r"(?:제\s*\d+\s*장\s*)?" + _ARTICLE
+    + rf"(?:\s*(?:(?:제\s*)?\d+\s*항|[{_ITEM_MARKS}]))?"
+    r"(?P<title>.*?)(?:\s*[을를은는])?"
+    r"(?:\s*(?:의\s*)?(?:내용|전문|조문|원문|본문)(?:\s*[을를은는])?)?"
+    r"(?:\s*(?:알려\s*주세요|알려\s*줘|보여\s*주세요|보여\s*줘))?"
+    r"\s*[?.!]*\s*"
+)
+
+
+def chunk_to_payload(chunk: Dict[str, Any], fallback_id: Any = None) -> Dict[str, Any]:
+    """structured_chunks.json의 청크를 Qdrant에 저장하는 payload 형식으로 변환합니다."""
+    return {
+        "content": chunk.get("content") or chunk.get("text"),
+        "cleaned_content": chunk.get("cleaned_content", ""),
+        "id": chunk.get("id", str(fallback_id)),
+        **chunk.get("metadata", {})
+    }
+
+
+def parse_structure_ref(query: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """질문에서 (장, 조, 항)을 추출합니다. 예: '제2장 제10조 제3항' -> ('제2장', '제10조', '③').
+
+    '제10조의2'처럼 가지 조문 번호는 '제10조의2'로 반환합니다.
+    """
+    chapter_match = re.search(r"제\s*(\d+)\s*장", query)
+    article_match = re.search(_ARTICLE, query)
+    item_match = re.search(r"(?:제\s*)?(\d+)\s*항", query) or re.search(f"[{_ITEM_MARKS}]", query)
+
+    chapter = f"제{chapter_match.group(1)}장" if chapter_match else None
+    article = None
+    if article_match:
+        article = f"제{article_match.group(1)}조"
+        if article_match.group(2):
+            article += f"의{article_match.group(2)}"
+    item = None
+    if item_match:
+        if item_match.re.pattern.startswith("["):
+            item = item_match.group(0)
+        elif 1 <= int(item_match.group(1)) <= len(_ITEM_MARKS):
+            item = _ITEM_MARKS[int(item_match.group(1)) - 1]
+    return chapter, article, item
+
+
+def _compact_title(title: str) -> str:
+    return re.sub(r"[\s()（）「」\[\]]", "", title)
+
+
+def structure_query_title(query: str) -> Optional[str]:
+    """질문 전체가 하나의 장/조/항 참조이면 참조 뒤의 제목 부분('' 가능)을, 아니면 None을 반환합니다.
+
+    예: '외국환거래법 제3조(정의)' -> '정의', '제3조 내용' -> '', '제3조를 위반하면?' -> '를위반하면'
+    """
+    match = _STRUCTURE_QUERY_RE.fullmatch(query)
+    return _compact_title(match.group("title")) if match else None
+
+
+class StructuralIndex:
+    """(장, 조, 항) -> 청크 payload 목록."""
+
+    def __init__(self, payloads: Iterable[Dict[str, Any]]) -> None:
+        """Index payloads that carry chapter_no / article_no / item_no metadata."""
+        self.articles: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+        self.chapters_by_article: Dict[str, Set[str]] = defaultdict(set)
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        for payload in payloads:
+            if payload.get("id") is not None:
+                self.by_id[str(payload["id"])] = payload
+            chapter, article = payload.get("chapter_no"), payload.get("article_no")
+            if chapter and article:
+                self.articles[(chapter, article)].append(payload)
+                self.chapters_by_article[article].add(chapter)
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    @classmethod
+    def from_chunks_file(cls, path: str | Path) -> StructuralIndex:
+        """structured_chunks.json에서 인덱스를 만듭니다."""
+        with open(path, "r", encoding="utf-8") as f:
+            chunks = json.load(f)
+        return cls(
+            chunk_to_payload(chunk, i)
+            for i, chunk in enumerate(chunks)
+            if chunk.get("content") or chunk.get("text")
+        )
+
+    @classmethod
+    async def from_qdrant(cls, batch_size: int = 256) -> StructuralIndex:
+        """Qdrant 컬렉션의 payload를 scroll로 모두 읽어 인덱스를 만듭니다."""
+        transport = get_transport()
+        payloads: List[Dict[str, Any]] = []
+        offset = None
+        while True:
+            body: Dict[str, Any] = {"limit": batch_size, "with_payload": True, "with_vector": False}
+            if offset is not None:
+                body["offset"] = offset
+            response = await transport.post(f"/collections/{COLLECTION_NAME}/points/scroll", body)
+            response.raise_for_status()
+            result = response.json()["result"]
+            payloads.extend(point["payload"] for point in result["points"])
+            offset = result.get("next_page_offset")
+            if offset is None:
+                return cls(payloads)
+
+    def lookup(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        """질문이 특정 조(또는 항)를 완전히 지정하면 해당 청크를 반환합니다. 아니면 None.
+
+        질문에 법령 이름, 조문 제목, 짧은 요청 외의 내용이 있거나 참조가 여러 개이면
+        None을 반환해 검색으로 넘깁니다.
+        """
+        title = structure_query_title(query)
+        if title is None:
+            return None
+        chapter, article, item = parse_structure_ref(query)
+        if article is None:
+            return None
+        if chapter is None:
+            # 장이 없으면 조 번호가 한 장에만 있을 때만 확정 (부칙의 제1조 등은 여러 장에 존재)
+            chapters = self.chapters_by_article.get(article, set())
+            if len(chapters) != 1:
+                return None
+            chapter = next(iter(chapters))
+        chunks = self.articles.get((chapter, article))
+        if not chunks:
+            return None
+        # 참조 뒤의 글자는 그 조의 제목일 때만 허용 ('제3조 정의'는 조회, '제3조 처벌'은 검색)
+        if title and not any(_compact_title(c.get("article_title") or "") == title for c in chunks):
+            return None
+        if item is None:
+            return list(chunks)
+        matched = [c for c in chunks if c.get("item_no") == item]
+        return matched or None
+
+
+_index: Optional[StructuralIndex] = None
+# 마지막 로드 시도 시각 (time.monotonic 기준, None이면 아직 시도하지 않음)
+_last_attempt: Optional[float] = None
+
+
+async def get_structural_index() -> Optional[StructuralIndex]:
+    """처음 호출될 때 인덱스를 만들어 재사용합니다.
+
+    structured_chunks.json이 있으면 그 파일을, 없으면 Qdrant payload를 사용합니다.
+    """
+    global _index, _last_attempt
+    if _index is not None or (
+        _last_attempt is not None and time.monotonic() - _last_attempt < _RETRY_AFTER
+    ):
+        return _index
+    _last_attempt = time.monotonic()
+    path = Path(STRUCTURED_CHUNKS_PATH)
+    try:
+        if path.exists():
+            _index = StructuralIndex.from_chunks_file(path)
+        else:
+            _index = await StructuralIndex.from_qdrant()
+        print(f"📌 구조 인덱스 로드: {len(_index)}개 청크, {len(_index.articles)}개 조문")
+    except Exception as e:
+        print(f"📌 구조 인덱스를 만들지 못했습니다: {str(e)}")
+    return _index
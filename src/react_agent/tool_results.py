@@ -0,0 +1,198 @@
+"""Content-addressed storage for large tool results.
+
+A search tool returns ten full legal chunks. If that ``ToolMessage`` stays in
+``State.messages``, it is serialized into every later checkpoint and resent to
+the model on every later step. ``ToolResultNode`` stores large results in
+``ToolResultStore`` instead. The store is keyed by the SHA-256 of the content,
+with an in-memory LRU tier and a bounded SQLite tier. The message kept in state
+holds a short stub, and the key goes in ``artifact``. ``expand_current_turn``
+swaps the full content back in, but only for tool results after the last user
+message, i.e. the turn the model is currently working on.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from dataclasses import replace
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.messages import AnyMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.prebuilt import ToolNode
+from langgraph.types import Command
+
+from react_agent.cache import DiskCache, LRUCache
+
+# 이 길이(문자)를 넘는 도구 결과만 저장소로 옮김
+TOOL_RESULT_INLINE_MAX = int(os.environ.get("TOOL_RESULT_INLINE_MAX", "1000"))
+# 이전 턴 결과 대신 남길 미리보기 길이(문자)
+TOOL_RESULT_PREVIEW_CHARS = int(os.environ.get("TOOL_RESULT_PREVIEW_CHARS", "200"))
+TOOL_RESULT_CACHE_SIZE = int(os.environ.get("TOOL_RESULT_CACHE_SIZE", "256"))
+# 디스크 계층 (TOOL_RESULT_STORE_PATH가 비어 있으면 메모리만 사용)
+TOOL_RESULT_STORE_PATH = os.environ.get(
+    "TOOL_RESULT_STORE_PATH", "finto/data/cache/tool_results.sqlite"
+)
+TOOL_RESULT_STORE_SIZE = int(os.environ.get("TOOL_RESULT_STORE_SIZE", "100000"))
+# 체크포인트보다 먼저 사라지지 않도록 기본값은 CHECKPOINT_TTL과 같은 7일
+TOOL_RESULT_STORE_TTL = float(os.environ.get("TOOL_RESULT_STORE_TTL", str(7 * 24 * 3600)))
+
+# ToolMessage.artifact에 저장하는 참조 키
+REFERENCE_KEY = "tool_result_ref"
+
+
+class ToolResultStore:
+    """SHA-256 키로 도구 결과 문자열을 저장하는 2계층 저장소 (메모리 LRU + SQLite)."""
+
+    def __init__(
+        self,
+        *,
+        maxsize: int = TOOL_RESULT_CACHE_SIZE,
+        disk_path: Optional[str] = TOOL_RESULT_STORE_PATH,
+        disk_size: int = TOOL_RESULT_STORE_SIZE,
+        ttl: Optional[float] = TOOL_RESULT_STORE_TTL,
+    ) -> None:
+        """Create the store (the disk tier is opened on first use).
+
+        Args:
+            maxsize: 메모리에 유지할 최대 결과 수
+            disk_path: 디스크 계층(SQLite) 경로. 비어 있으면 메모리만 사용
+            disk_size: 디스크에 유지할 최대 결과 수
+            ttl: 디스크 항목 유효 시간(초). None 또는 0이면 만료 없음
+        """
+        self.memory: LRUCache[str] = LRUCache(maxsize)
+        self.disk_path = disk_path
+        self.disk_size = disk_size
+        self.ttl = ttl
+        self._disk: Optional[DiskCache] = None
+        self._disk_lock = threading.Lock()
+
+    def _get_disk(self) -> Optional[DiskCache]:
+        if self._disk is None and self.disk_path:
+            with self._disk_lock:
+                if self._disk is None:
+                    self._disk = DiskCache(self.disk_path, self.disk_size, self.ttl)
+        return self._disk
+
+    @staticmethod
+    def key(content: str) -> str:
+        """내용의 SHA-256 해시 (같은 결과는 한 번만 저장됨)."""
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def put(self, content: str) -> str:
+        """결과를 저장하고 키를 반환합니다."""
+        key = self.key(content)
+        if self.memory.get(key) is None:
+            self.memory.set(key, content)
+            disk = self._get_disk()
+            if disk is not None:
+                disk.set(key, content.encode("utf-8"))
+        return key
+
+    def get(self, key: str) -> Optional[str]:
+        """저장된 결과를 반환합니다 (디스크 히트는 메모리로 승격). 없으면 None."""
+        content = self.memory.get(key)
+        if content is None:
+            disk = self._get_disk()
+            raw = disk.get(key) if disk is not None else None
+            if raw is not None:
+                content = raw.decode("utf-8")
+                self.memory.set(key, content)
+        return content
+
+    def stats(self) -> Dict[str, Any]:
+        """메모리/디스크 계층별 히트·미스 카운터를 반환합니다."""
+        stats: Dict[str, Any] = {"memory": self.memory.stats()}
+        disk = self._get_disk()
+        if disk is not None:
+            stats["disk"] = disk.stats()
+        return stats
+
+
+tool_result_store = ToolResultStore()
+
+
+def reference_of(message: AnyMessage) -> Optional[str]:
+    """참조로 바뀐 ToolMessage이면 저장소 키를, 아니면 None을 반환합니다."""
+    if isinstance(message, ToolMessage) and isinstance(message.artifact, dict):
+        return message.artifact.get(REFERENCE_KEY)
+    return None
+
+
+def to_reference(
+    message: ToolMessage, store: Optional[ToolResultStore] = None
+) -> ToolMessage:
+    """큰 ToolMessage의 내용을 저장소에 넣고 미리보기 + 참조만 남긴 사본을 반환합니다.
+
+    짧은 결과, 문자열이 아닌 결과, 이미 참조인 메시지는 그대로 반환합니다.
+    """
+    content = message.content
+    if (
+        reference_of(message) is not None
+        or not isinstance(content, str)
+        or len(content) <= TOOL_RESULT_INLINE_MAX
+    ):
+        return message
+    store = store or tool_result_store
+    key = store.put(content)
+    preview = content[:TOOL_RESULT_PREVIEW_CHARS]
+    stub = (
+        f"[이전 도구 결과 {len(content)}자 중 앞부분만 표시합니다. "
+        f"필요하면 다시 검색하세요. 참조 {key[:16]}]\n{preview}…"
+    )
+    artifact = {REFERENCE_KEY: key, "chars": len(content)}
+    return message.model_copy(update={"content": stub, "artifact": artifact})
+
+
+def expand_current_turn(
+    messages: Sequence[AnyMessage], store: Optional[ToolResultStore] = None
+) -> List[AnyMessage]:
+    """마지막 사용자 메시지 이후(현재 턴)의 참조만 원래 결과로 펼칩니다.
+
+    이전 턴의 결과는 미리보기로 남기고, 저장소에서 사라진 결과도 미리보기를 유지합니다.
+    """
+    store = store or tool_result_store
+    turn_start = 0
+    for i in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[i], HumanMessage):
+            turn_start = i
+            break
+    expanded = list(messages)
+    for i in range(turn_start, len(expanded)):
+        key = reference_of(expanded[i])
+        if key is None:
+            continue
+        content = store.get(key)
+        if content is not None:
+            expanded[i] = expanded[i].model_copy(update={"content": content})
+    return expanded
+
+
+class ToolResultNode(ToolNode):
+    """큰 도구 결과를 저장소에 넣고 참조 메시지만 상태에 남기는 ToolNode.
+
+    ToolNode가 반환한 값(메시지 목록, {"messages": [...]}, Command 목록)을 받아
+    그 안의 ToolMessage만 참조로 바꿉니다.
+    """
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        """도구를 실행하고 큰 결과를 참조로 바꿔 반환합니다."""
+        return self._with_references(super().invoke(input, config, **kwargs))
+
+    async def ainvoke(
+        self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any
+    ) -> Any:
+        """도구를 비동기로 실행하고 큰 결과를 참조로 바꿔 반환합니다."""
+        return self._with_references(await super().ainvoke(input, config, **kwargs))
+
+    def _with_references(self, output: Any) -> Any:
+        if isinstance(output, ToolMessage):
+            return to_reference(output)
+        if isinstance(output, list):
+            return [self._with_references(item) for item in output]
+        if isinstance(output, dict) and self.messages_key in output:
+            return {**output, self.messages_key: self._with_references(output[self.messages_key])}
+        if isinstance(output, Command) and output.update is not None:
+            return replace(output, update=self._with_references(output.update))
+        return output
@@ -1,27 +1,49 @@
-from qdrant_client import QdrantClient
-from qdrant_client.models import PointStruct, Filter, FieldCondition, MatchValue
-import os
-import requests
-import json
-from typing import Annotated, List, Dict, Any, Optional
+"""This module provides tools for vector search and reranking functionality.
+
+These tools are specialized for legal document search with vector and hybrid reranking capabilities.
+"""
+
+from typing import Annotated, Any, Callable, Dict, List, Optional
 from langchain_core.runnables.config import RunnableConfig
 from langgraph.prebuilt.tool_node import InjectedToolArg
-from typing import Any
-from sentence_transformers import SentenceTransformer
-import re
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from langchain_anthropic import ChatAnthropic
-from langchain_core.messages import HumanMessage, SystemMessage
+import json
+import traceback
+
+from react_agent.configuration import Configuration
+from react_agent.render import count_tokens, render_results
+from react_agent.retrieval import (
+    PipelineResult,
+    run_batch_search_pipeline,
+    run_search_pipeline,
+    semantic_cache_stats,
+)
+from react_agent.vector_store import SearchError
 
-QDRANT_URL = os.environ.get("QDRANT_URL", "http://localhost:6333")
-COLLECTION_NAME = os.environ.get("COLLECTION_NAME", "my-collection")
-EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
 
-# 임베딩 모델 초기화
-model = SentenceTransformer(EMBEDDING_MODEL)
-qdrant_client = QdrantClient(url=QDRANT_URL)
+def _tool_output(
+    result: PipelineResult, config: Optional[RunnableConfig]
+) -> List[Dict[str, Any]]:
+    """파이프라인 결과를 도구 반환 형식으로 변환합니다.
+
+    compact_search_results가 켜져 있으면 조 단위로 합쳐 토큰 예산 안에 정리하고,
+    디버그 모드면 단계별 소요 시간과 토큰 수(시맨틱 캐시를 쓰면 캐시 통계도)를 덧붙입니다.
+    """
+    configuration = Configuration.from_runnable_config(config)
+    output: List[Dict[str, Any]] = list(result.results)
+    if configuration.compact_search_results:
+        output = render_results(output, configuration.search_result_token_budget)
+    if not output:
+        output = [{"error": "검색 결과가 없습니다."}]
+    if configuration.search_debug:
+        debug = result.debug_info()
+        debug["tokens"] = {
+            "payload": count_tokens(json.dumps(result.results, ensure_ascii=False)),
+            "rendered": count_tokens(json.dumps(output, ensure_ascii=False)),
+        }
+        if configuration.semantic_cache:
+            debug["semantic_cache"] = semantic_cache_stats()
+        output.append({"debug": debug})
+    return output
 
 async def qdrant_search(
     query: str, 
@@ -37,7 +59,7 @@ async def qdrant_search(
         query: The text query to search for
         top_k: The final number of results to return after reranking
         initial_k: The initial number of results to fetch for reranking
-        reranking_method: The reranking method to use ('hybrid', 'tfidf')
+        reranking_method: The reranking method to use ('hybrid', 'tfidf', 'mmr')
         
     Returns:
         A list of search results
@@ -45,188 +67,28 @@ async def qdrant_search(
     print(f"📌 qdrant_search 함수 호출됨: 쿼리='{query}', top_k={top_k}, initial_k={initial_k}, method={reranking_method}")
     
     try:
-        # 법령 구조 관련 키워드 추출 (예: 제1장, 제1조)
-        chapter_match = re.search(r'제(\d+)장', query)
-        # '제1조'와 '1조' 두 가지 패턴 모두 인식
-        article_match = re.search(r'(?:제)?(\d+)조', query)
-        
-        # REST API 요청 준비
-        url = f"{QDRANT_URL}/collections/{COLLECTION_NAME}/points/search"
-        
-        # 필터 조건 설정
-        filter_conditions = None
-        if chapter_match or article_match:
-            must_conditions = []
-            
-            if chapter_match:
-                chapter_no = f"제{chapter_match.group(1)}장"
-                must_conditions.append({
-                    "key": "chapter_no",
-                    "match": {"value": chapter_no}
-                })
-                
-            if article_match:
-                article_no = f"제{article_match.group(1)}조"
-                must_conditions.append({
-                    "key": "article_no",
-                    "match": {"value": article_no}
-                })
-                
-            if must_conditions:
-                filter_conditions = {"must": must_conditions}
-        
-        # 텍스트 쿼리를 벡터로 변환
-        query_vector = model.encode(query).tolist()
-    
-        # REST API 요청 페이로드 구성 - 초기 검색에서 더 많은 수의 결과를 가져옴
-        payload = {
-            "params": {"hnsw_ef": 128, "exact": False},
-            "vector": {"name": EMBEDDING_MODEL, "vector": query_vector},
-            "limit": initial_k,  # 초기에 더 많은 결과를 가져오기 위해 initial_k 사용
-            "with_payload": True,
-            "with_vectors": False,
-            "score_threshold": 0.0
-        }
-        
-        # 필터 조건이 있으면 추가
-        if filter_conditions:
-            payload["filter"] = filter_conditions
-            print(f"📌 Qdrant 검색 필터 적용: {json.dumps(filter_conditions)}")
-        
-        print(f"📌 Qdrant API URL: {url}")
-        response = requests.post(url, json=payload)
-        print(f"📌 Qdrant API 응답 상태 코드: {response.status_code}")
-        
-        if response.status_code == 200:
-            data = response.json()
-            if "result" in data:
-                initial_results = data["result"]
-                print(f"📌 초기 검색: {len(initial_results)}개 항목 가져옴")
-                
-                # 결과가 충분하지 않으면 필터 없이 다시 검색
-                if len(initial_results) < initial_k / 2 and filter_conditions:
-                    print(f"📌 검색 결과가 충분하지 않아 필터 없이 다시 검색합니다.")
-                    payload.pop("filter", None)
-                    response = requests.post(url, json=payload)
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        if "result" in data:
-                            initial_results = data["result"]
-                            print(f"📌 필터 없는 초기 검색: {len(initial_results)}개 항목 가져옴")
-                
-                # 결과가 없으면 오류 반환
-                if not initial_results:
-                    return [{"error": "검색 결과가 없습니다."}]
-                
-                # 리랭킹 진행
-                if reranking_method == "tfidf":
-                    reranked_results = rerank_with_tfidf(query, initial_results, top_k)
-                    print(f"📌 TF-IDF 리랭킹 완료: {len(reranked_results)}개 결과")
-                else:  # hybrid 방식 사용
-                    reranked_results = rerank_with_hybrid(query, initial_results, top_k)
-                    print(f"📌 하이브리드 리랭킹 완료: {len(reranked_results)}개 결과")
-                
-                # 페이로드만 반환
-                return [result["payload"] for result in reranked_results]
-            else:
-                print(f"📌 Qdrant 검색 오류: 결과에 데이터가 없음 - {response.text}")
-                return [{"error": f"검색 결과에 데이터가 없습니다: {response.text}"}]
-        else:
-            print(f"📌 Qdrant 검색 오류: API 응답 실패 - {response.status_code} - {response.text}")
-            return [{"error": f"검색 중 오류 발생: {response.text}"}]
+        configuration = Configuration.from_runnable_config(config)
+        result = await run_search_pipeline(
+            query,
+            top_k=top_k,
+            initial_k=initial_k,
+            reranking_method=reranking_method,
+            rewrite=False,
+            structural=configuration.structural_lookup,
+            cross_encoder=configuration.cross_encoder_rerank,
+            expand_depth=configuration.context_expansion_depth,
+            mmr_lambda=configuration.mmr_lambda,
+            use_semantic_cache=configuration.semantic_cache,
+            semantic_cache_threshold=configuration.semantic_cache_threshold,
+        )
+        return _tool_output(result, config)
+    except SearchError as e:
+        return [{"error": str(e)}]
     except Exception as e:
         print(f"📌 Qdrant 검색 예외: {str(e)}")
-        import traceback
         print(f"📌 예외 상세 정보: {traceback.format_exc()}")
         return [{"error": f"검색 중 예외 발생: {str(e)}"}]
 
-def rerank_with_tfidf(query, results, top_n=5):
-    """TF-IDF 기반으로 결과를 재랭킹합니다."""
-    # 결과가 충분하지 않으면 그대로 반환
-    if len(results) <= top_n:
-        return results
-    
-    # 결과에서 텍스트 추출
-    texts = [result["payload"].get("cleaned_content", "") for result in results]
-    
-    # 쿼리와 텍스트를 함께 TF-IDF 변환
-    tfidf = TfidfVectorizer().fit_transform(texts + [query])
-    
-    # 마지막 벡터(쿼리)와 다른 모든 텍스트 간의 유사도 계산
-    similarities = cosine_similarity(tfidf[-1:], tfidf[:-1])[0]
-    
-    # 유사도에 따라 정렬
-    reranked_indices = similarities.argsort()[::-1][:top_n]
-    
-    print(f"📌 TF-IDF 리랭킹 상위 점수: {[similarities[i] for i in reranked_indices[:3]]}")
-    
-    return [results[i] for i in reranked_indices]
-
-def rerank_with_hybrid(query, results, top_n=5, alpha=0.6):
-    """벡터 검색 점수와 TF-IDF 점수를 조합하여 하이브리드 재랭킹을 수행합니다."""
-    # 결과가 충분하지 않으면 그대로 반환
-    if len(results) <= top_n:
-        return results
-    
-    # 벡터 검색 점수 정규화
-    vector_scores = np.array([result["score"] for result in results])
-    if vector_scores.max() != vector_scores.min():  # 분모가 0이 되지 않도록 체크
-        vector_scores = (vector_scores - vector_scores.min()) / (vector_scores.max() - vector_scores.min())
-    else:
-        vector_scores = np.ones_like(vector_scores)
-    
-    # 텍스트 기반 유사도 계산
-    texts = [result["payload"].get("cleaned_content", "") for result in results]
-    
-    try:
-        tfidf = TfidfVectorizer().fit_transform(texts + [query])
-        tfidf_scores = cosine_similarity(tfidf[-1:], tfidf[:-1])[0]
-        
-        if tfidf_scores.max() != tfidf_scores.min():  # 분모가 0이 되지 않도록 체크
-            tfidf_scores = (tfidf_scores - tfidf_scores.min()) / (tfidf_scores.max() - tfidf_scores.min())
-        else:
-            tfidf_scores = np.ones_like(tfidf_scores)
-        
-        # 점수 조합
-        combined_scores = alpha * vector_scores + (1 - alpha) * tfidf_scores
-    except Exception as e:
-        print(f"📌 TF-IDF 계산 중 오류, 벡터 점수만 사용합니다: {str(e)}")
-        combined_scores = vector_scores
-    
-    # 조합된 점수로 정렬
-    reranked_indices = combined_scores.argsort()[::-1][:top_n]
-    
-    print(f"📌 하이브리드 리랭킹 상위 점수: {[combined_scores[i] for i in reranked_indices[:3]]}")
-    
-    return [results[i] for i in reranked_indices]
-
-async def restructure_query_with_llm(query: str) -> str:
-    """LLM을 사용하여 법률 검색에 최적화된 형태로 질문을 재구성합니다."""
-    model = ChatAnthropic(
-        model="claude-3-5-haiku-20241022",
-        temperature=0.0,
-        max_tokens=1000
-    )
-    
-    system_prompt = """당신은 법률 검색 전문가입니다. 사용자의 질문을 법률 검색에 최적화된 형태로 재구성해주세요.
-    다음 사항을 고려하여 재구성해주세요:
-    1. 법률 용어를 정확하게 사용
-    2. 법률 문서 구조를 고려 (조, 장, 절 등)
-    3. 검색 의도를 명확히 표현
-    4. 관련 법률 분야를 명시
-    5. 구체적인 법률 개념을 포함
-    
-    재구성된 질문은 검색에 최적화되어야 하며, 원래 의도를 유지해야 합니다."""
-    
-    messages = [
-        SystemMessage(content=system_prompt),
-        HumanMessage(content=f"원본 질문: {query}\n\n재구성된 질문:")
-    ]
-    
-    response = await model.ainvoke(messages)
-    return response.content.strip()
-
 async def qdrant_search_reranked(
     query: str,
     top_k: int = 5,
@@ -235,45 +97,78 @@ async def qdrant_search_reranked(
     *, 
     config: Annotated[RunnableConfig, InjectedToolArg]
 ) -> List[Dict[str, Any]]:
-    """법률 문서를 검색하고 결과를 리랭킹합니다."""
+    """법률 문서를 검색하고 결과를 리랭킹합니다.
+
+    질문 재구성 -> 임베딩 -> 검색 -> 리랭킹 -> 결과 정리를 각각 한 번씩 수행합니다.
+    """
     try:
-        # 1. LLM을 통한 질문 재구성
-        restructured_query = await restructure_query_with_llm(query)
-        print(f"원본 질문: {query}")
-        print(f"재구성된 질문: {restructured_query}")
-        
-        # 2. 벡터 검색
-        query_vector = model.encode(restructured_query).tolist()
-        payload = {
-            "vector": {"name": EMBEDDING_MODEL, "vector": query_vector},
-            "limit": initial_k
-        }
-        
-        # 3. 검색 실행
-        results = await qdrant_search(restructured_query, top_k, initial_k, reranking_method, config=config)
-        
-        # 4. 리랭킹
-        if reranking_method == "hybrid":
-            reranked_results = rerank_with_hybrid(restructured_query, results, top_k)
-        else:
-            reranked_results = rerank_with_tfidf(restructured_query, results, top_k)
-            
-        return reranked_results
-        
+        configuration = Configuration.from_runnable_config(config)
+        result = await run_search_pipeline(
+            query,
+            top_k=top_k,
+            initial_k=initial_k,
+            reranking_method=reranking_method,
+            rewrite=True,
+            speculative=configuration.speculative_search,
+            rewrite_deadline_ms=configuration.rewrite_deadline_ms,
+            structural=configuration.structural_lookup,
+            cross_encoder=configuration.cross_encoder_rerank,
+            expand_depth=configuration.context_expansion_depth,
+            mmr_lambda=configuration.mmr_lambda,
+            use_semantic_cache=configuration.semantic_cache,
+            semantic_cache_threshold=configuration.semantic_cache_threshold,
+        )
+        return _tool_output(result, config)
+    except SearchError as e:
+        return [{"error": str(e)}]
     except Exception as e:
         print(f"검색 중 오류 발생: {str(e)}")
-        return []
+        print(f"📌 예외 상세 정보: {traceback.format_exc()}")
+        return [{"error": f"검색 중 예외 발생: {str(e)}"}]
 
-"""This module provides tools for vector search and reranking functionality.
+async def qdrant_search_batch(
+    queries: List[str],
+    top_k: int = 5,
+    initial_k: int = 20,
+    reranking_method: str = "hybrid",
+    *,
+    config: Annotated[RunnableConfig, InjectedToolArg]
+) -> List[Dict[str, Any]]:
+    """여러 질문(하위 질문 등)으로 법률 문서를 한 번에 검색합니다.
 
-These tools are specialized for legal document search with vector and hybrid reranking capabilities.
-"""
+    모든 질문을 한 번에 임베딩하고, 하나의 batch 요청으로 검색한 뒤 함께 리랭킹합니다.
+    질문은 재구성하지 않으므로 검색에 알맞은 형태로 전달하세요.
 
-from typing import Any, Callable, List, Optional, cast
-from langchain_core.runnables import RunnableConfig
-from langchain_core.tools import InjectedToolArg
-from typing_extensions import Annotated
+    Args:
+        queries: 검색할 질문 목록
+        top_k: 질문마다 리랭킹 후 반환할 결과 수
+        initial_k: 질문마다 리랭킹을 위해 처음 가져올 후보 수
+        reranking_method: 리랭킹 방식 ('hybrid', 'tfidf', 'mmr')
 
-from react_agent.configuration import Configuration
+    Returns:
+        질문 순서대로 {"query", "results"} 목록
+    """
+    print(f"📌 qdrant_search_batch 함수 호출됨: {len(queries)}개 질문, top_k={top_k}, initial_k={initial_k}")
+    try:
+        configuration = Configuration.from_runnable_config(config)
+        results = await run_batch_search_pipeline(
+            list(queries),
+            top_k=top_k,
+            initial_k=initial_k,
+            reranking_method=reranking_method,
+            structural=configuration.structural_lookup,
+            expand_depth=configuration.context_expansion_depth,
+            mmr_lambda=configuration.mmr_lambda,
+        )
+        return [
+            {"query": result.query, "results": _tool_output(result, config)}
+            for result in results
+        ]
+    except SearchError as e:
+        return [{"error": str(e)}]
+    except Exception as e:
+        print(f"📌 배치 검색 예외: {str(e)}")
+        print(f"📌 예외 상세 정보: {traceback.format_exc()}")
+        return [{"error": f"검색 중 예외 발생: {str(e)}"}]
 
-TOOLS: List[Callable[..., Any]] = [qdrant_search_reranked]
+TOOLS: List[Callable[..., Any]] = [qdrant_search_reranked, qdrant_search_batch]
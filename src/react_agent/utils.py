@@ -1,6 +1,8 @@
 """Utility & helper functions."""
 
 import json
+import re
+import unicodedata
 from pathlib import Path
 from typing import Dict, Any
 import aiofiles
@@ -19,6 +21,18 @@ def get_message_text(msg: BaseMessage) -> str:
         return "".join(txts).strip()
 
 
+def normalize_query(text: str) -> str:
+    """Normalize a search query so that equivalent questions share cache keys.
+
+    Applies NFC normalization, collapses whitespace and canonicalizes article
+    and chapter references (``1조``, ``제 1 조`` -> ``제1조``).
+    """
+    text = unicodedata.normalize("NFC", text)
+    text = re.sub(r"(?:제\s*)?(\d+)\s*조", r"제\1조", text)
+    text = re.sub(r"제\s*(\d+)\s*장", r"제\1장", text)
+    return " ".join(text.split()).casefold()
+
+
 async def load_mcp_config_json(filepath: str = "mcp_config.json") -> Dict[str, Any]:
     """
     Load the mcp_config.json file and process the configuration.
@@ -0,0 +1,548 @@
+"""Vector store backends for the search pipeline.
+
+``QdrantVectorStore`` sends requests to the Qdrant REST API. ``LocalVectorStore``
+memory-maps ``vectors.npy`` (or ``vectors.<dtype>.npy`` for ``VECTOR_DTYPE``
+float16/int8) next to the chunk payloads and answers queries with
+an exact matrix-vector product. An optional IVF index covers larger corpora.
+The local backend needs no network hop, so it also serves as an offline
+stand-in for tests and benchmarks. Set ``VECTOR_STORE`` to pick the backend.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from react_agent.lexical import get_lexical_index
+from react_agent.qdrant_transport import QDRANT_URL, get_transport
+from react_agent.render import RESULT_PAYLOAD_FIELDS
+from react_agent.structure_index import STRUCTURED_CHUNKS_PATH, chunk_to_payload
+
+COLLECTION_NAME = os.environ.get("COLLECTION_NAME", "my-collection")
+EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+
+# 검색 방식: "hybrid"는 dense + sparse(어휘) 후보를 Qdrant 안에서 융합, "dense"는 벡터 검색만
+SEARCH_MODE = os.environ.get("SEARCH_MODE", "hybrid")
+SEARCH_FUSION = os.environ.get("SEARCH_FUSION", "rrf")  # "rrf" 또는 "dbsf"
+SPARSE_VECTOR_NAME = os.environ.get("SPARSE_VECTOR_NAME", "lexical")
+
+# 벡터 저장소: "qdrant" 또는 "local" (vectors.npy + structured_chunks.json)
+VECTOR_STORE = os.environ.get("VECTOR_STORE", "qdrant")
+LOCAL_VECTORS_PATH = os.environ.get(
+    "LOCAL_VECTORS_PATH", "finto/data/intermediate/vectors.npy"
+)
+# 포인트 수가 이 값 이상이면 로컬 저장소에서 IVF 근사 검색 사용
+LOCAL_ANN_MIN_POINTS = int(os.environ.get("LOCAL_ANN_MIN_POINTS", "20000"))
+LOCAL_ANN_NPROBE = int(os.environ.get("LOCAL_ANN_NPROBE", "8"))
+
+# 양자화된 컬렉션에서 원본 벡터로 다시 점수를 매길 때의 후보 배수 (0이면 Qdrant 기본값)
+SEARCH_RESCORE_OVERSAMPLING = float(os.environ.get("SEARCH_RESCORE_OVERSAMPLING", "0"))
+
+VECTOR_DTYPES = ("float32", "float16", "int8")
+# 로컬 저장소가 읽을 벡터 형식. float16/int8이면 vectors.npy 옆의 vectors.<형식>.npy를 사용
+# (vectors.npy는 Qdrant 업로드와 rescore를 위해 항상 float32 원본으로 유지)
+VECTOR_DTYPE = os.environ.get("VECTOR_DTYPE", "float32")
+
+# 컬렉션 metadata에 적재 시각을 기록하는 키 (4_upload_qdrant.py)
+INGEST_VERSION_KEY = "ingest_version"
+
+Hit = Dict[str, Any]
+Filter = Dict[str, Any]
+
+
+class SearchError(Exception):
+    """Qdrant 검색 요청이 실패했을 때 발생합니다."""
+
+
+class VectorStore(ABC):
+    """검색 파이프라인이 사용하는 벡터 저장소 인터페이스.
+
+    결과는 Qdrant 응답과 같은 형식({"id", "score", "payload"})의 목록입니다.
+    """
+
+    @abstractmethod
+    async def search(
+        self,
+        query: str,
+        query_vector: List[float],
+        limit: int,
+        filter_conditions: Optional[Filter] = None,
+        with_vectors: bool = False,
+    ) -> List[Hit]:
+        """질문 벡터와 가까운 포인트를 limit개까지 반환합니다.
+
+        with_vectors가 켜져 있으면 각 결과에 임베딩 벡터("vector")도 포함합니다.
+        """
+
+    async def healthcheck(self) -> None:
+        """저장소를 사용할 수 있는지 확인합니다 (실패 시 예외)."""
+
+    async def version(self) -> str:
+        """데이터가 다시 적재되면 바뀌는 버전 문자열 (결과 캐시 무효화용)."""
+        return ""
+
+    @abstractmethod
+    async def fetch_by_chunk_ids(self, chunk_ids: Sequence[str]) -> List[Dict[str, Any]]:
+        """payload의 청크 ID(예: '2-10-③')로 청크를 한 번에 가져옵니다.
+
+        없는 ID는 무시하고, 같은 ID의 청크가 여러 개면 모두 반환합니다.
+        """
+
+    async def search_many(
+        self,
+        query: str,
+        query_vector: List[float],
+        limit: int,
+        filters: Sequence[Optional[Filter]],
+        with_vectors: bool = False,
+    ) -> List[List[Hit]]:
+        """같은 질문을 여러 필터로 검색합니다 (필터 순서대로 결과 반환)."""
+        return list(
+            await asyncio.gather(
+                *(self.search(query, query_vector, limit, f, with_vectors) for f in filters)
+            )
+        )
+
+    async def search_batch(
+        self,
+        queries: Sequence[str],
+        query_vectors: Sequence[List[float]],
+        limit: int,
+        filters: Sequence[Optional[Filter]],
+        with_vectors: bool = False,
+    ) -> List[List[Hit]]:
+        """서로 다른 질문 여러 개를 한꺼번에 검색합니다 (입력 순서대로 결과 반환)."""
+        return list(
+            await asyncio.gather(
+                *(
+                    self.search(q, v, limit, f, with_vectors)
+                    for q, v, f in zip(queries, query_vectors, filters)
+                )
+            )
+        )
+
+
+def local_vectors_path(
+    path: Optional[str | Path] = None, dtype: Optional[str] = None
+) -> Path:
+    """형식별 로컬 벡터 파일 경로를 반환합니다 (예: vectors.npy -> vectors.int8.npy).
+
+    Args:
+        path: float32 원본 벡터 파일 경로 (없으면 LOCAL_VECTORS_PATH)
+        dtype: 벡터 형식 (없으면 VECTOR_DTYPE)
+    """
+    path = Path(path or LOCAL_VECTORS_PATH)
+    dtype = dtype or VECTOR_DTYPE
+    if dtype == "float32":
+        return path
+    if dtype not in VECTOR_DTYPES:
+        raise ValueError(f"지원하지 않는 벡터 형식입니다: {dtype} (가능: {', '.join(VECTOR_DTYPES)})")
+    return path.with_name(f"{path.stem}.{dtype}{path.suffix}")
+
+
+def quantize_vectors(vectors: np.ndarray, dtype: str = "float32") -> np.ndarray:
+    """로컬 벡터 파일용으로 벡터를 float16 또는 int8로 변환합니다.
+
+    int8은 행마다 최대 절댓값을 127로 맞춥니다. 행 단위 배율은 코사인 유사도에
+    영향을 주지 않으므로 배율을 따로 저장하지 않습니다.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if dtype == "float32":
+        return vectors
+    if dtype == "float16":
+        return vectors.astype(np.float16)
+    if dtype == "int8":
+        scale = 127.0 / np.maximum(np.abs(vectors).max(axis=1, keepdims=True), 1e-12)
+        return np.round(vectors * scale).astype(np.int8)
+    raise ValueError(f"지원하지 않는 벡터 형식입니다: {dtype} (가능: {', '.join(VECTOR_DTYPES)})")
+
+
+def _search_params() -> Dict[str, Any]:
+    params: Dict[str, Any] = {"hnsw_ef": 128, "exact": False}
+    if SEARCH_RESCORE_OVERSAMPLING > 0:
+        # 양자화 벡터로 oversampling배 후보를 찾은 뒤 원본 벡터로 재점수
+        params["quantization"] = {
+            "rescore": True,
+            "oversampling": SEARCH_RESCORE_OVERSAMPLING,
+        }
+    return params
+
+
+def build_search_request(query, query_vector, limit, filter_conditions=None, with_vectors=False):
+    """Qdrant 검색 요청의 (경로, 페이로드)를 만듭니다.
+
+    SEARCH_MODE가 hybrid이고 어휘 인덱스가 있으면 dense/sparse prefetch와 fusion을
+    하나의 /points/query 요청으로 보내 후보 생성과 융합을 Qdrant 안에서 처리합니다.
+    with_vectors가 켜져 있으면 dense 벡터만 함께 요청합니다 (MMR 리랭킹용).
+    """
+    with_vector = [EMBEDDING_MODEL] if with_vectors else False
+    index = get_lexical_index() if SEARCH_MODE == "hybrid" else None
+    sparse_indices, sparse_values = index.query_vector(query) if index else ([], [])
+
+    if sparse_indices:
+        prefetch = [
+            {
+                "query": query_vector,
+                "using": EMBEDDING_MODEL,
+                "limit": limit,
+                "params": _search_params(),
+            },
+            {
+                "query": {"indices": sparse_indices, "values": sparse_values},
+                "using": SPARSE_VECTOR_NAME,
+                "limit": limit,
+            },
+        ]
+        if filter_conditions:
+            for request in prefetch:
+                request["filter"] = filter_conditions
+        payload = {
+            "prefetch": prefetch,
+            "query": {"fusion": SEARCH_FUSION},
+            "limit": limit,
+            # 렌더링/리랭킹에 필요한 필드만 요청 (content 중복, 법령 공통 정보 제외)
+            "with_payload": {"include": RESULT_PAYLOAD_FIELDS},
+            "with_vector": with_vector,
+        }
+        return f"/collections/{COLLECTION_NAME}/points/query", payload
+
+    # REST API 요청 페이로드 구성 - 초기 검색에서 더 많은 수의 결과를 가져옴
+    payload = {
+        "params": _search_params(),
+        "vector": {"name": EMBEDDING_MODEL, "vector": query_vector},
+        "limit": limit,
+        "with_payload": {"include": RESULT_PAYLOAD_FIELDS},
+        "with_vectors": with_vector,
+        "score_threshold": 0.0
+    }
+    if filter_conditions:
+        payload["filter"] = filter_conditions
+    return f"/collections/{COLLECTION_NAME}/points/search", payload
+
+
+def hit_vector(hit: Hit) -> Optional[Any]:
+    """결과에 포함된 dense 벡터를 꺼냅니다 (named vector 형식이면 EMBEDDING_MODEL 항목)."""
+    vector = hit.get("vector")
+    if isinstance(vector, dict):
+        vector = vector.get(EMBEDDING_MODEL)
+    return vector
+
+
+def search_results_from_response(data):
+    """검색 응답에서 포인트 목록을 꺼냅니다 (/points/search와 /points/query 형식 모두 지원)."""
+    result = data["result"]
+    return result["points"] if isinstance(result, dict) else result
+
+
+def _with_score_source(path: str, hits: List[Hit]) -> List[Hit]:
+    # /points/query 결과의 점수는 코사인 유사도가 아닌 융합 점수 (교차 인코더 생략 판단에 사용)
+    if path.endswith("/points/query"):
+        for hit in hits:
+            hit["score_source"] = SEARCH_FUSION
+    return hits
+
+
+async def _post_search(path: str, payload: Dict[str, Any]) -> List[Hit]:
+    return search_results_from_response(await _post(path, payload))
+
+
+async def _post(path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    print(f"📌 Qdrant API URL: {QDRANT_URL}{path}")
+    response = await get_transport().post(path, payload)
+    print(f"📌 Qdrant API 응답 상태 코드: {response.status_code}")
+    if response.status_code != 200:
+        print(f"📌 Qdrant 검색 오류: API 응답 실패 - {response.status_code} - {response.text}")
+        raise SearchError(f"검색 중 오류 발생: {response.text}")
+    data = response.json()
+    if "result" not in data:
+        print(f"📌 Qdrant 검색 오류: 결과에 데이터가 없음 - {response.text}")
+        raise SearchError(f"검색 결과에 데이터가 없습니다: {response.text}")
+    return data
+
+
+async def _post_search_batch(path: str, payloads: List[Dict[str, Any]]) -> List[List[Hit]]:
+    # /points/search/batch 또는 /points/query/batch로 여러 검색을 한 번에 요청
+    results = await _post_search(f"{path}/batch", {"searches": payloads})
+    return [r["points"] if isinstance(r, dict) else r for r in results]
+
+
+class QdrantVectorStore(VectorStore):
+    """Qdrant REST API를 사용하는 저장소 (여러 필터 검색은 하나의 batch 요청)."""
+
+    async def healthcheck(self) -> None:
+        """컬렉션 정보를 조회해 Qdrant와 컬렉션을 사용할 수 있는지 확인합니다."""
+        path = f"/collections/{COLLECTION_NAME}"
+        response = await get_transport().get(path)
+        if response.status_code != 200:
+            raise SearchError(f"Qdrant 컬렉션을 확인할 수 없습니다: {response.status_code} - {response.text}")
+
+    async def version(self) -> str:
+        """컬렉션 metadata의 적재 버전(없으면 포인트 수)을 반환합니다."""
+        path = f"/collections/{COLLECTION_NAME}"
+        response = await get_transport().get(path)
+        if response.status_code != 200:
+            raise SearchError(f"Qdrant 컬렉션을 확인할 수 없습니다: {response.status_code} - {response.text}")
+        info = response.json()["result"]
+        # 4_upload_qdrant.py가 컬렉션 metadata에 기록한 적재 버전 (없으면 포인트 수로 대신함)
+        ingest_version = (info.get("config", {}).get("metadata") or {}).get(INGEST_VERSION_KEY)
+        return str(ingest_version or f"points={info.get('points_count')}")
+
+    async def search(self, query, query_vector, limit, filter_conditions=None, with_vectors=False):
+        """하나의 검색을 /points/search 또는 /points/query로 요청합니다."""
+        path, payload = build_search_request(
+            query, query_vector, limit, filter_conditions, with_vectors
+        )
+        return _with_score_source(path, await _post_search(path, payload))
+
+    async def search_many(self, query, query_vector, limit, filters, with_vectors=False):
+        """여러 필터 검색을 하나의 batch 요청으로 보냅니다."""
+        return await self.search_batch(
+            [query] * len(filters), [query_vector] * len(filters), limit, filters, with_vectors
+        )
+
+    async def search_batch(self, queries, query_vectors, limit, filters, with_vectors=False):
+        """여러 질문의 검색을 경로별 batch 요청으로 묶어 보냅니다."""
+        requests = [
+            build_search_request(q, v, limit, f, with_vectors)
+            for q, v, f in zip(queries, query_vectors, filters)
+        ]
+        # 어휘 벡터가 비는 질문은 /points/search로 가므로 경로별로 묶어 batch 요청
+        by_path: Dict[str, List[int]] = {}
+        for i, (path, _) in enumerate(requests):
+            by_path.setdefault(path, []).append(i)
+        responses = await asyncio.gather(
+            *(
+                _post_search_batch(path, [requests[i][1] for i in indices])
+                for path, indices in by_path.items()
+            )
+        )
+        results: List[List[Hit]] = [[] for _ in requests]
+        for (path, indices), hits in zip(by_path.items(), responses):
+            for i, points in zip(indices, hits):
+                results[i] = _with_score_source(path, points)
+        return results
+
+    async def fetch_by_chunk_ids(self, chunk_ids):
+        """payload의 청크 ID 필터로 scroll 요청을 보내 청크를 가져옵니다."""
+        if not chunk_ids:
+            return []
+        # 포인트 ID는 행 번호이므로 payload의 "id" 필드로 scroll 요청
+        # (청크 ID는 유일하지 않으므로 next_page_offset이 없을 때까지 이어서 조회)
+        payload: Dict[str, Any] = {
+            "filter": {"must": [{"key": "id", "match": {"any": list(chunk_ids)}}]},
+            "limit": len(chunk_ids),
+            "with_payload": {"include": RESULT_PAYLOAD_FIELDS},
+            "with_vector": False,
+        }
+        payloads = []
+        while True:
+            data = await _post(f"/collections/{COLLECTION_NAME}/points/scroll", payload)
+            payloads.extend(point["payload"] for point in data["result"]["points"])
+            offset = data["result"].get("next_page_offset")
+            if offset is None:
+                return payloads
+            payload = {**payload, "offset": offset}
+
+
+def _condition_matches(payload: Dict[str, Any], condition: Dict[str, Any]) -> bool:
+    value = payload.get(condition["key"])
+    match = condition.get("match", {})
+    if "value" in match:
+        return value == match["value"]
+    if "any" in match:
+        return value in match["any"]
+    raise ValueError(f"지원하지 않는 필터 조건입니다: {condition}")
+
+
+def payload_matches(payload: Dict[str, Any], filter_conditions: Optional[Filter]) -> bool:
+    """Qdrant 필터 중 must + match(value/any) 조건을 로컬에서 평가합니다."""
+    if not filter_conditions:
+        return True
+    return all(_condition_matches(payload, c) for c in filter_conditions.get("must", []))
+
+
+class LocalVectorStore(VectorStore):
+    """메모리 매핑한 벡터 행렬에 대한 코사인 유사도 검색.
+
+    벡터는 float32 외에 ``quantize_vectors``로 만든 float16/int8 행렬도 그대로 사용합니다.
+    포인트 ID는 Qdrant 업로드와 같이 행 번호입니다. ``build_ivf``로 만든 IVF 인덱스가
+    있으면 질문과 가까운 nprobe개 클러스터 안에서만 정확한 점수를 계산합니다.
+    """
+
+    def __init__(self, vectors: np.ndarray, payloads: List[Dict[str, Any]]) -> None:
+        """Wrap a (n, dim) vector matrix (may be a read-only memmap) and its payloads."""
+        if vectors.shape[0] != len(payloads):
+            raise ValueError(
+                f"벡터 수({vectors.shape[0]})와 payload 수({len(payloads)})가 일치하지 않습니다."
+            )
+        self.vectors = vectors
+        self.payloads = payloads
+        norms = np.linalg.norm(np.asarray(vectors, dtype=np.float32), axis=1)
+        self._inv_norms = 1.0 / np.maximum(norms, 1e-12)
+        self._masks: Dict[str, np.ndarray] = {}
+        # 청크 ID는 유일하지 않으므로 ID마다 payload 목록을 유지
+        self._by_chunk_id: Dict[str, List[Dict[str, Any]]] = {}
+        for p in payloads:
+            self._by_chunk_id.setdefault(str(p.get("id")), []).append(p)
+        self.centroids: Optional[np.ndarray] = None
+        self.lists: List[np.ndarray] = []
+        self.version_stamp = ""
+
+    def __len__(self) -> int:
+        return len(self.payloads)
+
+    @classmethod
+    def load(
+        cls,
+        vectors_path: Optional[str | Path] = None,
+        chunks_path: str | Path = STRUCTURED_CHUNKS_PATH,
+    ) -> LocalVectorStore:
+        """3_embed_chunks.py의 벡터 파일과 structured_chunks.json을 읽어옵니다.
+
+        vectors_path가 없으면 VECTOR_DTYPE에 맞는 파일(local_vectors_path)을 사용합니다.
+        """
+        vectors_path = vectors_path or local_vectors_path()
+        vectors = np.load(vectors_path, mmap_mode="r")
+        with open(chunks_path, "r", encoding="utf-8") as f:
+            chunks = json.load(f)
+        # 4_upload_qdrant.py와 같이 내용이 있는 청크만 순서대로 사용
+        payloads = [
+            chunk_to_payload(chunk, i)
+            for i, chunk in enumerate(chunks)
+            if chunk.get("content") or chunk.get("text")
+        ]
+        store = cls(vectors, payloads)
+        store.version_stamp = f"{os.stat(vectors_path).st_mtime_ns}:{len(store)}"
+        if len(store) >= LOCAL_ANN_MIN_POINTS:
+            store.build_ivf()
+        return store
+
+    def build_ivf(self, nlist: Optional[int] = None, iterations: int = 10, seed: int = 0) -> None:
+        """k-means로 벡터를 nlist개 클러스터로 나눠 IVF 인덱스를 만듭니다."""
+        n = len(self)
+        nlist = nlist or max(1, int(np.sqrt(n)))
+        data = np.asarray(self.vectors, dtype=np.float32) * self._inv_norms[:, None]
+        rng = np.random.default_rng(seed)
+        centroids = data[rng.choice(n, size=min(nlist, n), replace=False)]
+        for _ in range(iterations):
+            assign = np.argmax(data @ centroids.T, axis=1)
+            for c in range(len(centroids)):
+                members = data[assign == c]
+                if len(members):
+                    mean = members.mean(axis=0)
+                    centroids[c] = mean / max(np.linalg.norm(mean), 1e-12)
+        assign = np.argmax(data @ centroids.T, axis=1)
+        self.centroids = centroids
+        self.lists = [np.flatnonzero(assign == c) for c in range(len(centroids))]
+
+    def _mask(self, filter_conditions: Filter) -> np.ndarray:
+        key = json.dumps(filter_conditions, sort_keys=True, ensure_ascii=False)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = np.fromiter(
+                (payload_matches(p, filter_conditions) for p in self.payloads),
+                dtype=bool,
+                count=len(self.payloads),
+            )
+            self._masks[key] = mask
+        return mask
+
+    def _candidates(self, q: np.ndarray, nprobe: int) -> Optional[np.ndarray]:
+        if self.centroids is None:
+            return None
+        probes = np.argsort(-(self.centroids @ q))[:nprobe]
+        return np.concatenate([self.lists[c] for c in probes])
+
+    def search_sync(
+        self,
+        query_vector: Sequence[float],
+        limit: int,
+        filter_conditions: Optional[Filter] = None,
+        nprobe: int = LOCAL_ANN_NPROBE,
+        with_vectors: bool = False,
+    ) -> List[Hit]:
+        """이벤트 루프 없이 검색합니다 (벤치마크/전처리용)."""
+        q = np.asarray(query_vector, dtype=np.float32)
+        q = q / max(float(np.linalg.norm(q)), 1e-12)
+
+        rows = self._candidates(q, nprobe)
+        if filter_conditions:
+            # 필터 결과는 작으므로 근사 검색 대신 필터에 맞는 전체 행을 정확히 검색
+            rows = np.flatnonzero(self._mask(filter_conditions))
+        if rows is None:
+            scores = (self.vectors @ q) * self._inv_norms
+            rows = np.arange(len(scores))
+        else:
+            scores = (self.vectors[rows] @ q) * self._inv_norms[rows]
+
+        k = min(limit, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        hits = [
+            {"id": int(rows[i]), "score": float(scores[i]), "payload": self.payloads[rows[i]]}
+            for i in top
+        ]
+        if with_vectors:
+            for hit in hits:
+                hit["vector"] = np.asarray(self.vectors[hit["id"]], dtype=np.float32)
+        return hits
+
+    async def fetch_by_chunk_ids(self, chunk_ids):
+        """메모리의 청크 ID 색인에서 청크를 가져옵니다."""
+        return [p for c in chunk_ids for p in self._by_chunk_id.get(c, [])]
+
+    async def version(self):
+        """벡터 파일의 수정 시각과 포인트 수로 만든 버전을 반환합니다."""
+        return self.version_stamp
+
+    async def search(self, query, query_vector, limit, filter_conditions=None, with_vectors=False):
+        """search_sync를 그대로 호출합니다 (네트워크 왕복 없음)."""
+        return self.search_sync(query_vector, limit, filter_conditions, with_vectors=with_vectors)
+
+    async def search_many(self, query, query_vector, limit, filters, with_vectors=False):
+        """필터마다 search_sync를 차례로 호출합니다."""
+        return [
+            self.search_sync(query_vector, limit, f, with_vectors=with_vectors) for f in filters
+        ]
+
+    async def search_batch(self, queries, query_vectors, limit, filters, with_vectors=False):
+        """질문마다 search_sync를 차례로 호출합니다."""
+        return [
+            self.search_sync(v, limit, f, with_vectors=with_vectors)
+            for v, f in zip(query_vectors, filters)
+        ]
+
+
+_store: Optional[VectorStore] = None
+_store_lock = threading.Lock()
+
+
+def get_vector_store() -> VectorStore:
+    """VECTOR_STORE 설정에 맞는 저장소를 처음 호출될 때 만들어 재사용합니다."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if VECTOR_STORE == "local":
+                    _store = LocalVectorStore.load()
+                    print(f"📌 로컬 벡터 저장소 로드: {len(_store)}개 포인트 ({local_vectors_path()})")
+                elif VECTOR_STORE == "qdrant":
+                    _store = QdrantVectorStore()
+                else:
+                    raise ValueError(f"알 수 없는 VECTOR_STORE 값입니다: {VECTOR_STORE}")
+    return _store
+
+
+def set_vector_store(store: Optional[VectorStore]) -> None:
+    """사용할 저장소를 교체합니다 (None이면 다음 호출 때 설정값으로 다시 생성)."""
+    global _store
+    _store = store
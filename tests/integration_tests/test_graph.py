@@ -9,7 +9,12 @@ from react_agent import graph
 async def test_react_agent_simple_passthrough() -> None:
     res = await graph.ainvoke(
         {"messages": [("user", "Hi, Tell me your abilities")]},
-        {"configurable": {"system_prompt": "You are a helpful AI assistant."}},
+        {
+            "configurable": {
+                "system_prompt": "You are a helpful AI assistant.",
+                "thread_id": "integration-passthrough",
+            }
+        },
     )
 
     assert "harrison" in str(res["messages"][-1].content).lower()
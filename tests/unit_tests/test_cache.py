@@ -0,0 +1,56 @@
+import time
+
+import numpy as np
+
+from react_agent.cache import DiskCache, LRUCache
+from react_agent.embedding import EmbeddingCache
+from react_agent.utils import normalize_query
+
+
+def test_normalize_query_canonicalizes_articles_and_whitespace() -> None:
+    assert normalize_query("외국환거래법  1조 목적") == "외국환거래법 제1조 목적"
+    assert normalize_query("외국환거래법 제 1 조  목적 ") == "외국환거래법 제1조 목적"
+    assert normalize_query("제 2 장 외국환업무") == "제2장 외국환업무"
+
+
+def test_lru_cache_evicts_least_recently_used_and_counts() -> None:
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+
+def test_lru_cache_expires_entries_after_ttl() -> None:
+    cache = LRUCache(maxsize=4, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_disk_cache_persists_and_bounds_entries(tmp_path) -> None:
+    path = tmp_path / "cache.sqlite"
+    cache = DiskCache(path, maxsize=2)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    cache.set("c", b"3")
+    cache.close()
+
+    reopened = DiskCache(path, maxsize=2)
+    assert len(reopened) == 2
+    assert reopened.get("c") == b"3"
+
+
+def test_embedding_cache_shares_entries_across_equivalent_queries(tmp_path) -> None:
+    cache = EmbeddingCache("m", disk_path=str(tmp_path / "emb.sqlite"))
+    cache.set("외국환거래법 1조 목적", np.array([1.0, 2.0]))
+
+    warm = EmbeddingCache("m", disk_path=str(tmp_path / "emb.sqlite"))
+    np.testing.assert_array_equal(warm.get("외국환거래법 제1조  목적"), [1.0, 2.0])
+    assert EmbeddingCache("other", disk_path=str(tmp_path / "emb.sqlite")).get(
+        "외국환거래법 제1조 목적"
+    ) is None
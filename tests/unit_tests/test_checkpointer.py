@@ -0,0 +1,92 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import MessagesState, StateGraph
+
+from react_agent.checkpointer import SQLiteCheckpointSaver
+
+
+def _echo_graph(saver):
+    def reply(state):
+        return {"messages": [AIMessage(content=f"답변 {len(state['messages'])}")]}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node(reply)
+    builder.add_edge("__start__", "reply")
+    return builder.compile(checkpointer=saver)
+
+
+def _config(thread_id):
+    return {"configurable": {"thread_id": thread_id}}
+
+
+@pytest.mark.asyncio
+async def test_state_persists_across_saver_instances(tmp_path) -> None:
+    path = tmp_path / "checkpoints.sqlite"
+    saver = SQLiteCheckpointSaver(path, compact_interval=0)
+    await _echo_graph(saver).ainvoke({"messages": [HumanMessage(content="첫 질문")]}, _config("t1"))
+    saver.close()
+
+    reopened = SQLiteCheckpointSaver(path, compact_interval=0)
+    result = await _echo_graph(reopened).ainvoke(
+        {"messages": [HumanMessage(content="두 번째 질문")]}, _config("t1")
+    )
+
+    assert [m.content for m in result["messages"]] == ["첫 질문", "답변 1", "두 번째 질문", "답변 3"]
+    history = list(reopened.list(_config("t1")))
+    assert history[0].checkpoint["id"] > history[-1].checkpoint["id"]
+    assert history[0].parent_config["configurable"]["checkpoint_id"] == history[1].checkpoint["id"]
+
+
+def test_compaction_caps_checkpoints_and_expires_idle_threads(monkeypatch) -> None:
+    saver = SQLiteCheckpointSaver(":memory:", ttl=60, max_checkpoints=2, compact_interval=0)
+    graph = _echo_graph(saver)
+    for i in range(3):
+        graph.invoke({"messages": [HumanMessage(content=f"질문 {i}")]}, _config("busy"))
+    graph.invoke({"messages": [HumanMessage(content="질문")]}, _config("idle"))
+    assert saver.stats()["checkpoints"] > 4
+
+    saver.compact()
+    assert saver.stats()["checkpoints"] == 4
+    latest = saver.get_tuple(_config("busy"))
+    assert len(latest.checkpoint["channel_values"]["messages"]) == 6
+
+    saver._db().execute("UPDATE threads SET updated = ? WHERE thread_id = 'idle'", (time.time() - 120,))
+    assert saver.get_tuple(_config("idle")) is None
+    result = saver.compact()
+    assert result["expired_threads"] == 1
+    assert saver.stats()["threads"] == 1 and saver.stats()["checkpoints"] == 2
+
+
+@pytest.mark.asyncio
+async def test_async_methods_do_not_block_the_event_loop_during_compaction(tmp_path) -> None:
+    saver = SQLiteCheckpointSaver(tmp_path / "checkpoints.sqlite", compact_interval=0)
+    await _echo_graph(saver).ainvoke({"messages": [HumanMessage(content="질문")]}, _config("t1"))
+    ticks = []
+
+    async def ticker():
+        for _ in range(10):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    # 정리 작업이 잠금을 잡고 있는 상황을 흉내냄
+    locked = threading.Event()
+
+    def hold_lock():
+        with saver._lock:
+            locked.set()
+            time.sleep(0.3)
+
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    locked.wait()
+    start = time.monotonic()
+    checkpoint, _ = await asyncio.gather(saver.aget_tuple(_config("t1")), ticker())
+    holder.join()
+
+    assert checkpoint is not None
+    # 잠금이 풀리기 전에도 다른 코루틴이 계속 실행됨
+    assert sum(t - start < 0.25 for t in ticks) >= 5
@@ -0,0 +1,52 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from react_agent.context_window import build_window, message_tokens
+
+
+def make_turn(n, filler="외국환 신고 절차 " * 50):
+    return [
+        HumanMessage(content=f"질문 {n}", id=f"h{n}"),
+        AIMessage(content="", id=f"c{n}", tool_calls=[{"name": "search", "args": {"query": "신고"}, "id": f"t{n}"}]),
+        ToolMessage(content=filler, id=f"r{n}", tool_call_id=f"t{n}"),
+        AIMessage(content=f"답변 {n}", id=f"a{n}"),
+    ]
+
+
+def test_window_keeps_everything_within_budget() -> None:
+    messages = make_turn(0) + make_turn(1)
+    window = build_window(messages, "", None, 10**6)
+
+    assert window.messages == messages and window.dropped == []
+    assert build_window(messages, "", None, 0).messages == messages
+
+
+def test_window_cuts_at_turn_boundaries_and_summarizes_incrementally() -> None:
+    messages = [m for n in range(6) for m in make_turn(n)]
+    turn_tokens = sum(message_tokens(m) for m in make_turn(0))
+    budget = turn_tokens * 4
+
+    window = build_window(messages, "", None, budget)
+
+    # 목표(예산의 절반)까지 최신 턴 2개만 남기고 나머지는 요약으로
+    assert [m.id for m in window.dropped] == [m.id for n in range(4) for m in make_turn(n)]
+    assert isinstance(window.messages[0], HumanMessage) and window.messages[0].id == "h4"
+
+    # 다음 턴은 여유 안에 들어가므로 요약을 다시 만들지 않음
+    messages += make_turn(6)
+    window = build_window(messages, "요약", "a3", budget)
+    assert window.dropped == [] and window.messages[0].id == "h4"
+
+    # 다시 넘치면 새로 밀려난 턴만 요약에 합침
+    messages += make_turn(7)
+    window = build_window(messages, "요약", "a3", budget)
+    assert [m.id for m in window.dropped] == [m.id for n in (4, 5) for m in make_turn(n)]
+    assert window.summary == "요약"
+
+
+def test_window_never_drops_the_current_turn_and_resets_stale_summary() -> None:
+    messages = make_turn(0, filler="신고 " * 2000)
+    window = build_window(messages, "", None, 100)
+    assert window.messages == messages and window.dropped == []
+
+    window = build_window(messages, "오래된 요약", "missing", 10**6)
+    assert window.summary == "" and window.summarized_through is None
@@ -0,0 +1,100 @@
+import pytest
+
+from react_agent import retrieval
+from react_agent.cross_encoder import CrossEncoderReranker, is_decisive
+
+
+def _hits(scores):
+    return [
+        {"id": i, "score": s, "payload": {"id": f"1-{i}", "cleaned_content": f"조문 {i}"}}
+        for i, s in enumerate(scores)
+    ]
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, pairs):
+        self.calls.append(pairs)
+        # 뒤쪽 후보일수록 높은 점수
+        return [float(text.split()[-1]) for _, text in pairs]
+
+
+def test_reranks_by_cross_encoder_score_in_one_batch() -> None:
+    model = FakeModel()
+    reranker = CrossEncoderReranker(model, max_candidates=4, skip_margin=0.5)
+
+    hits, skipped = reranker.rerank("질문", _hits([0.80, 0.79, 0.78, 0.77, 0.76]), top_k=2)
+
+    assert not skipped
+    assert [h["id"] for h in hits] == [3, 2]
+    assert len(model.calls) == 1 and len(model.calls[0]) == 4
+
+
+def test_pair_scores_are_cached_by_normalized_query() -> None:
+    model = FakeModel()
+    reranker = CrossEncoderReranker(model, max_candidates=3, skip_margin=0.5)
+
+    reranker.rerank("제 3 조 정의", _hits([0.8, 0.79, 0.78]), top_k=3)
+    reranker.rerank("제3조  정의", _hits([0.8, 0.79, 0.78]), top_k=3)
+
+    assert len(model.calls) == 1
+    assert reranker.stats()["scored_pairs"] == 3
+
+
+def test_pair_scores_are_not_shared_between_chunks_with_the_same_id() -> None:
+    model = FakeModel()
+    reranker = CrossEncoderReranker(model, max_candidates=2, skip_margin=0.5)
+    # 같은 청크 ID(제1장 제3조 ①이 두 번 나옴)지만 본문이 다른 두 포인트
+    hits = _hits([0.8, 0.79])
+    for hit in hits:
+        hit["payload"]["id"] = "1-3-①"
+
+    reranker.scores("질문", hits[:1])
+    reranked, _ = reranker.rerank("질문", hits, top_k=2)
+
+    assert len(model.calls) == 2 and len(model.calls[1]) == 1
+    assert [h["id"] for h in reranked] == [1, 0]
+
+
+def test_skips_when_top_vector_score_is_decisive() -> None:
+    model = FakeModel()
+    reranker = CrossEncoderReranker(model, skip_margin=0.15)
+
+    hits, skipped = reranker.rerank("질문", _hits([0.9, 0.5, 0.4]), top_k=2)
+
+    assert skipped and model.calls == []
+    assert [h["id"] for h in hits] == [0, 1]
+    assert not is_decisive(_hits([0.8, 0.75]), 0.15)
+
+
+def test_fused_scores_use_the_candidate_score_range() -> None:
+    # RRF 점수는 모두 1/60 근처라 1위 점수 대비 차이로는 생략이 일어나지 않음
+    ahead = _hits([2 / 61] + [2 / (61 + k) for k in range(3, 22)])
+    close = _hits([2 / (61 + k) for k in range(20)])
+    for hit in ahead + close:
+        hit["score_source"] = "rrf"
+
+    assert is_decisive(ahead, 0.15)
+    assert not is_decisive(close, 0.15)
+    assert not is_decisive(ahead[:2], 0.15)
+
+
+@pytest.mark.asyncio
+async def test_pipeline_cross_encoder_stage(monkeypatch) -> None:
+    reranker = CrossEncoderReranker(FakeModel(), max_candidates=5, skip_margin=0.5)
+
+    async def fake_embed_and_search(search_query, initial_k, timings, prefix="", with_vectors=False):
+        return retrieval.SearchResult(hits=_hits([0.8 - i * 0.01 for i in range(10)]))
+
+    monkeypatch.setattr(retrieval, "get_cross_encoder_reranker", lambda: reranker)
+    monkeypatch.setattr(retrieval, "_embed_and_search", fake_embed_and_search)
+
+    result = await retrieval.run_search_pipeline(
+        "외국환 신고", top_k=2, rewrite=False, structural=False, cross_encoder=True
+    )
+
+    assert "cross_encode" in result.timings
+    assert len(result.results) == 2
+    assert reranker.stats()["scored_pairs"] == 5
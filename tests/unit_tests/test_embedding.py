@@ -0,0 +1,65 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from react_agent.embedding import EmbeddingExecutor
+
+
+def _fake_encode(calls):
+    def encode(texts):
+        calls.append(list(texts))
+        assert threading.current_thread().name == "embedding-executor"
+        return np.array([[float(len(t)), 1.0] for t in texts], dtype=np.float32)
+
+    return encode
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_are_coalesced_into_one_batch() -> None:
+    calls = []
+    executor = EmbeddingExecutor(_fake_encode(calls), batch_size=8, max_wait_ms=50)
+
+    vectors = await asyncio.gather(*(executor.embed("q" * n) for n in range(1, 6)))
+
+    assert [v[0] for v in vectors] == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert len(calls) == 1
+    stats = executor.stats()
+    assert stats["batches"] == 1 and stats["encoded"] == 5
+
+
+@pytest.mark.asyncio
+async def test_batch_size_limits_coalescing() -> None:
+    calls = []
+    executor = EmbeddingExecutor(_fake_encode(calls), batch_size=2, max_wait_ms=50)
+
+    await executor.embed_many(["a", "b", "c"])
+
+    assert [len(c) for c in calls] == [2, 1]
+
+
+@pytest.mark.asyncio
+async def test_encode_errors_propagate_to_every_caller() -> None:
+    def encode(texts):
+        raise RuntimeError("boom")
+
+    executor = EmbeddingExecutor(encode, max_wait_ms=10)
+    with pytest.raises(RuntimeError, match="boom"):
+        await executor.embed("x")
+
+
+@pytest.mark.asyncio
+async def test_cached_queries_skip_the_encoder() -> None:
+    from react_agent.embedding import EmbeddingCache
+
+    calls = []
+    executor = EmbeddingExecutor(
+        _fake_encode(calls), max_wait_ms=1, cache=EmbeddingCache("m")
+    )
+
+    await executor.embed("외국환거래법 제1조 목적")
+    await executor.embed("외국환거래법 1조  목적")
+
+    assert len(calls) == 1
+    assert executor.stats()["cache"]["memory"]["hits"] == 1
@@ -0,0 +1,155 @@
+import importlib
+import itertools
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+
+from react_agent.checkpointer import SQLiteCheckpointSaver
+from react_agent.state import State
+
+graph_module = importlib.import_module("react_agent.graph")
+
+
+@pytest.fixture(autouse=True)
+def checkpointer(tmp_path, monkeypatch):
+    saver = SQLiteCheckpointSaver(tmp_path / "checkpoints.sqlite", compact_interval=0)
+    monkeypatch.setattr(graph_module.graph, "checkpointer", saver)
+    yield saver
+    saver.close()
+
+
+class FakeChatModel(GenericFakeChatModel):
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+@pytest.mark.asyncio
+async def test_call_model_reuses_model_and_agent_per_configuration(monkeypatch) -> None:
+    built = []
+
+    def fake_chat_model(model):
+        built.append(model)
+        return FakeChatModel(messages=itertools.cycle([AIMessage(content="답변")]))
+
+    monkeypatch.setattr(graph_module, "get_chat_model", fake_chat_model)
+    graph_module.get_agent.cache_clear()
+    state = State(messages=[HumanMessage(content="외국환 신고")])
+
+    for i in range(3):
+        result = await graph_module.call_model(state, {"configurable": {"thread_id": f"t{i}"}})
+        assert result["messages"][-1].content == "답변"
+    await graph_module.call_model(
+        state, {"configurable": {"thread_id": "t3", "model": "claude-other"}}
+    )
+
+    assert built == ["claude-3-5-haiku-20241022", "claude-other"]
+    graph_module.get_agent.cache_clear()
+
+
+class ScriptedChatModel(GenericFakeChatModel):
+    bound: list = []
+
+    def bind_tools(self, tools, **kwargs):
+        self.bound.append([t.__name__ for t in tools])
+        return self
+
+
+@pytest.mark.asyncio
+async def test_flat_mode_runs_tools_in_the_outer_graph(monkeypatch) -> None:
+    model = ScriptedChatModel(
+        messages=iter([
+            AIMessage(
+                content="",
+                tool_calls=[{"name": "qdrant_search_with_params", "args": {"query": "신고"}, "id": "c1"}],
+            ),
+            AIMessage(content="답변"),
+        ])
+    )
+    searched = []
+
+    async def fake_search(query, top_k, config):
+        searched.append((query, top_k))
+        return [{"id": "1-1", "text": "신고 조문"}]
+
+    monkeypatch.setattr(graph_module, "get_chat_model", lambda name: model)
+    monkeypatch.setattr(graph_module, "qdrant_search_reranked", fake_search)
+    graph_module.get_tool_model.cache_clear()
+
+    result = await graph_module.graph.ainvoke(
+        {"messages": [HumanMessage(content="외국환 신고")]},
+        {"configurable": {"agent_mode": "flat", "thread_id": "flat"}},
+    )
+
+    assert searched == [("신고", 10)]
+    assert [type(m).__name__ for m in result["messages"]] == [
+        "HumanMessage", "AIMessage", "ToolMessage", "AIMessage"
+    ]
+    assert model.bound == [["qdrant_search_with_params", "qdrant_search_batch"]]
+    # 바깥 그래프가 thread_id별로 대화 상태를 체크포인트함
+    state = await graph_module.graph.aget_state({"configurable": {"thread_id": "flat"}})
+    assert len(state.values["messages"]) == 4
+    graph_module.get_tool_model.cache_clear()
+
+
+class RecordingChatModel(GenericFakeChatModel):
+    prompts: list = []
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.prompts.append(messages)
+        return await super()._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_call_model_folds_old_turns_into_the_rolling_summary(monkeypatch) -> None:
+    model = RecordingChatModel(messages=iter([AIMessage(content="요약된 대화"), AIMessage(content="답변")]))
+    monkeypatch.setattr(graph_module, "get_chat_model", lambda name: model)
+    graph_module.get_tool_model.cache_clear()
+    messages = []
+    for n in range(5):
+        messages += [
+            HumanMessage(content=f"질문 {n} " + "외국환 " * 100, id=f"h{n}"),
+            AIMessage(content=f"답변 {n} " + "신고 " * 100, id=f"a{n}"),
+        ]
+    messages.append(HumanMessage(content="마지막 질문", id="h5"))
+
+    result = await graph_module.call_model(
+        State(messages=messages),
+        {"configurable": {"agent_mode": "flat", "context_token_budget": 500}},
+    )
+
+    summary_prompt, answer_prompt = model.prompts
+    assert "질문 0" in summary_prompt[-1].content
+    assert result["summary"] == "요약된 대화"
+    assert result["summarized_through"] == "a4"
+    assert "요약된 대화" in answer_prompt[0].content
+    assert [m.id for m in answer_prompt[1:]] == ["h5"]
+    graph_module.get_tool_model.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_summary_call_is_not_streamed_as_answer_tokens(monkeypatch) -> None:
+    model = FakeChatModel(messages=iter([AIMessage(content="요약된 대화"), AIMessage(content="최종 답변")]))
+    monkeypatch.setattr(graph_module, "get_chat_model", lambda name: model)
+    graph_module.get_tool_model.cache_clear()
+    history = []
+    for n in range(5):
+        history += [
+            HumanMessage(content=f"질문 {n} " + "외국환 " * 100),
+            AIMessage(content=f"답변 {n} " + "신고 " * 100),
+        ]
+    history.append(HumanMessage(content="마지막 질문"))
+
+    streamed = ""
+    async for chunk, _ in graph_module.graph.astream(
+        {"messages": history},
+        {"configurable": {"agent_mode": "flat", "context_token_budget": 500, "thread_id": "stream"}},
+        stream_mode="messages",
+    ):
+        streamed += chunk.content
+
+    assert "최종" in streamed and "요약" not in streamed
+    graph_module.get_tool_model.cache_clear()
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from react_agent.lexical import LexicalIndex, tokenize
+
+TEXTS = [
+    "제1조(목적) 이 법은 외국환거래와 그 밖의 대외거래를 자유롭게 하고",
+    "제3조(정의) 이 법에서 사용하는 용어의 뜻은 다음과 같다",
+    "제27조(벌칙) 다음 각 호의 어느 하나에 해당하는 자는 처벌한다",
+]
+
+
+def test_tokenize_emits_words_and_char_bigrams() -> None:
+    assert tokenize("외국환거래법") == ["외국환거래법", "외국", "국환", "환거", "거래", "래법"]
+
+
+def test_score_ranks_matching_chunks_and_ignores_unknown_rows() -> None:
+    index = LexicalIndex.build(TEXTS)
+
+    scores = index.score("외국환거래 목적", [2, 0, 99, None])
+
+    assert scores[1] > scores[0]
+    assert scores[2] == 0 and scores[3] == 0
+
+
+def test_rows_with_duplicate_chunk_ids_keep_their_own_weights(tmp_path) -> None:
+    # 같은 청크 ID(예: 제1장 제3조 ①)가 두 번 나와도 행(포인트 ID)은 서로 다름
+    texts = ["용어의 정의", "외국환 신고 절차", "용어의 뜻"]
+    index = LexicalIndex.build(texts)
+    path = tmp_path / "lexical_index.json"
+    index.save(path)
+
+    loaded = LexicalIndex.load(path)
+
+    assert len(loaded) == 3
+    scores = loaded.score("용어의 정의", [0, 1, 2])
+    assert scores[0] > scores[2] > scores[1] == 0
+    assert loaded.doc_vector(1)[0] == index.doc_vector(1)[0] != index.doc_vector(0)[0]
+    np.testing.assert_allclose(loaded.doc_vector(1)[1], index.doc_vector(1)[1], rtol=1e-5)
+
+
+def test_save_and_load_roundtrip(tmp_path) -> None:
+    index = LexicalIndex.build(TEXTS)
+    path = tmp_path / "lexical_index.json"
+    index.save(path)
+
+    loaded = LexicalIndex.load(path)
+
+    rows = list(range(len(TEXTS)))
+    np.testing.assert_allclose(
+        loaded.score("용어의 정의", rows), index.score("용어의 정의", rows), rtol=1e-5
+    )
+
+
+def test_legacy_id_keyed_index_is_rejected() -> None:
+    data = LexicalIndex.build(TEXTS).to_dict()
+    data["docs"] = {"1-1": data["docs"][0]}
+
+    with pytest.raises(ValueError):
+        LexicalIndex.from_dict(data)
+
+
+def test_score_many_matches_per_query_scores() -> None:
+    index = LexicalIndex.build(TEXTS)
+    queries = ["외국환거래 목적", "용어의 정의", "없는단어"]
+    row_sets = [[2, 0, 99], [1, 0], [0]]
+
+    batched = index.score_many(queries, row_sets)
+
+    for query, rows, scores in zip(queries, row_sets, batched):
+        np.testing.assert_allclose(scores, index.score(query, rows), rtol=1e-5)
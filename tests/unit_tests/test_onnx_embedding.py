@@ -0,0 +1,80 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from react_agent.embedding import EMBEDDING_ONNX_PATH
+from react_agent.onnx_embedding import OnnxEncoder, export_onnx_model
+
+SENTENCES = ["외국환거래법 제1조 목적", "신고", "외국환 업무 등록 요건은?"]
+
+
+def _tiny_checkpoint(path: Path) -> Path:
+    torch = pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    pytest.importorskip("onnx")
+    pytest.importorskip("onnxruntime")
+
+    torch.manual_seed(0)
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + sorted(
+        set("".join(SENTENCES).replace(" ", ""))
+    )
+    path.mkdir()
+    (path / "vocab.txt").write_text("\n".join(vocab), encoding="utf-8")
+    transformers.BertTokenizerFast(str(path / "vocab.txt")).save_pretrained(path)
+    config = transformers.BertConfig(
+        vocab_size=len(vocab),
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=4,
+        intermediate_size=64,
+    )
+    transformers.BertModel(config).save_pretrained(path)
+    return path
+
+
+def _reference(checkpoint: Path) -> np.ndarray:
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(checkpoint)
+    model = AutoModel.from_pretrained(checkpoint).eval()
+    batch = tokenizer(SENTENCES, padding=True, return_tensors="pt")
+    with torch.no_grad():
+        hidden = model(**batch).last_hidden_state
+    mask = batch["attention_mask"].unsqueeze(-1).float()
+    pooled = (hidden * mask).sum(1) / mask.sum(1)
+    return torch.nn.functional.normalize(pooled, dim=1).numpy()
+
+
+def test_exported_model_matches_torch_mean_pooling(tmp_path) -> None:
+    checkpoint = _tiny_checkpoint(tmp_path / "hf")
+    output = export_onnx_model(str(checkpoint), tmp_path / "onnx", quantize=True)
+
+    expected = _reference(checkpoint)
+    vectors = OnnxEncoder(output).encode(SENTENCES, batch_size=2)
+    assert vectors.shape == expected.shape
+    assert np.min(np.sum(vectors * expected, axis=1)) > 0.999
+
+    single = OnnxEncoder(output).encode(SENTENCES[0])
+    assert single.shape == (32,) and np.allclose(single, vectors[0], atol=1e-5)
+
+    quantized = OnnxEncoder(output, quantized=True).encode(SENTENCES)
+    assert np.min(np.sum(quantized * expected, axis=1)) > 0.95
+
+
+@pytest.mark.skipif(
+    not (Path(EMBEDDING_ONNX_PATH) / "model.onnx").exists(),
+    reason="ONNX 모델이 없습니다 (preprocessing/export_onnx_model.py로 생성)",
+)
+@pytest.mark.parametrize("quantized, threshold", [(False, 0.999), (True, 0.98)])
+def test_onnx_backend_parity_with_sentence_transformer(quantized, threshold) -> None:
+    sentence_transformers = pytest.importorskip("sentence_transformers")
+    try:
+        model = sentence_transformers.SentenceTransformer("all-MiniLM-L6-v2", local_files_only=True)
+    except Exception as e:
+        pytest.skip(f"SentenceTransformer 모델을 불러올 수 없습니다: {e}")
+
+    expected = model.encode(SENTENCES, normalize_embeddings=True)
+    vectors = OnnxEncoder(EMBEDDING_ONNX_PATH, quantized=quantized).encode(SENTENCES)
+    assert np.min(np.sum(vectors * expected, axis=1)) > threshold
@@ -0,0 +1,35 @@
+import asyncio
+
+import httpx
+import pytest
+
+from react_agent.qdrant_transport import QdrantTransport, get_transport
+
+
+@pytest.mark.asyncio
+async def test_transport_posts_json_to_collection_path() -> None:
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append((request.url.path, request.read()))
+        return httpx.Response(200, json={"result": []})
+
+    transport = QdrantTransport(
+        "http://qdrant:6333", transport=httpx.MockTransport(handler)
+    )
+    response = await transport.post("/collections/c/points/search", {"limit": 3})
+    await transport.aclose()
+
+    assert response.status_code == 200
+    assert seen == [("/collections/c/points/search", b'{"limit":3}')]
+
+
+@pytest.mark.asyncio
+async def test_get_transport_is_shared_within_loop() -> None:
+    assert get_transport() is get_transport()
+    other = await asyncio.to_thread(lambda: asyncio.run(_current_transport()))
+    assert other is not get_transport()
+
+
+async def _current_transport() -> QdrantTransport:
+    return get_transport()
@@ -0,0 +1,68 @@
+import json
+
+from react_agent.render import count_tokens, render_results, strip_annotations
+
+LAW = {
+    "law_name": "외국환거래법",
+    "effective_date": "2021. 9. 16.",
+    "publication_info": "법률 제18244호, 2021. 6. 15., 일부개정",
+    "ministry": "기획재정부",
+}
+
+
+def _payload(chunk_id, text, article=None, item=None):
+    payload = {
+        "id": chunk_id,
+        "content": text,
+        "cleaned_content": text,
+        "chapter_no": "제1장",
+        "chapter_title": "총칙",
+        **LAW,
+    }
+    if article:
+        payload.update(article_no=article[0], article_title=article[1])
+    if item:
+        payload["item_no"] = item
+    return payload
+
+
+def test_strip_annotations() -> None:
+    text = "제1조(목적) 이 법은 대외거래의 원활화를 기한다. <개정 2009. 1. 30.> [전문개정 2017. 1. 17.]"
+    assert strip_annotations(text) == "제1조(목적) 이 법은 대외거래의 원활화를 기한다."
+
+
+def test_items_are_merged_under_their_article_in_hit_order() -> None:
+    payloads = [
+        _payload("1-2-②", "② 제1항에도 불구하고 적용하지 아니한다.", ("제2조", "적용 대상"), "②"),
+        _payload("1-1", "제1조(목적) 이 법은 ... <개정 2009. 1. 30.>", ("제1조", "목적")),
+        _payload("1-2", "제2조(적용 대상) ① 이 법은 다음 각 호에 적용한다.", ("제2조", "적용 대상")),
+    ]
+
+    rendered = render_results(payloads)
+
+    assert [r["id"] for r in rendered] == ["1-2,1-2-②", "1-1"]
+    assert rendered[0]["ref"] == "제1장 총칙 제2조(적용 대상)"
+    assert rendered[0]["text"].startswith("제2조(적용 대상) ①")
+    assert "개정" not in rendered[1]["text"]
+
+
+def test_token_budget_packs_and_truncates() -> None:
+    payloads = [
+        _payload(f"1-{i}", "외국환거래 " * 50, (f"제{i}조", "목적")) for i in range(1, 4)
+    ]
+    one = count_tokens(" ".join(render_results(payloads[:1])[0].values()))
+
+    assert len(render_results(payloads, token_budget=one * 2 + 1)) == 2
+    truncated = render_results(payloads, token_budget=one // 2)
+    assert len(truncated) == 1 and truncated[0]["text"].endswith("…")
+    assert count_tokens(" ".join(truncated[0].values())) <= one // 2
+
+
+def test_rendered_results_are_much_smaller_than_payloads() -> None:
+    payloads = [
+        _payload(f"1-3-{m}", f"{m} 이 법에서 사용하는 용어의 뜻은 다음과 같다. <개정 2017. 1. 17.>", ("제3조", "정의"), m)
+        for m in "①②③④"
+    ]
+    raw = count_tokens(json.dumps(payloads, ensure_ascii=False))
+    compact = count_tokens(json.dumps(render_results(payloads), ensure_ascii=False))
+    assert compact < raw / 3
@@ -0,0 +1,403 @@
+import json
+
+import httpx
+import numpy as np
+import pytest
+
+from react_agent import retrieval, tools, vector_store
+from react_agent.qdrant_transport import QdrantTransport
+from react_agent.semantic_cache import SemanticCache
+from react_agent.structure_index import StructuralIndex
+
+
+def _hits(n):
+    return [
+        {
+            "id": i,
+            "score": 1.0 - i * 0.01,
+            "payload": {"id": f"1-{i}", "cleaned_content": f"외국환 거래 조문 {i}"},
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def fake_backend(monkeypatch):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.read())
+        requests.append((request.url.path, body))
+        if request.url.path.endswith("/batch"):
+            # 필터 검색은 2개, 필터 없는 검색은 limit개를 돌려줌
+            return httpx.Response(
+                200,
+                json={
+                    "result": [
+                        _hits(2 if "filter" in search else search["limit"])
+                        for search in body["searches"]
+                    ]
+                },
+            )
+        return httpx.Response(200, json={"result": _hits(body["limit"])})
+
+    async def fake_embed(text):
+        return np.ones(4, dtype=np.float32)
+
+    rewrites = []
+
+    async def fake_rewrite(query):
+        rewrites.append(query)
+        return f"{query} 재구성"
+
+    monkeypatch.setattr(vector_store, "SEARCH_MODE", "dense")
+    monkeypatch.setattr(vector_store, "_store", vector_store.QdrantVectorStore())
+    monkeypatch.setattr(retrieval.embedding_executor, "embed", fake_embed)
+    monkeypatch.setattr(retrieval, "restructure_query_with_llm", fake_rewrite)
+    transport = QdrantTransport(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(vector_store, "get_transport", lambda: transport)
+
+    async def no_structural_index():
+        return None
+
+    monkeypatch.setattr(retrieval, "get_structural_index", no_structural_index)
+    return requests, rewrites
+
+
+@pytest.mark.asyncio
+async def test_pipeline_runs_each_stage_once(fake_backend) -> None:
+    requests, rewrites = fake_backend
+
+    result = await retrieval.run_search_pipeline("외국환 거래", top_k=3, initial_k=10)
+
+    assert rewrites == ["외국환 거래"]
+    assert len(requests) == 1
+    assert result.search_query == "외국환 거래 재구성"
+    assert [r["id"] for r in result.results] == ["1-0", "1-1", "1-2"]
+    assert set(result.timings) == {"rewrite", "embed", "search", "rerank", "project", "total"}
+
+
+@pytest.mark.asyncio
+async def test_reranked_tool_returns_payloads_and_debug_timings(fake_backend) -> None:
+    output = await tools.qdrant_search_reranked(
+        "외국환 거래", top_k=2, config={"configurable": {"search_debug": True}}
+    )
+
+    assert [r.get("id") for r in output[:2]] == ["1-0", "1-1"]
+    assert "rewrite" in output[-1]["debug"]["timings_ms"]
+
+
+@pytest.mark.asyncio
+async def test_search_errors_are_reported_not_swallowed(fake_backend, monkeypatch) -> None:
+    transport = QdrantTransport(
+        transport=httpx.MockTransport(lambda r: httpx.Response(500, text="down"))
+    )
+    monkeypatch.setattr(vector_store, "get_transport", lambda: transport)
+
+    output = await tools.qdrant_search_reranked("외국환 거래", config={})
+
+    assert output == [{"error": "검색 중 오류 발생: down"}]
+
+
+@pytest.mark.asyncio
+async def test_speculative_mode_fuses_raw_and_rewritten_candidates(fake_backend) -> None:
+    requests, rewrites = fake_backend
+
+    result = await retrieval.run_search_pipeline(
+        "외국환 거래", top_k=3, initial_k=10, speculative=True
+    )
+
+    assert rewrites == ["외국환 거래"] and len(requests) == 2
+    assert result.search_query == "외국환 거래 재구성"
+    assert {"raw_search", "rewritten_search", "fuse"} <= set(result.timings)
+
+
+@pytest.mark.asyncio
+async def test_speculative_deadline_returns_raw_results(fake_backend, monkeypatch) -> None:
+    import asyncio
+
+    requests, _ = fake_backend
+
+    async def slow_rewrite(query):
+        await asyncio.sleep(1)
+        return "늦은 재구성"
+
+    monkeypatch.setattr(retrieval, "restructure_query_with_llm", slow_rewrite)
+
+    result = await retrieval.run_search_pipeline(
+        "외국환 거래", initial_k=10, speculative=True, rewrite_deadline_ms=20
+    )
+
+    assert result.search_query == "외국환 거래"
+    assert len(requests) == 1 and result.timings["total"] < 500
+
+
+@pytest.mark.asyncio
+async def test_filtered_and_unfiltered_searches_share_one_batch_request(fake_backend) -> None:
+    requests, _ = fake_backend
+    before = retrieval.search_stats()
+
+    result = await retrieval.run_search_pipeline(
+        "제3조 정의", top_k=10, initial_k=10, rewrite=False
+    )
+
+    assert len(requests) == 1 and requests[0][0].endswith("/points/search/batch")
+    # 필터 결과(1-0, 1-1)가 먼저, 나머지는 중복 없이 필터 없는 결과로 채움
+    assert [r["id"] for r in result.results][:3] == ["1-0", "1-1", "1-2"]
+    assert len(result.results) == 10
+    after = retrieval.search_stats()
+    assert after["fallback_used"] == before["fallback_used"] + 1
+
+
+def test_structure_filter_keeps_branch_article_numbers() -> None:
+    assert retrieval.parse_structure_filter("제10조의2 신고 요건") == {
+        "must": [{"key": "article_no", "match": {"value": "제10조의2"}}]
+    }
+    assert retrieval.parse_structure_filter("제2장 제 3 조") == {
+        "must": [
+            {"key": "chapter_no", "match": {"value": "제2장"}},
+            {"key": "article_no", "match": {"value": "제3조"}},
+        ]
+    }
+    assert retrieval.parse_structure_filter("외국환 신고") is None
+
+
+def test_merge_keeps_filtered_hits_when_enough() -> None:
+    filtered = _hits(6)
+    merged, used_fallback = retrieval.merge_filtered_results(filtered, _hits(10), 10)
+    assert merged == filtered and not used_fallback
+
+
+@pytest.mark.asyncio
+async def test_structural_lookup_skips_rewrite_and_search(fake_backend, monkeypatch) -> None:
+    requests, rewrites = fake_backend
+    index = StructuralIndex(
+        [
+            {"id": "1-3", "chapter_no": "제1장", "article_no": "제3조", "article_title": "정의", "item_no": None},
+            {"id": "1-3-①", "chapter_no": "제1장", "article_no": "제3조", "article_title": "정의", "item_no": "①"},
+        ]
+    )
+
+    async def structural_index():
+        return index
+
+    monkeypatch.setattr(retrieval, "get_structural_index", structural_index)
+    result = await retrieval.run_search_pipeline("제3조 정의")
+
+    assert [r["id"] for r in result.results] == ["1-3", "1-3-①"]
+    assert rewrites == [] and requests == []
+    assert "structure_lookup" in result.timings
+
+    # 조를 특정하지 못하거나 조문 참조 외의 질문이 있으면 일반 파이프라인으로 진행
+    result = await retrieval.run_search_pipeline("외국환 신고 절차")
+    assert rewrites == ["외국환 신고 절차"]
+    await retrieval.run_search_pipeline("제3조를 위반하면 어떤 처벌을 받나요?")
+    assert rewrites[-1] == "제3조를 위반하면 어떤 처벌을 받나요?"
+
+
+def test_importing_package_does_not_load_heavy_dependencies() -> None:
+    import subprocess
+    import sys
+
+    heavy = ["sentence_transformers", "sklearn", "langchain_anthropic", "qdrant_client"]
+    code = (
+        "import sys, react_agent; "
+        f"print([m for m in {heavy!r} if m in sys.modules])"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+
+@pytest.mark.asyncio
+async def test_warmup_loads_model_and_pings_store(monkeypatch) -> None:
+    encoded = []
+
+    class FakeModel:
+        def encode(self, texts, **kwargs):
+            encoded.extend(texts)
+            return np.ones((len(texts), 4), dtype=np.float32)
+
+    class FakeStore:
+        pinged = False
+
+        async def healthcheck(self):
+            FakeStore.pinged = True
+
+    async def no_structural_index():
+        return None
+
+    monkeypatch.setattr(retrieval, "get_embedding_model", lambda: FakeModel())
+    monkeypatch.setattr(retrieval, "get_vector_store", lambda: FakeStore())
+    monkeypatch.setattr(retrieval, "get_lexical_index", lambda: None)
+    monkeypatch.setattr(retrieval, "get_structural_index", no_structural_index)
+
+    timings = await retrieval.warmup()
+
+    assert len(encoded) == 1 and FakeStore.pinged
+    assert {"embedding_model", "dummy_encode", "vector_store"} <= set(timings)
+
+
+def test_neighbor_chunk_ids() -> None:
+    assert retrieval.neighbor_chunk_ids("2-10-③", 1) == ["2-10", "2-10-②", "2-10-④"]
+    assert retrieval.neighbor_chunk_ids("2-10", 2) == ["2-10-①", "2-10-②"]
+    assert retrieval.neighbor_chunk_ids("2-10-①", 0) == []
+    assert retrieval.neighbor_chunk_ids("1-2-2", 1) == []
+
+
+@pytest.mark.asyncio
+async def test_expansion_fetches_neighbours_in_one_scroll(fake_backend, monkeypatch) -> None:
+    requests, _ = fake_backend
+    neighbours = {
+        "1-0": {"id": "1-0", "cleaned_content": "제0조"},
+        "1-0-①": {"id": "1-0-①", "cleaned_content": "① 항"},
+    }
+
+    async def fetch(chunk_ids):
+        requests.append(("fetch", list(chunk_ids)))
+        return [neighbours[c] for c in chunk_ids if c in neighbours]
+
+    monkeypatch.setattr(vector_store._store, "fetch_by_chunk_ids", fetch)
+    results = [{"id": "1-0-②", "cleaned_content": "② 항"}, {"id": "1-0", "cleaned_content": "제0조"}]
+
+    expanded = await retrieval.expand_stage(results, depth=1)
+
+    assert [p["id"] for p in expanded] == ["1-0-②", "1-0-①", "1-0"]
+    assert requests == [("fetch", ["1-0-①", "1-0-③"])]
+
+
+@pytest.mark.asyncio
+async def test_batch_tool_embeds_and_searches_all_queries_at_once(fake_backend, monkeypatch) -> None:
+    requests, rewrites = fake_backend
+    embedded = []
+
+    async def fake_embed_many(texts):
+        embedded.append(list(texts))
+        return [np.ones(4, dtype=np.float32) for _ in texts]
+
+    monkeypatch.setattr(retrieval.embedding_executor, "embed_many", fake_embed_many)
+
+    output = await tools.qdrant_search_batch(
+        ["외국환 거래", "제3조 정의", "신고 의무"], top_k=2, initial_k=6, config={}
+    )
+
+    assert embedded == [["외국환 거래", "제3조 정의", "신고 의무"]]
+    assert rewrites == []
+    # 필터가 있는 질문은 필터/필터 없는 검색 2개 -> 모두 4개 검색을 요청 하나로
+    assert len(requests) == 1 and requests[0][0].endswith("/points/search/batch")
+    assert len(requests[0][1]["searches"]) == 4
+    assert [entry["query"] for entry in output] == ["외국환 거래", "제3조 정의", "신고 의무"]
+    assert all(entry["results"] and "error" not in entry["results"][0] for entry in output)
+
+
+def test_batch_rerank_matches_per_query_rerank() -> None:
+    rng = np.random.default_rng(0)
+    words = ["외국환", "거래", "신고", "허가", "벌칙", "정의", "목적", "지급", "수령", "자본"]
+    candidate_sets = []
+    for n in (8, 3, 12):
+        hits = _hits(n)
+        for hit in hits:
+            hit["score"] = float(rng.random())
+            hit["payload"]["cleaned_content"] = " ".join(rng.choice(words, size=6))
+        candidate_sets.append(hits)
+    queries = ["외국환 거래 신고", "정의", "자본 거래 허가 벌칙"]
+
+    for method, single in (
+        ("hybrid", retrieval.rerank_with_hybrid),
+        ("tfidf", retrieval.rerank_with_tfidf),
+    ):
+        batched = retrieval.rerank_batch(queries, candidate_sets, 5, method)
+        for query, hits, result in zip(queries, candidate_sets, batched):
+            expected = single(query, hits, 5)
+            assert [h["id"] for h in result] == [h["id"] for h in expected]
+
+
+def test_rerank_sorts_even_when_there_are_fewer_hits_than_top_n() -> None:
+    hits = _hits(3)[::-1]
+
+    assert [h["id"] for h in retrieval.rerank_with_hybrid("외국환 거래", hits, 5)] == [0, 1, 2]
+    batched = retrieval.rerank_batch(["외국환 거래"], [hits], 5, "hybrid")
+    assert [h["id"] for h in batched[0]] == [0, 1, 2]
+
+
+def test_mmr_skips_near_duplicates() -> None:
+    # 0, 1은 거의 같은 벡터, 2는 다른 방향
+    vectors = np.array([[1.0, 0.0], [0.99, 0.01], [0.0, 1.0], [0.7, 0.7]])
+    relevance = np.array([1.0, 0.95, 0.6, 0.1])
+
+    assert retrieval.mmr_select(relevance, vectors, 2, mmr_lambda=1.0) == [0, 1]
+    assert retrieval.mmr_select(relevance, vectors, 2, mmr_lambda=0.5) == [0, 2]
+
+
+@pytest.mark.asyncio
+async def test_mmr_pipeline_requests_dense_vectors(fake_backend, monkeypatch) -> None:
+    requests, _ = fake_backend
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.read())
+        requests.append((request.url.path, body))
+        hits = _hits(body["limit"])
+        for hit in hits:
+            # 짝수/홀수 번째가 각각 같은 방향의 중복 청크
+            hit["vector"] = {vector_store.EMBEDDING_MODEL: [1.0, 0.0] if hit["id"] % 2 else [0.0, 1.0]}
+        return httpx.Response(200, json={"result": hits})
+
+    transport = QdrantTransport(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(vector_store, "get_transport", lambda: transport)
+
+    result = await retrieval.run_search_pipeline(
+        "외국환 거래", top_k=2, initial_k=8, rewrite=False, reranking_method="mmr", mmr_lambda=0.3
+    )
+
+    assert requests[0][1]["with_vectors"] == [vector_store.EMBEDDING_MODEL]
+    ids = [int(r["id"].split("-")[1]) for r in result.results]
+    assert len(ids) == 2 and ids[0] % 2 != ids[1] % 2
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_reuses_results_until_reingest(fake_backend, monkeypatch) -> None:
+    requests, rewrites = fake_backend
+    versions = ["v1"]
+
+    async def fake_version(self):
+        return versions[0]
+
+    monkeypatch.setattr(vector_store.QdrantVectorStore, "version", fake_version)
+    monkeypatch.setattr(retrieval, "semantic_cache", SemanticCache())
+    monkeypatch.setattr(retrieval, "SEMANTIC_CACHE_VERSION_TTL", 0.0)
+
+    first = await retrieval.run_search_pipeline("외국환 신고", top_k=3, use_semantic_cache=True)
+    # fake_embed는 모든 질문에 같은 벡터를 돌려주므로 바꿔 말한 질문도 히트
+    second = await retrieval.run_search_pipeline("외국환은 어떻게 신고하나요", top_k=3, use_semantic_cache=True)
+
+    assert second.results == first.results
+    assert len(requests) == 1 and rewrites == ["외국환 신고"]
+    assert "search" not in second.timings and "semantic_cache" in second.timings
+    # 검색 설정이 다르면 다른 항목
+    await retrieval.run_search_pipeline("외국환 신고", top_k=5, use_semantic_cache=True)
+    assert len(requests) == 2
+
+    versions[0] = "v2"
+    await retrieval.run_search_pipeline("외국환 신고", top_k=3, use_semantic_cache=True)
+    assert len(requests) == 3
+    stats = retrieval.semantic_cache_stats()
+    assert stats["hits"] == 1 and stats["invalidations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_separates_structure_references(fake_backend, monkeypatch) -> None:
+    async def fake_version(self):
+        return "v1"
+
+    monkeypatch.setattr(vector_store.QdrantVectorStore, "version", fake_version)
+    monkeypatch.setattr(retrieval, "semantic_cache", SemanticCache())
+
+    # fake_embed는 모든 질문에 같은 벡터를 돌려주지만 가리키는 조문이 다르면 미스
+    await retrieval.run_search_pipeline("제3조 위반 시 처벌", top_k=3, use_semantic_cache=True)
+    other = await retrieval.run_search_pipeline("제5조 위반 시 처벌", top_k=3, use_semantic_cache=True)
+    same = await retrieval.run_search_pipeline("제 3 조 위반 처벌", top_k=3, use_semantic_cache=True)
+
+    assert "search" in other.timings
+    assert "search" not in same.timings
+    assert retrieval.semantic_cache_stats()["hits"] == 1
@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from react_agent import rewrite
+from react_agent.cache import DiskCache, LRUCache
+
+
+@pytest.fixture
+def fake_llm(monkeypatch, tmp_path):
+    calls = []
+
+    async def call_llm(query):
+        calls.append(query)
+        await asyncio.sleep(0.01)
+        return f"{query} (재구성)"
+
+    monkeypatch.setattr(rewrite, "_call_llm", call_llm)
+    monkeypatch.setattr(rewrite, "_memory", LRUCache(16))
+    monkeypatch.setattr(rewrite, "_disk", DiskCache(tmp_path / "rewrite.sqlite"))
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_rewrites_share_one_llm_call(fake_llm) -> None:
+    results = await asyncio.gather(
+        *(rewrite.restructure_query_with_llm("외국환거래법 1조 목적") for _ in range(5))
+    )
+
+    assert len(fake_llm) == 1
+    assert set(results) == {"외국환거래법 1조 목적 (재구성)"}
+
+
+@pytest.mark.asyncio
+async def test_normalized_repeat_is_served_from_cache(fake_llm, monkeypatch) -> None:
+    await rewrite.restructure_query_with_llm("외국환거래법 1조 목적")
+    monkeypatch.setattr(rewrite, "_memory", LRUCache(16))  # simulate a restart
+
+    cached = await rewrite.restructure_query_with_llm("외국환거래법  제1조 목적")
+
+    assert cached == "외국환거래법 1조 목적 (재구성)"
+    assert len(fake_llm) == 1
+    assert rewrite.rewrite_cache_stats()["disk"]["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_rewrites_are_not_cached(fake_llm, monkeypatch) -> None:
+    async def failing(query):
+        raise RuntimeError("overloaded")
+
+    monkeypatch.setattr(rewrite, "_call_llm", failing)
+    with pytest.raises(RuntimeError):
+        await rewrite.restructure_query_with_llm("질문")
+    assert rewrite._memory.get(rewrite.rewrite_cache_key("질문")) is None
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from react_agent.semantic_cache import SemanticCache
+
+
+def test_returns_nearest_query_above_threshold() -> None:
+    cache: SemanticCache[str] = SemanticCache(maxsize=4)
+    cache.set(np.array([1.0, 0.0]), "params", "외국환 신고")
+    cache.set(np.array([0.0, 1.0]), "params", "벌칙")
+
+    assert cache.get(np.array([0.99, 0.05]), "params", 0.95) == ("외국환 신고", pytest.approx(0.9987, abs=1e-3))
+    assert cache.get(np.array([0.7, 0.7]), "params", 0.95) is None
+    assert cache.get(np.array([1.0, 0.0]), "other", 0.95) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_evicts_least_recently_used() -> None:
+    cache: SemanticCache[int] = SemanticCache(maxsize=2)
+    cache.set(np.array([1.0, 0.0, 0.0]), None, 1)
+    cache.set(np.array([0.0, 1.0, 0.0]), None, 2)
+    assert cache.get(np.array([1.0, 0.0, 0.0]), None, 0.9)[0] == 1
+
+    cache.set(np.array([0.0, 0.0, 1.0]), None, 3)
+
+    assert len(cache) == 2 and cache.stats()["evictions"] == 1
+    assert cache.get(np.array([0.0, 1.0, 0.0]), None, 0.9) is None
+    assert cache.get(np.array([1.0, 0.0, 0.0]), None, 0.9)[0] == 1
+
+
+def test_new_collection_version_clears_entries() -> None:
+    cache: SemanticCache[int] = SemanticCache()
+    assert not cache.check_version("v1")
+    cache.set(np.array([1.0, 0.0]), None, 1)
+
+    assert not cache.check_version("v1") and len(cache) == 1
+    assert cache.check_version("v2") and len(cache) == 0
+    assert cache.stats()["invalidations"] == 1
+
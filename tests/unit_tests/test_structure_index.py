@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+from react_agent import structure_index
+from react_agent.structure_index import StructuralIndex, parse_structure_ref
+
+
+def _index() -> StructuralIndex:
+    payloads = [
+        {"id": "1-1", "chapter_no": "제1장", "article_no": "제1조", "item_no": None},
+        {"id": "2-10", "chapter_no": "제2장", "article_no": "제10조", "item_no": None},
+        {"id": "2-10-①", "chapter_no": "제2장", "article_no": "제10조", "item_no": "①"},
+        {"id": "2-10-③", "chapter_no": "제2장", "article_no": "제10조", "item_no": "③"},
+        # 부칙의 제1조는 다른 장에도 존재
+        {"id": "9-1", "chapter_no": "제9장", "article_no": "제1조", "item_no": None},
+        {"id": "1-3", "chapter_no": "제1장", "article_no": "제3조", "article_title": "정의", "item_no": None},
+        {"id": "1-5", "chapter_no": "제1장", "article_no": "제5조", "article_title": "신고", "item_no": None},
+        {"id": "2-10의2", "chapter_no": "제2장", "article_no": "제10조의2", "item_no": None},
+    ]
+    return StructuralIndex(payloads)
+
+
+def test_parse_structure_ref() -> None:
+    assert parse_structure_ref("제2장 제10조 제3항") == ("제2장", "제10조", "③")
+    assert parse_structure_ref("10조 ③") == (None, "제10조", "③")
+    assert parse_structure_ref("외국환 신고") == (None, None, None)
+    assert parse_structure_ref("제10조의2 내용") == (None, "제10조의2", None)
+
+
+def test_lookup_article_and_item() -> None:
+    index = _index()
+    assert [p["id"] for p in index.lookup("제10조")] == ["2-10", "2-10-①", "2-10-③"]
+    assert [p["id"] for p in index.lookup("제2장 제10조 3항")] == ["2-10-③"]
+    assert index.lookup("제10조 제2항") is None
+
+
+def test_lookup_requires_unambiguous_article() -> None:
+    index = _index()
+    assert index.lookup("제1조 목적") is None
+    assert [p["id"] for p in index.lookup("제9장 제1조")] == ["9-1"]
+    assert index.lookup("정의 규정") is None
+
+
+def test_lookup_only_for_a_single_structural_reference() -> None:
+    index = _index()
+    assert [p["id"] for p in index.lookup("제3조 내용")] == ["1-3"]
+    assert [p["id"] for p in index.lookup("제3조의 전문을 보여주세요")] == ["1-3"]
+    assert [p["id"] for p in index.lookup("제10조의2 내용")] == ["2-10의2"]
+    # 구조 참조 외의 내용이나 여러 조문이 있으면 검색으로 넘김
+    assert index.lookup("제3조를 위반하면 어떤 처벌을 받나요?") is None
+    assert index.lookup("제3조와 제5조의 차이는?") is None
+    assert index.lookup("제10조의3 내용") is None
+
+
+def test_lookup_accepts_law_name_and_article_title() -> None:
+    index = _index()
+    assert [p["id"] for p in index.lookup("제3조 정의")] == ["1-3"]
+    assert [p["id"] for p in index.lookup("제3조(정의)를 보여줘")] == ["1-3"]
+    assert [p["id"] for p in index.lookup("외국환거래법 제3조")] == ["1-3"]
+    assert [p["id"] for p in index.lookup("「외국환거래법」 제5조 신고")] == ["1-5"]
+    # 제목이 인덱스와 다르거나 다른 문서(시행령)를 가리키면 검색으로 넘김
+    assert index.lookup("제3조 신고") is None
+    assert index.lookup("외국환거래법 시행령 제3조") is None
+
+
+def test_from_chunks_file(tmp_path) -> None:
+    chunks = [
+        {
+            "id": "1-3",
+            "content": "제3조(정의)",
+            "cleaned_content": "제3조 정의",
+            "metadata": {"chapter_no": "제1장", "article_no": "제3조", "item_no": None},
+        },
+        {"id": "empty", "content": "", "metadata": {}},
+    ]
+    path = tmp_path / "structured_chunks.json"
+    path.write_text(json.dumps(chunks, ensure_ascii=False), encoding="utf-8")
+
+    index = StructuralIndex.from_chunks_file(path)
+    assert len(index) == 1
+    assert index.lookup("3조")[0]["cleaned_content"] == "제3조 정의"
+
+
+@pytest.mark.asyncio
+async def test_index_loads_right_after_boot(tmp_path, monkeypatch) -> None:
+    # time.monotonic()은 부팅 직후 0에 가까우므로 첫 로드가 재시도 대기에 걸리면 안 됨
+    chunks = [{"id": "1-3", "content": "제3조(정의)", "metadata": {"chapter_no": "제1장", "article_no": "제3조"}}]
+    path = tmp_path / "structured_chunks.json"
+    path.write_text(json.dumps(chunks, ensure_ascii=False), encoding="utf-8")
+    monkeypatch.setattr(structure_index, "STRUCTURED_CHUNKS_PATH", str(path))
+    monkeypatch.setattr(structure_index, "_index", None)
+    monkeypatch.setattr(structure_index, "_last_attempt", None)
+    monkeypatch.setattr(structure_index.time, "monotonic", lambda: 5.0)
+
+    index = await structure_index.get_structural_index()
+
+    assert index is not None and len(index) == 1
@@ -0,0 +1,118 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from react_agent import tool_results
+from react_agent.tool_results import (
+    ToolResultNode,
+    ToolResultStore,
+    expand_current_turn,
+    reference_of,
+    to_reference,
+)
+
+BIG = "외국환거래법 제3조(정의) 이 법에서 사용하는 용어의 뜻은 다음과 같다. " * 100
+
+
+def test_store_promotes_disk_hits_to_memory(tmp_path) -> None:
+    path = str(tmp_path / "blobs.sqlite")
+    key = ToolResultStore(disk_path=path).put(BIG)
+
+    store = ToolResultStore(disk_path=path)
+    assert store.get(key) == BIG
+    assert store.get(key) == BIG
+    assert store.stats()["memory"]["hits"] == 1
+    assert store.stats()["disk"]["hits"] == 1
+    assert store.get("missing") is None
+
+
+def test_only_the_current_turn_is_expanded() -> None:
+    store = ToolResultStore(disk_path=None)
+    small = ToolMessage(content="결과 없음", tool_call_id="c0")
+    assert to_reference(small, store) is small
+
+    old = to_reference(ToolMessage(content=BIG, tool_call_id="c1"), store)
+    new = to_reference(ToolMessage(content=BIG + "2", tool_call_id="c2"), store)
+    assert reference_of(old) == store.key(BIG)
+    assert len(old.content) < 400 and old.tool_call_id == "c1"
+    assert to_reference(old, store) is old
+
+    messages = [
+        HumanMessage(content="첫 질문"),
+        AIMessage(content="", tool_calls=[{"name": "search", "args": {}, "id": "c1"}]),
+        old,
+        AIMessage(content="첫 답변"),
+        HumanMessage(content="두 번째 질문"),
+        AIMessage(content="", tool_calls=[{"name": "search", "args": {}, "id": "c2"}]),
+        new,
+    ]
+    expanded = expand_current_turn(messages, store)
+
+    assert expanded[2] is old
+    assert expanded[6].content == BIG + "2"
+    assert messages[6].content == new.content
+
+
+@pytest.mark.asyncio
+async def test_tool_node_returns_references(monkeypatch) -> None:
+    monkeypatch.setattr(tool_results, "tool_result_store", ToolResultStore(disk_path=None))
+
+    def search(query: str) -> str:
+        """검색."""
+        return BIG
+
+    call = AIMessage(content="", tool_calls=[{"name": "search", "args": {"query": "신고"}, "id": "c1"}])
+    result = await ToolResultNode([search]).ainvoke({"messages": [call]})
+
+    message = result["messages"][0]
+    assert reference_of(message) == ToolResultStore.key(BIG)
+    assert expand_current_turn([HumanMessage(content="질문"), call, message])[2].content == BIG
+
+
+def test_tool_node_references_command_updates(monkeypatch) -> None:
+    from typing import Annotated
+
+    from langchain_core.tools import InjectedToolCallId, tool
+    from langgraph.types import Command
+
+    monkeypatch.setattr(tool_results, "tool_result_store", ToolResultStore(disk_path=None))
+
+    @tool
+    def search(query: str) -> str:
+        """검색."""
+        return BIG
+
+    @tool
+    def lookup(query: str, tool_call_id: Annotated[str, InjectedToolCallId]) -> Command:
+        """조회."""
+        return Command(update={"messages": [ToolMessage(content=BIG, tool_call_id=tool_call_id)]})
+
+    call = AIMessage(
+        content="",
+        tool_calls=[
+            {"name": "search", "args": {"query": "신고"}, "id": "c1"},
+            {"name": "lookup", "args": {"query": "신고"}, "id": "c2"},
+        ],
+    )
+    search_output, command = ToolResultNode([search, lookup]).invoke({"messages": [call]})
+
+    assert reference_of(search_output["messages"][0]) == ToolResultStore.key(BIG)
+    assert reference_of(command.update["messages"][0]) == ToolResultStore.key(BIG)
+
+
+def test_tool_node_inside_a_compiled_graph(monkeypatch) -> None:
+    from langgraph.graph import START, MessagesState, StateGraph
+
+    monkeypatch.setattr(tool_results, "tool_result_store", ToolResultStore(disk_path=None))
+
+    def search(query: str) -> str:
+        """검색."""
+        return BIG
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("tools", ToolResultNode([search]))
+    builder.add_edge(START, "tools")
+    call = AIMessage(content="", tool_calls=[{"name": "search", "args": {"query": "신고"}, "id": "c1"}])
+
+    state = builder.compile().invoke({"messages": [call]})
+
+    assert reference_of(state["messages"][-1]) == ToolResultStore.key(BIG)
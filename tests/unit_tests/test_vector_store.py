@@ -0,0 +1,213 @@
+import json
+
+import numpy as np
+import pytest
+
+from react_agent import retrieval, vector_store
+from react_agent.vector_store import LocalVectorStore, payload_matches
+
+
+def _store(n=50, dim=8) -> LocalVectorStore:
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(n, dim)).astype(np.float32)
+    payloads = [
+        {"id": f"{i % 3 + 1}-{i}", "chapter_no": f"제{i % 3 + 1}장", "cleaned_content": f"조문 {i}"}
+        for i in range(n)
+    ]
+    return LocalVectorStore(vectors, payloads)
+
+
+def test_local_search_matches_brute_force_cosine() -> None:
+    store = _store()
+    query = store.vectors[7] + 0.01
+
+    hits = store.search_sync(query, 5)
+
+    normed = store.vectors / np.linalg.norm(store.vectors, axis=1, keepdims=True)
+    expected = np.argsort(-(normed @ (query / np.linalg.norm(query))))[:5]
+    assert [h["id"] for h in hits] == expected.tolist()
+    assert hits[0]["id"] == 7 and hits[0]["payload"] is store.payloads[7]
+
+
+def test_local_search_applies_must_filters() -> None:
+    store = _store()
+    conditions = {"must": [{"key": "chapter_no", "match": {"value": "제2장"}}]}
+
+    hits = store.search_sync(store.vectors[0], 100, conditions)
+
+    assert len(hits) == 17
+    assert all(h["payload"]["chapter_no"] == "제2장" for h in hits)
+    assert payload_matches({"id": "a"}, {"must": [{"key": "id", "match": {"any": ["a", "b"]}}]})
+
+
+def test_ivf_search_finds_exact_neighbour() -> None:
+    store = _store(n=400)
+    store.build_ivf(nlist=20)
+
+    hits = store.search_sync(store.vectors[123], 3, nprobe=4)
+
+    assert hits[0]["id"] == 123
+    assert sum(len(rows) for rows in store.lists) == 400
+
+
+def test_load_memory_maps_vectors(tmp_path) -> None:
+    chunks = [{"id": "1-1", "content": "제1조"}, {"id": "x", "content": ""}, {"id": "1-2", "content": "제2조"}]
+    (tmp_path / "chunks.json").write_text(json.dumps(chunks, ensure_ascii=False), encoding="utf-8")
+    np.save(tmp_path / "vectors.npy", np.eye(2, dtype=np.float32))
+
+    store = LocalVectorStore.load(tmp_path / "vectors.npy", tmp_path / "chunks.json")
+
+    assert isinstance(store.vectors, np.memmap)
+    assert [p["id"] for p in store.payloads] == ["1-1", "1-2"]
+
+
+def test_quantized_local_file_is_separate_from_float32_vectors(tmp_path, monkeypatch) -> None:
+    chunks = [{"id": "1-1", "content": "제1조"}, {"id": "1-2", "content": "제2조"}]
+    (tmp_path / "chunks.json").write_text(json.dumps(chunks, ensure_ascii=False), encoding="utf-8")
+    original = tmp_path / "vectors.npy"
+    vectors = np.eye(2, dtype=np.float32)
+    np.save(original, vectors)
+    np.save(vector_store.local_vectors_path(original, "int8"), vector_store.quantize_vectors(vectors, "int8"))
+
+    assert vector_store.local_vectors_path(original, "float32") == original
+    assert vector_store.local_vectors_path(original, "int8") == tmp_path / "vectors.int8.npy"
+    monkeypatch.setattr(vector_store, "LOCAL_VECTORS_PATH", str(original))
+    monkeypatch.setattr(vector_store, "VECTOR_DTYPE", "int8")
+
+    store = LocalVectorStore.load(chunks_path=tmp_path / "chunks.json")
+
+    assert store.vectors.dtype == np.int8
+    assert np.load(original).dtype == np.float32
+
+
+@pytest.mark.asyncio
+async def test_pipeline_runs_offline_on_local_store(monkeypatch) -> None:
+    store = _store(dim=4)
+
+    async def fake_embed(text):
+        return store.vectors[3]
+
+    async def no_structural_index():
+        return None
+
+    monkeypatch.setattr(vector_store, "_store", store)
+    monkeypatch.setattr(retrieval.embedding_executor, "embed", fake_embed)
+    monkeypatch.setattr(retrieval, "get_structural_index", no_structural_index)
+
+    result = await retrieval.run_search_pipeline("제2장 조문", top_k=3, initial_k=10, rewrite=False)
+
+    assert len(result.results) == 3
+    assert all(r["chapter_no"] == "제2장" for r in result.results)
+
+
+@pytest.mark.parametrize("dtype, itemsize", [("float16", 2), ("int8", 1)])
+def test_quantized_local_store_keeps_neighbours(dtype, itemsize) -> None:
+    store = _store(n=200, dim=32)
+    quantized = vector_store.quantize_vectors(store.vectors, dtype)
+    assert quantized.dtype.itemsize == itemsize
+
+    local = LocalVectorStore(quantized, store.payloads)
+    for row in (0, 50, 199):
+        exact = [h["id"] for h in store.search_sync(store.vectors[row], 5)]
+        approx = [h["id"] for h in local.search_sync(store.vectors[row], 5)]
+        assert approx[0] == row
+        assert len(set(exact) & set(approx)) >= 4
+
+
+def test_rescore_params_added_when_oversampling_set(monkeypatch) -> None:
+    monkeypatch.setattr(vector_store, "SEARCH_MODE", "dense")
+    monkeypatch.setattr(vector_store, "SEARCH_RESCORE_OVERSAMPLING", 0.0)
+    _, payload = vector_store.build_search_request("질문", [0.1, 0.2], 10)
+    assert "quantization" not in payload["params"]
+
+    monkeypatch.setattr(vector_store, "SEARCH_RESCORE_OVERSAMPLING", 2.0)
+    _, payload = vector_store.build_search_request("질문", [0.1, 0.2], 10)
+    assert payload["params"]["quantization"] == {"rescore": True, "oversampling": 2.0}
+
+
+@pytest.mark.asyncio
+async def test_qdrant_healthcheck_reports_missing_collection(monkeypatch) -> None:
+    import httpx
+
+    from react_agent.qdrant_transport import QdrantTransport
+
+    transport = QdrantTransport(
+        transport=httpx.MockTransport(lambda r: httpx.Response(404, text="Not found"))
+    )
+    monkeypatch.setattr(vector_store, "get_transport", lambda: transport)
+
+    with pytest.raises(vector_store.SearchError):
+        await vector_store.QdrantVectorStore().healthcheck()
+
+
+def test_qdrant_requests_only_rendered_payload_fields(monkeypatch) -> None:
+    from react_agent.render import RESULT_PAYLOAD_FIELDS
+
+    monkeypatch.setattr(vector_store, "SEARCH_MODE", "dense")
+    _, payload = vector_store.build_search_request("질문", [0.1, 0.2], 10)
+    assert payload["with_payload"] == {"include": RESULT_PAYLOAD_FIELDS}
+    assert "content" not in RESULT_PAYLOAD_FIELDS
+
+
+@pytest.mark.asyncio
+async def test_fetch_by_chunk_ids_uses_one_scroll_request(monkeypatch) -> None:
+    import httpx
+
+    from react_agent.qdrant_transport import QdrantTransport
+
+    bodies = []
+
+    def handler(request):
+        bodies.append((request.url.path, json.loads(request.read())))
+        return httpx.Response(
+            200, json={"result": {"points": [{"id": 3, "payload": {"id": "2-10"}}], "next_page_offset": None}}
+        )
+
+    transport = QdrantTransport(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(vector_store, "get_transport", lambda: transport)
+
+    payloads = await vector_store.QdrantVectorStore().fetch_by_chunk_ids(["2-10", "2-10-②"])
+
+    assert payloads == [{"id": "2-10"}]
+    path, body = bodies[0]
+    assert len(bodies) == 1 and path.endswith("/points/scroll")
+    assert body["filter"]["must"][0] == {"key": "id", "match": {"any": ["2-10", "2-10-②"]}}
+
+    local = _store()
+    assert [p["id"] for p in await local.fetch_by_chunk_ids(["2-1", "없음"])] == ["2-1"]
+
+
+@pytest.mark.asyncio
+async def test_fetch_by_chunk_ids_pages_through_duplicate_ids(monkeypatch) -> None:
+    import httpx
+
+    from react_agent.qdrant_transport import QdrantTransport
+
+    # 같은 청크 ID "2-10"을 가진 포인트가 두 개 -> limit(2)을 넘어 두 번째 페이지로
+    points = [
+        {"id": 3, "payload": {"id": "2-10"}},
+        {"id": 7, "payload": {"id": "2-10"}},
+        {"id": 9, "payload": {"id": "2-10-②"}},
+    ]
+    offsets = []
+
+    def handler(request):
+        body = json.loads(request.read())
+        start = body.get("offset", 0)
+        offsets.append(start)
+        end = start + body["limit"]
+        next_offset = end if end < len(points) else None
+        return httpx.Response(
+            200, json={"result": {"points": points[start:end], "next_page_offset": next_offset}}
+        )
+
+    transport = QdrantTransport(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(vector_store, "get_transport", lambda: transport)
+
+    payloads = await vector_store.QdrantVectorStore().fetch_by_chunk_ids(["2-10", "2-10-②"])
+
+    assert [p["id"] for p in payloads] == ["2-10", "2-10", "2-10-②"]
+    assert offsets == [0, 2]
+
+    local = LocalVectorStore(np.ones((3, 2), dtype=np.float32), [p["payload"] for p in points])
+    assert [p["id"] for p in await local.fetch_by_chunk_ids(["2-10"])] == ["2-10", "2-10"]